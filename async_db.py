@@ -0,0 +1,209 @@
+"""
+Fachada asyncio para o simulador do RocksDB
+As chamadas bloqueantes rodam em um pool limitado de threads, e escritas e
+leituras concorrentes são agrupadas em um único write() ou multi_get()
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from column_family import ColumnFamilyHandle
+from rocksdb_simulator import RocksDBSimulator, Snapshot, WriteBatch
+
+class AsyncDB:
+    """Versão awaitable de get, put, merge, delete, write e multi_get
+    
+    Enquanto um grupo de escritas está sendo gravado, as novas escritas se
+    acumulam e seguem juntas no próximo write(), como um único lote
+    atômico. Leituras sem snapshot são agrupadas do mesmo jeito em um
+    multi_get() por família. O event loop nunca executa I/O do banco.
+    Como no banco, column_family recebe o handle da família (None = "default").
+    """
+    
+    def __init__(self, db: RocksDBSimulator, max_workers: int = 4):
+        self.db = db
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="rocksdb-async")
+        self._pending_writes: List[Tuple[list, asyncio.Future]] = []
+        self._pending_reads: List[Tuple[bytes, Optional[ColumnFamilyHandle], asyncio.Future]] = []
+        # Tarefas que esvaziam as filas; None quando a fila está parada. A
+        # referência mantém a tarefa viva e permite a close() esperá-la
+        self._write_task: Optional[asyncio.Task] = None
+        self._read_task: Optional[asyncio.Task] = None
+    
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+    
+    async def get(self, key: bytes, snapshot: Optional[Snapshot] = None,
+                  column_family: Optional[ColumnFamilyHandle] = None) -> Optional[bytes]:
+        if snapshot is not None:
+            return await self._run(self.db.get, key, snapshot, column_family)
+        future = asyncio.get_running_loop().create_future()
+        self._pending_reads.append((key, column_family, future))
+        if self._read_task is None:
+            self._read_task = asyncio.ensure_future(self._drain_reads())
+        return await future
+    
+    async def multi_get(self, keys: List[bytes], snapshot: Optional[Snapshot] = None,
+                        column_family: Optional[ColumnFamilyHandle] = None) -> List[Optional[bytes]]:
+        return await self._run(self.db.multi_get, keys, snapshot, column_family)
+    
+    async def put(self, key: bytes, value: bytes, column_family: Optional[ColumnFamilyHandle] = None):
+        await self._write([('put', key, value, _cf_id(column_family))])
+    
+    async def merge(self, key: bytes, operand: bytes, column_family: Optional[ColumnFamilyHandle] = None):
+        await self._write([('merge', key, operand, _cf_id(column_family))])
+    
+    async def delete(self, key: bytes, column_family: Optional[ColumnFamilyHandle] = None):
+        await self._write([('delete', key, None, _cf_id(column_family))])
+    
+    async def delete_range(self, begin: bytes, end: bytes,
+                           column_family: Optional[ColumnFamilyHandle] = None):
+        await self._write([('delete_range', begin, end, _cf_id(column_family))])
+    
+    async def write(self, batch: WriteBatch):
+        if batch.operations:
+            await self._write(list(batch.operations))
+    
+    async def _write(self, operations: list):
+        # Operações inválidas falham aqui, antes de entrar em um lote com as
+        # escritas de outras chamadas
+        self.db._check_batch(operations)
+        WriteBatch._encode_operations(operations)
+        future = asyncio.get_running_loop().create_future()
+        self._pending_writes.append((operations, future))
+        if self._write_task is None:
+            self._write_task = asyncio.ensure_future(self._drain_writes())
+        await future
+    
+    async def _drain_writes(self):
+        """Grava as escritas acumuladas, um lote por vez, até a fila esvaziar
+        
+        Se o lote falhar, cada escrita é repetida sozinha: só a chamada que
+        causou o erro recebe a exceção.
+        """
+        try:
+            while self._pending_writes:
+                group, self._pending_writes = self._pending_writes, []
+                try:
+                    await self._run(self.db.write, _batch(op for operations, _ in group for op in operations))
+                except Exception as e:
+                    if len(group) == 1:
+                        if not group[0][1].done():
+                            group[0][1].set_exception(e)
+                        continue
+                    for operations, future in group:
+                        try:
+                            await self._run(self.db.write, _batch(operations))
+                        except Exception as e:
+                            if not future.done():
+                                future.set_exception(e)
+                        else:
+                            if not future.done():
+                                future.set_result(None)
+                else:
+                    for _, future in group:
+                        if not future.done():
+                            future.set_result(None)
+        finally:
+            self._write_task = None
+    
+    async def _drain_reads(self):
+        """Responde as leituras acumuladas com um multi_get por família"""
+        try:
+            while self._pending_reads:
+                pending, self._pending_reads = self._pending_reads, []
+                families: Dict[int, Tuple[Optional[ColumnFamilyHandle], list]] = {}
+                for key, column_family, future in pending:
+                    _, group = families.setdefault(_cf_id(column_family), (column_family, []))
+                    group.append((key, future))
+                for column_family, group in families.values():
+                    try:
+                        values = await self._run(self.db.multi_get, [key for key, _ in group],
+                                                 None, column_family)
+                    except Exception as e:
+                        for _, future in group:
+                            if not future.done():
+                                future.set_exception(e)
+                    else:
+                        for (_, future), value in zip(group, values):
+                            if not future.done():
+                                future.set_result(value)
+        finally:
+            self._read_task = None
+    
+    def iterkeys(self, **kwargs) -> 'AsyncIterator':
+        """Iterador assíncrono de chaves; aceita os mesmos filtros de db.iterkeys()"""
+        return AsyncIterator(self, self.db.iterkeys(**kwargs))
+    
+    def itervalues(self, **kwargs) -> 'AsyncIterator':
+        """Iterador assíncrono de valores; aceita os mesmos filtros de db.itervalues()"""
+        return AsyncIterator(self, self.db.itervalues(**kwargs))
+    
+    def iteritems(self, **kwargs) -> 'AsyncIterator':
+        """Iterador assíncrono de pares; aceita os mesmos filtros de db.iteritems()"""
+        return AsyncIterator(self, self.db.iteritems(**kwargs))
+    
+    def snapshot(self) -> Snapshot:
+        return self.db.snapshot()
+    
+    async def flush(self):
+        await self._run(self.db.flush)
+    
+    async def close(self):
+        """Espera as escritas pendentes e fecha o banco e o pool de threads"""
+        while self._write_task is not None or self._read_task is not None:
+            await asyncio.gather(*(task for task in (self._write_task, self._read_task) if task is not None),
+                                 return_exceptions=True)
+        await self._run(self.db.close)
+        self._executor.shutdown(wait=True)
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+class AsyncIterator:
+    """Percorre um iterador do banco em lotes lidos no pool de threads"""
+    
+    def __init__(self, adb: AsyncDB, it, batch_size: int = 256):
+        self._adb = adb
+        self._it = it
+        self.batch_size = batch_size
+        self._buffer: list = []
+        self._pos = 0
+        self._exhausted = False
+    
+    def _next_batch(self) -> list:
+        batch = []
+        for item in self._it:
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                break
+        return batch
+    
+    def __aiter__(self):
+        return self
+    
+    async def __anext__(self):
+        if self._pos >= len(self._buffer):
+            if self._exhausted:
+                raise StopAsyncIteration
+            self._buffer = await self._adb._run(self._next_batch)
+            self._pos = 0
+            if len(self._buffer) < self.batch_size:
+                self._exhausted = True
+            if not self._buffer:
+                raise StopAsyncIteration
+        item = self._buffer[self._pos]
+        self._pos += 1
+        return item
+
+def _batch(operations) -> WriteBatch:
+    batch = WriteBatch()
+    batch.operations = list(operations)
+    return batch
+
+def _cf_id(column_family: Optional[ColumnFamilyHandle]) -> int:
+    return 0 if column_family is None else column_family.id
@@ -0,0 +1,241 @@
+"""
+Backups incrementais do simulador do RocksDB
+Os arquivos de tabela, imutáveis, ficam em uma pasta compartilhada por todos
+os backups e só são copiados se ainda não estiverem lá; o MANIFEST e os logs
+vivos ficam na pasta de cada backup. Cada arquivo tem um crc32, conferido na
+verificação e na restauração. O banco continua aceitando escritas durante a
+cópia: só a captura da lista de arquivos passa pela fila de escritas
+"""
+
+import os
+import json
+import time
+import shutil
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from dbformat import MANIFEST_FILE, parse_file_name
+
+# Tamanho dos pedaços lidos ao copiar e verificar arquivos
+COPY_CHUNK_SIZE = 1 << 20
+
+class BackupInfo:
+    """Resumo de um backup: id, horário de criação, bytes e número de arquivos"""
+    
+    __slots__ = ("backup_id", "timestamp", "size", "number_files", "app_metadata")
+    
+    def __init__(self, backup_id: int, timestamp: float, size: int, number_files: int,
+                 app_metadata: str = ""):
+        self.backup_id = backup_id
+        self.timestamp = timestamp
+        self.size = size
+        self.number_files = number_files
+        self.app_metadata = app_metadata
+    
+    def __repr__(self):
+        return f"BackupInfo({self.backup_id}, size={self.size}, number_files={self.number_files})"
+
+class BackupEngine:
+    """Cria, verifica, restaura e remove backups em backup_dir
+    
+    Estrutura do diretório:
+        
+        meta/<id>            lista de arquivos do backup (JSON)
+        private/<id>/        MANIFEST e logs do backup
+        shared/<n>_<crc>_<tamanho>.sst
+                             arquivos de tabela, compartilhados entre backups
+    
+    Um backup só existe depois que seu arquivo em meta/ é gravado; sobras de
+    um backup interrompido são removidas ao abrir o BackupEngine.
+    """
+    
+    def __init__(self, backup_dir: str):
+        self.backup_dir = backup_dir
+        for sub in ("meta", "private", "shared"):
+            os.makedirs(os.path.join(backup_dir, sub), exist_ok=True)
+        # crc32 de arquivos de tabela já lidos, pela identidade do arquivo no disco
+        self._checksums: Dict[Tuple[int, int, int, int], int] = {}
+        self._garbage_collect()
+    
+    def _meta_file(self, backup_id: int) -> str:
+        return os.path.join(self.backup_dir, "meta", str(backup_id))
+    
+    def _backup_ids(self) -> List[int]:
+        return sorted(int(name) for name in os.listdir(os.path.join(self.backup_dir, "meta"))
+                      if name.isdigit())
+    
+    def _load_meta(self, backup_id: int) -> dict:
+        path = self._meta_file(backup_id)
+        if not os.path.exists(path):
+            raise ValueError(f"Backup {backup_id} not found")
+        with open(path, 'r') as f:
+            return json.load(f)
+    
+    def _table_checksum(self, path: str) -> int:
+        """crc32 de um arquivo de tabela do banco, lido uma vez por arquivo"""
+        st = os.stat(path)
+        identity = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+        crc = self._checksums.get(identity)
+        if crc is None:
+            crc = _file_checksum(path)
+            self._checksums[identity] = crc
+        return crc
+    
+    def create_new_backup(self, db, app_metadata: str = "", flush_before_backup: bool = False) -> int:
+        """Copia o estado atual do banco para um novo backup e retorna seu id
+        
+        Com flush_before_backup, as memtables são gravadas antes e o backup
+        quase não carrega logs.
+        """
+        if flush_before_backup:
+            for handle in db.column_families:
+                db.flush(handle)
+        ids = self._backup_ids()
+        backup_id = ids[-1] + 1 if ids else 1
+        private_dir = os.path.join(self.backup_dir, "private", str(backup_id))
+        shutil.rmtree(private_dir, ignore_errors=True)
+        os.makedirs(private_dir)
+        
+        files = []
+        db.disable_file_deletions()
+        try:
+            for info in db.get_live_files_storage_info():
+                src = os.path.join(db.db_path, info.relative_filename)
+                if info.replacement_contents is not None:
+                    path = os.path.join("private", str(backup_id), info.relative_filename)
+                    crc = _write_file(os.path.join(self.backup_dir, path), info.replacement_contents)
+                elif info.file_type == "table":
+                    crc = self._table_checksum(src)
+                    number, _ = parse_file_name(info.relative_filename)
+                    path = os.path.join("shared", f"{number:06d}_{crc:08x}_{info.size}.sst")
+                    target = os.path.join(self.backup_dir, path)
+                    if not os.path.exists(target):
+                        # Copiado com outro nome e renomeado só quando completo
+                        if _copy_file(src, target + ".tmp", info.size) != crc:
+                            os.remove(target + ".tmp")
+                            raise IOError(f"Table file changed during backup: {src}")
+                        os.replace(target + ".tmp", target)
+                else:
+                    path = os.path.join("private", str(backup_id), info.relative_filename)
+                    crc = _copy_file(src, os.path.join(self.backup_dir, path), info.size)
+                files.append({'name': info.relative_filename, 'path': path,
+                              'size': info.size, 'crc32': crc})
+        except Exception:
+            shutil.rmtree(private_dir, ignore_errors=True)
+            raise
+        finally:
+            db.enable_file_deletions()
+        
+        meta = {'backup_id': backup_id, 'timestamp': time.time(),
+                'app_metadata': app_metadata, 'files': files}
+        _write_file(self._meta_file(backup_id), json.dumps(meta).encode())
+        return backup_id
+    
+    def get_backup_info(self) -> List[BackupInfo]:
+        result = []
+        for backup_id in self._backup_ids():
+            meta = self._load_meta(backup_id)
+            result.append(BackupInfo(backup_id, meta['timestamp'],
+                                     sum(f['size'] for f in meta['files']),
+                                     len(meta['files']), meta.get('app_metadata', "")))
+        return result
+    
+    def verify_backup(self, backup_id: int):
+        """Confere tamanho e crc32 de todos os arquivos do backup; IOError se algum diverge"""
+        for f in self._load_meta(backup_id)['files']:
+            path = os.path.join(self.backup_dir, f['path'])
+            if not os.path.exists(path):
+                raise IOError(f"Backup {backup_id} is missing {f['path']}")
+            if os.path.getsize(path) != f['size']:
+                raise IOError(f"Size mismatch in backup {backup_id}: {f['path']}")
+            if _file_checksum(path) != f['crc32']:
+                raise IOError(f"Checksum mismatch in backup {backup_id}: {f['path']}")
+    
+    def restore_db_from_backup(self, backup_id: int, db_dir: str):
+        """Recria o banco em db_dir a partir do backup; o banco não pode estar aberto
+        
+        Os arquivos do banco já existentes em db_dir são removidos. Cada
+        arquivo copiado tem o crc32 conferido, e o MANIFEST é gravado por
+        último.
+        """
+        files = self._load_meta(backup_id)['files']
+        os.makedirs(db_dir, exist_ok=True)
+        for name in os.listdir(db_dir):
+            if parse_file_name(name) is not None or name.startswith(MANIFEST_FILE):
+                os.remove(os.path.join(db_dir, name))
+        files = sorted(files, key=lambda f: f['name'] == MANIFEST_FILE)
+        for f in files:
+            target = os.path.join(db_dir, f['name'])
+            if _copy_file(os.path.join(self.backup_dir, f['path']), target) != f['crc32']:
+                os.remove(target)
+                raise IOError(f"Checksum mismatch in backup {backup_id}: {f['path']}")
+    
+    def restore_db_from_latest_backup(self, db_dir: str):
+        ids = self._backup_ids()
+        if not ids:
+            raise ValueError("No backups found")
+        self.restore_db_from_backup(ids[-1], db_dir)
+    
+    def delete_backup(self, backup_id: int):
+        """Remove o backup e os arquivos de tabela que nenhum outro usa"""
+        self._load_meta(backup_id)
+        os.remove(self._meta_file(backup_id))
+        self._garbage_collect()
+    
+    def purge_old_backups(self, num_backups_to_keep: int):
+        """Mantém só os num_backups_to_keep backups mais recentes"""
+        ids = self._backup_ids()
+        for backup_id in ids[:max(0, len(ids) - num_backups_to_keep)]:
+            os.remove(self._meta_file(backup_id))
+        self._garbage_collect()
+    
+    def _garbage_collect(self):
+        """Remove pastas privadas e arquivos compartilhados que nenhum backup referencia"""
+        ids = self._backup_ids()
+        referenced = set()
+        for backup_id in ids:
+            referenced.update(f['path'] for f in self._load_meta(backup_id)['files'])
+        private_root = os.path.join(self.backup_dir, "private")
+        for name in os.listdir(private_root):
+            if not name.isdigit() or int(name) not in ids:
+                shutil.rmtree(os.path.join(private_root, name), ignore_errors=True)
+        shared_root = os.path.join(self.backup_dir, "shared")
+        for name in os.listdir(shared_root):
+            if os.path.join("shared", name) not in referenced:
+                os.remove(os.path.join(shared_root, name))
+
+def _file_checksum(path: str) -> int:
+    crc = 0
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(COPY_CHUNK_SIZE)
+            if not chunk:
+                return crc
+            crc = zlib.crc32(chunk, crc)
+
+def _copy_file(src: str, dst: str, size: Optional[int] = None) -> int:
+    """Copia um arquivo (ou só os primeiros size bytes), sincroniza e retorna o crc32 da cópia"""
+    crc = 0
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        remaining = size
+        while remaining is None or remaining > 0:
+            chunk = fsrc.read(COPY_CHUNK_SIZE if remaining is None else min(remaining, COPY_CHUNK_SIZE))
+            if not chunk:
+                break
+            fdst.write(chunk)
+            crc = zlib.crc32(chunk, crc)
+            if remaining is not None:
+                remaining -= len(chunk)
+        fdst.flush()
+        os.fsync(fdst.fileno())
+    return crc
+
+def _write_file(path: str, contents: bytes) -> int:
+    """Grava o conteúdo atomicamente (arquivo temporário + rename) e retorna seu crc32"""
+    tmp = path + ".tmp"
+    with open(tmp, 'wb') as f:
+        f.write(contents)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return zlib.crc32(contents)
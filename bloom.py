@@ -0,0 +1,81 @@
+"""
+Filtros de Bloom usados para descartar arquivos de tabela em leituras
+pontuais e em iterações por prefixo
+"""
+
+import math
+import zlib
+from typing import Iterable
+
+def _hash(key: bytes) -> int:
+    return zlib.crc32(key, 0xBC9F1D34)
+
+class BloomFilterPolicy:
+    """Cria e consulta filtros de Bloom com um número fixo de bits por chave"""
+    
+    def __init__(self, bits_per_key: int):
+        self.bits_per_key = bits_per_key
+        # Número ótimo de funções hash: bits_per_key * ln(2)
+        self.num_probes = min(30, max(1, int(bits_per_key * math.log(2))))
+    
+    def create_filter(self, keys: Iterable[bytes]) -> bytes:
+        """Gera o filtro: vetor de bits seguido do número de funções hash"""
+        keys = list(keys)
+        bits = max(64, len(keys) * self.bits_per_key)
+        num_bytes = (bits + 7) // 8
+        bits = num_bytes * 8
+        array = bytearray(num_bytes)
+        for key in keys:
+            # Hash duplo: cada sonda deriva da anterior somando um delta
+            h = _hash(key)
+            delta = ((h >> 17) | (h << 15)) & 0xFFFFFFFF
+            for _ in range(self.num_probes):
+                pos = h % bits
+                array[pos >> 3] |= 1 << (pos & 7)
+                h = (h + delta) & 0xFFFFFFFF
+        array.append(self.num_probes)
+        return bytes(array)
+    
+    @staticmethod
+    def key_may_match(key: bytes, bloom_filter: bytes) -> bool:
+        """False garante que a chave não está no conjunto; True pode ser falso positivo"""
+        if len(bloom_filter) < 2:
+            return True
+        num_probes = bloom_filter[-1]
+        bits = (len(bloom_filter) - 1) * 8
+        h = _hash(key)
+        delta = ((h >> 17) | (h << 15)) & 0xFFFFFFFF
+        for _ in range(num_probes):
+            pos = h % bits
+            if not bloom_filter[pos >> 3] & (1 << (pos & 7)):
+                return False
+            h = (h + delta) & 0xFFFFFFFF
+        return True
+
+class DynamicBloom:
+    """Filtro de Bloom de tamanho fixo que aceita inserções (usado na memtable)"""
+    
+    def __init__(self, num_bits: int, num_probes: int = 6):
+        self._bits = max(64, (num_bits + 7) // 8 * 8)
+        self._array = bytearray(self._bits // 8)
+        self.num_probes = num_probes
+    
+    def add(self, key: bytes):
+        bits, array = self._bits, self._array
+        h = _hash(key)
+        delta = ((h >> 17) | (h << 15)) & 0xFFFFFFFF
+        for _ in range(self.num_probes):
+            pos = h % bits
+            array[pos >> 3] |= 1 << (pos & 7)
+            h = (h + delta) & 0xFFFFFFFF
+    
+    def may_contain(self, key: bytes) -> bool:
+        bits, array = self._bits, self._array
+        h = _hash(key)
+        delta = ((h >> 17) | (h << 15)) & 0xFFFFFFFF
+        for _ in range(self.num_probes):
+            pos = h % bits
+            if not array[pos >> 3] & (1 << (pos & 7)):
+                return False
+            h = (h + delta) & 0xFFFFFFFF
+        return True
@@ -0,0 +1,60 @@
+"""
+Cache LRU de blocos decodificados, limitado em bytes
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+class LRUCache:
+    """Cache LRU thread-safe com orçamento em bytes
+    
+    Pode ser compartilhado entre todos os leitores de tabela de um banco e,
+    via Options.block_cache, entre várias instâncias do banco.
+    """
+    
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.usage = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def lookup(self, key: Hashable) -> Optional[Any]:
+        """Retorna o valor e o marca como usado recentemente, ou None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+    
+    def insert(self, key: Hashable, value: Any, charge: int):
+        """Insere um valor, removendo os menos usados se o orçamento estourar"""
+        if charge > self.capacity:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.usage -= old[1]
+            self._entries[key] = (value, charge)
+            self.usage += charge
+            while self.usage > self.capacity:
+                _, (_, evicted_charge) = self._entries.popitem(last=False)
+                self.usage -= evicted_charge
+    
+    def erase(self, key: Hashable):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.usage -= entry[1]
+    
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
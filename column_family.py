@@ -0,0 +1,44 @@
+"""
+Famílias de colunas: espaços de chaves independentes dentro do mesmo banco
+Cada família tem suas opções, memtables, arquivos de tabela e compactação;
+o write-ahead log, os números de sequência e o MANIFEST são compartilhados
+"""
+
+from typing import Dict, Optional
+
+from memtable import MemTable
+from version_set import Version
+
+class ColumnFamilyHandle:
+    """Identifica uma família em get, put, delete, iteradores e WriteBatch"""
+    
+    __slots__ = ("id", "name")
+    
+    def __init__(self, id: int, name: str):
+        self.id = id
+        self.name = name
+    
+    def __repr__(self):
+        return f"ColumnFamilyHandle({self.id}, {self.name!r})"
+
+class ColumnFamilyData:
+    """Estado de uma família: opções, memtables e versão atual dos arquivos"""
+    
+    def __init__(self, id: int, name: str, options):
+        self.id = id
+        self.name = name
+        self.options = options
+        self.handle = ColumnFamilyHandle(id, name)
+        self.current = Version(tuple(() for _ in range(options.num_levels)))
+        self.mem = self.new_memtable()
+        self.imm: Optional[MemTable] = None
+        # Logs com número menor que este não têm dados da família fora das tabelas
+        self.log_number = 0
+        # Valor de log_number depois que imm for gravada
+        self.imm_log_number = 0
+        self.compact_pointers: Dict[int, bytes] = {}
+        self.dropped = False
+    
+    def new_memtable(self) -> MemTable:
+        bits = int(self.options.write_buffer_size * self.options.memtable_prefix_bloom_size_ratio * 8)
+        return MemTable(self.options.prefix_extractor, bits)
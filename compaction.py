@@ -0,0 +1,318 @@
+"""
+Compactação por níveis (leveled compaction)
+Combina arquivos de um nível com os arquivos sobrepostos do nível seguinte,
+descartando versões sobrescritas e marcadores de deleção que não escondem
+mais nada. Versões antigas sobrevivem enquanto algum snapshot ainda as enxerga;
+chaves cobertas por range tombstones são removidas fisicamente e o filtro de
+compactação da família (Options.compaction_filter) remove ou reescreve valores
+"""
+
+from bisect import bisect_left
+
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import stats
+from compression import compression_for_level
+from dbformat import TYPE_DELETE, TYPE_MERGE, TYPE_PUT, table_file_name
+from merging_iterator import MergingIterator
+from range_del import FragmentedRangeTombstones, RangeTombstone
+from rate_limiter import IO_LOW
+from table import TableBuilder, TableIterator, TableReader
+from version_set import FileMetaData, LevelIterator, Version
+
+class Compaction:
+    """Entradas de uma compactação: arquivos de `level` e de `level + 1`"""
+    
+    def __init__(self, version: Version, level: int, inputs: List[FileMetaData],
+                 manual: bool = False):
+        self.version = version
+        self.level = level
+        self.output_level = level + 1
+        self.inputs = inputs
+        self.manual = manual
+        smallest = min(f.smallest for f in inputs)
+        largest = max(f.largest for f in inputs)
+        self.next_level_inputs = version.overlapping_files(self.output_level, smallest, largest)
+    
+    def all_inputs(self):
+        """Pares (nível, arquivo) de todas as entradas"""
+        return ([(self.level, f) for f in self.inputs] +
+                [(self.output_level, f) for f in self.next_level_inputs])
+    
+    def is_trivial_move(self) -> bool:
+        """Um único arquivo sem sobreposição pode só mudar de nível, sem reescrita"""
+        return not self.manual and len(self.inputs) == 1 and not self.next_level_inputs
+
+def max_bytes_for_level(options, level: int) -> int:
+    """Tamanho alvo de um nível >= 1"""
+    return int(options.max_bytes_for_level_base *
+               options.max_bytes_for_level_multiplier ** (level - 1))
+
+def compaction_score(version: Version, options, level: int) -> float:
+    """Pontuação >= 1 indica que o nível precisa ser compactado"""
+    if level == 0:
+        return len(version.levels[0]) / options.level0_file_num_compaction_trigger
+    return version.level_bytes(level) / max_bytes_for_level(options, level)
+
+def pick_compaction(version: Version, options, compact_pointers: dict) -> Optional[Compaction]:
+    """Escolhe o nível com maior pontuação e os arquivos a compactar"""
+    best_level, best_score = None, 1.0
+    for level in range(version.num_levels - 1):
+        score = compaction_score(version, options, level)
+        if score >= best_score:
+            best_level, best_score = level, score
+    if best_level is None:
+        return None
+    
+    if best_level == 0:
+        # Arquivos do nível 0 se sobrepõem: compacta todos juntos
+        return Compaction(version, 0, list(version.levels[0]))
+    
+    # Nos outros níveis, percorre o espaço de chaves em rodízio
+    files = version.levels[best_level]
+    pointer = compact_pointers.get(best_level)
+    chosen = files[0]
+    if pointer is not None:
+        for f in files:
+            if f.largest > pointer:
+                chosen = f
+                break
+    return Compaction(version, best_level, [chosen])
+
+def compaction_for_range(version: Version, level: int, begin: Optional[bytes],
+                         end: Optional[bytes]) -> Optional[Compaction]:
+    """Compactação manual dos arquivos do nível que tocam [begin, end]"""
+    inputs = version.overlapping_files(level, begin, end)
+    if not inputs:
+        return None
+    if level == 0:
+        # Expande para todos os arquivos do nível 0 que se sobrepõem às entradas
+        while True:
+            smallest = min(f.smallest for f in inputs)
+            largest = max(f.largest for f in inputs)
+            expanded = version.overlapping_files(0, smallest, largest)
+            if len(expanded) == len(inputs):
+                break
+            inputs = expanded
+    return Compaction(version, level, inputs, manual=True)
+
+def visible_versions(versions: List[Tuple[int, int, Optional[bytes]]],
+                     snapshots: Sequence[int], key: bytes = b"", merge_operator=None,
+                     bottommost: bool = False) -> List[Tuple[int, int, Optional[bytes]]]:
+    """Mantém só a versão mais nova de cada faixa entre snapshots
+    
+    snapshots são os números de sequência dos snapshots vivos, em ordem
+    crescente. Uma versão que nenhum snapshot (nem a leitura atual) consegue
+    enxergar é descartada.
+    
+    Se a versão mais nova da faixa é um operando de merge, os operandos da
+    faixa são combinados pelo merge_operator com o put ou delete que os
+    segue na mesma faixa (ou com nada, se bottommost indica que a chave não
+    existe em outro lugar) e viram um put. Sem essa base, são combinados
+    entre si quando o operador permite; sem operador, ficam todos.
+    """
+    if len(versions) == 1 and (versions[0][1] != TYPE_MERGE or not bottommost or merge_operator is None):
+        return versions
+    kept = []
+    last_stripe = None
+    i = 0
+    while i < len(versions):
+        version = versions[i]
+        # Faixa = índice do snapshot mais antigo que enxerga a versão
+        stripe = bisect_left(snapshots, version[0])
+        if stripe == last_stripe:
+            i += 1
+            continue
+        last_stripe = stripe
+        if version[1] != TYPE_MERGE:
+            kept.append(version)
+            i += 1
+            continue
+        j = i + 1
+        while j < len(versions) and versions[j][1] == TYPE_MERGE and \
+                bisect_left(snapshots, versions[j][0]) == stripe:
+            j += 1
+        base_in_stripe = j < len(versions) and bisect_left(snapshots, versions[j][0]) == stripe
+        if merge_operator is None:
+            kept.extend(versions[i:j + 1] if base_in_stripe else versions[i:j])
+        elif base_in_stripe or (j == len(versions) and bottommost):
+            base = versions[j] if base_in_stripe else None
+            existing = base[2] if base is not None and base[1] == TYPE_PUT else None
+            operands = [v[2] for v in reversed(versions[i:j])]
+            kept.append((version[0], TYPE_PUT, merge_operator.full_merge(key, existing, operands)))
+        else:
+            kept.extend(_partial_merge(key, versions[i:j], merge_operator))
+        i = j + 1 if base_in_stripe else j
+    return kept
+
+def _partial_merge(key: bytes, merges, merge_operator):
+    """Combina operandos consecutivos em um só, se o operador souber fazer isso sem a base"""
+    value = merges[-1][2]
+    for version in reversed(merges[:-1]):
+        value = merge_operator.partial_merge(key, value, version[2])
+        if value is None:
+            return merges
+    return [(merges[0][0], TYPE_MERGE, value)]
+
+class CompactionJob:
+    """Executa uma compactação gravando os arquivos de saída do próximo nível"""
+    
+    def __init__(self, compaction: Compaction, db_path: str, options,
+                 new_file_number: Callable[[], int],
+                 get_table: Callable[[FileMetaData], TableReader],
+                 statistics: stats.Statistics, snapshots: Sequence[int] = (),
+                 rate_limiter=None):
+        self.compaction = compaction
+        self.db_path = db_path
+        self.options = options
+        self._new_file_number = new_file_number
+        self._get_table = get_table
+        self.statistics = statistics
+        self.snapshots = sorted(snapshots)
+        self.rate_limiter = rate_limiter
+        self.outputs: List[FileMetaData] = []
+        # Range tombstones ainda não gravados, em ordem de início, e o maior
+        # fim entre os já gravados no arquivo de saída aberto
+        self._pending_tombstones: List[RangeTombstone] = []
+        self._output_max_end: Optional[bytes] = None
+    
+    def _new_table_iterator(self, f: FileMetaData) -> TableIterator:
+        return TableIterator(self._get_table(f))
+    
+    def _tombstone_obsolete(self, tombstone: RangeTombstone) -> bool:
+        """Um range tombstone pode sumir quando todos os snapshots o enxergam e
+        nenhum nível mais profundo tem chaves no intervalo"""
+        sequence, begin, end = tombstone
+        c = self.compaction
+        if bisect_left(self.snapshots, sequence) != 0:
+            return False
+        return not any(c.version.overlapping_files(level, begin, end)
+                       for level in range(c.output_level + 1, c.version.num_levels))
+    
+    def run(self) -> List[FileMetaData]:
+        """Combina as entradas e retorna os novos arquivos"""
+        c = self.compaction
+        # Filhos do mais novo para o mais antigo: nível 0 já vem nessa ordem
+        children = [self._new_table_iterator(f) for f in c.inputs] if c.level == 0 else \
+            [LevelIterator(tuple(c.inputs), self._new_table_iterator)]
+        if c.next_level_inputs:
+            children.append(LevelIterator(tuple(c.next_level_inputs), self._new_table_iterator))
+        it = MergingIterator(children)
+        
+        input_entries = sum(f.num_entries for _, f in c.all_inputs())
+        input_bytes = sum(f.file_size for _, f in c.all_inputs())
+        dropped_deletes = 0
+        dropped_range_del = 0
+        dropped_user = 0
+        # Valores removidos pelo filtro que nem o marcador de deleção precisou manter
+        filtered_vanished = 0
+        compaction_filter = self.options.compaction_filter
+        output = None
+        full = False
+        
+        tombstones = [t for _, f in c.all_inputs() if self._get_table(f).range_del is not None
+                      for t in self._get_table(f).range_del.tombstones]
+        range_del = FragmentedRangeTombstones(tombstones) if tombstones else None
+        self._pending_tombstones = sorted((t for t in tombstones if not self._tombstone_obsolete(t)),
+                                          key=lambda t: (t[1], t[2]))
+        
+        it.seek_to_first()
+        while it.valid():
+            key = it.key()
+            versions = it.versions()
+            if range_del is not None:
+                count = len(versions)
+                versions = [v for v in versions
+                            if not range_del.covered_in_stripe(key, v[0], self.snapshots)]
+                dropped_range_del += count - len(versions)
+                if not versions:
+                    it.next()
+                    continue
+            if self.options.merge_operator is not None:
+                # Operandos sem base só viram put se a chave não existe mais abaixo
+                bottommost = not c.version.key_in_deeper_levels(c.output_level, key)
+                versions = visible_versions(versions, self.snapshots, key,
+                                            self.options.merge_operator, bottommost)
+            else:
+                versions = visible_versions(versions, self.snapshots)
+            filtered = False
+            if (compaction_filter is not None and versions[0][1] == TYPE_PUT
+                    and bisect_left(self.snapshots, versions[0][0]) == len(self.snapshots)):
+                # Nenhum snapshot enxerga o valor mais novo: o filtro decide seu destino
+                sequence, _, value = versions[0]
+                new_value = compaction_filter.filter(c.level, key, value)
+                if new_value is None:
+                    # Vira marcador de deleção, que ainda esconde as versões mais antigas
+                    versions = [(sequence, TYPE_DELETE, None)] + versions[1:]
+                    dropped_user += 1
+                    filtered = True
+                elif new_value != value:
+                    versions = [(sequence, TYPE_PUT, new_value)] + versions[1:]
+            # O marcador mais antigo pode sumir se nenhum nível mais profundo tiver a chave
+            if versions[-1][1] == TYPE_DELETE and not c.version.key_in_deeper_levels(c.output_level, key):
+                if filtered and len(versions) == 1:
+                    filtered_vanished += 1
+                else:
+                    dropped_deletes += 1
+                versions = versions[:-1]
+            if versions:
+                if full and self._can_split_before(key):
+                    self._finish_output(output)
+                    output = None
+                if output is None:
+                    output = self._open_output()
+                self._add_tombstones(output[1], key)
+                output[1].add(key, versions)
+                full = output[1].file_size >= self.options.target_file_size_base
+            it.next()
+        if self._pending_tombstones and output is None:
+            output = self._open_output()
+        if output is not None:
+            self._add_tombstones(output[1], None)
+            self._finish_output(output)
+        
+        output_entries = sum(f.num_entries for f in self.outputs)
+        self.statistics.record_tick(stats.COMPACT_READ_BYTES, input_bytes)
+        self.statistics.record_tick(stats.COMPACT_WRITE_BYTES, sum(f.file_size for f in self.outputs))
+        self.statistics.record_tick(stats.COMPACTION_KEY_DROP_OBSOLETE, dropped_deletes)
+        self.statistics.record_tick(stats.COMPACTION_KEY_DROP_RANGE_DEL, dropped_range_del)
+        self.statistics.record_tick(stats.COMPACTION_KEY_DROP_USER, dropped_user)
+        self.statistics.record_tick(stats.COMPACTION_KEY_DROP_NEWER_ENTRY,
+                                    input_entries - output_entries - dropped_deletes - dropped_range_del
+                                    - filtered_vanished)
+        return self.outputs
+    
+    def _add_tombstones(self, builder: TableBuilder, key: Optional[bytes]):
+        """Grava no arquivo aberto os range tombstones que começam até key (None = todos)"""
+        pending = self._pending_tombstones
+        n = 0
+        while n < len(pending) and (key is None or pending[n][1] <= key):
+            sequence, begin, end = pending[n]
+            builder.add_range_tombstone(sequence, begin, end)
+            if self._output_max_end is None or end > self._output_max_end:
+                self._output_max_end = end
+            n += 1
+        del pending[:n]
+    
+    def _can_split_before(self, key: bytes) -> bool:
+        """Um novo arquivo pode começar em key se nenhum range tombstone gravado
+        no atual o atravessa: os arquivos do nível não podem se sobrepor"""
+        if self._output_max_end is None:
+            return True
+        start = key
+        if self._pending_tombstones and self._pending_tombstones[0][1] < start:
+            start = self._pending_tombstones[0][1]
+        return self._output_max_end < start
+    
+    def _open_output(self) -> Tuple[int, TableBuilder]:
+        number = self._new_file_number()
+        return number, TableBuilder(table_file_name(self.db_path, number), self.options,
+                                    compression_for_level(self.options, self.compaction.output_level),
+                                    self.statistics, rate_limiter=self.rate_limiter, io_priority=IO_LOW)
+    
+    def _finish_output(self, output: Tuple[int, TableBuilder]):
+        number, builder = output
+        file_size = builder.finish()
+        smallest, largest = builder.key_range()
+        self.outputs.append(FileMetaData(number, file_size, smallest, largest, builder.num_entries))
+        self._output_max_end = None
@@ -0,0 +1,38 @@
+"""
+Filtros de compactação: remover ou reescrever chaves enquanto são compactadas
+O filtro da família (Options.compaction_filter) recebe o valor mais novo de
+cada chave que passa por uma compactação e decide mantê-lo, trocá-lo ou
+removê-lo; a expiração de dados sai de graça, sem varreduras nem delete()
+"""
+
+from typing import Optional
+
+class CompactionFilter:
+    """Interface de um filtro de compactação
+    
+    filter é chamado com o nível de origem da compactação, a chave e o valor
+    mais novo (só valores gravados com put; operandos de merge e deleções
+    não passam pelo filtro). Retorna o valor a manter, o mesmo ou um novo,
+    ou None para remover a chave. Versões que algum snapshot enxerga não
+    são filtradas. O filtro roda na thread de segundo plano e deve ser
+    rápido e sem efeitos colaterais.
+    """
+    
+    def name(self) -> str:
+        raise NotImplementedError
+    
+    def filter(self, level: int, key: bytes, existing_value: bytes) -> Optional[bytes]:
+        return existing_value
+
+class CallbackFilter(CompactionFilter):
+    """Filtro a partir de uma função callback(level, key, value) -> Optional[bytes]"""
+    
+    def __init__(self, callback, name: str = "callback"):
+        self._callback = callback
+        self._name = name
+    
+    def name(self) -> str:
+        return self._name
+    
+    def filter(self, level: int, key: bytes, existing_value: bytes) -> Optional[bytes]:
+        return self._callback(level, key, existing_value)
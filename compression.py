@@ -0,0 +1,80 @@
+"""
+Compressão de blocos dos arquivos de tabela com os codecs da biblioteca padrão
+O tipo de compressão é escolhido por nível em Options e gravado no trailer
+de cada bloco, então arquivos com compressões diferentes convivem no banco
+"""
+
+import bz2
+import zlib
+from typing import Tuple
+
+try:
+    import lzma
+except ImportError:  # Python compilado sem liblzma
+    lzma = None
+
+NO_COMPRESSION = "none"
+ZLIB_COMPRESSION = "zlib"
+BZ2_COMPRESSION = "bz2"
+LZMA_COMPRESSION = "lzma"
+
+# Identificador gravado no trailer do bloco para cada tipo de compressão
+COMPRESSION_IDS = {
+    NO_COMPRESSION: 0,
+    ZLIB_COMPRESSION: 2,
+    BZ2_COMPRESSION: 3,
+    LZMA_COMPRESSION: 8,
+}
+_COMPRESSION_NAMES = {v: k for k, v in COMPRESSION_IDS.items()}
+
+# LZMA sem o contêiner .xz: o cabeçalho pesaria em blocos de poucos KB
+_LZMA_FILTERS = [{"id": lzma.FILTER_LZMA2, "preset": 6}] if lzma else None
+
+def compression_for_level(options, level: int) -> str:
+    """Compressão dos arquivos de um nível
+    
+    Usa Options.compression_per_level quando definido (níveis além do fim da
+    lista usam o último item) e Options.compression caso contrário.
+    """
+    per_level = options.compression_per_level
+    if per_level:
+        return per_level[min(level, len(per_level) - 1)]
+    return options.compression
+
+def check_compression(name: str):
+    """Valida o nome do tipo de compressão"""
+    if name not in COMPRESSION_IDS:
+        raise ValueError(f"Unknown compression type: {name!r}")
+    if name == LZMA_COMPRESSION and lzma is None:
+        raise ValueError("lzma compression is not available in this Python build")
+
+def compress(name: str, data: bytes) -> Tuple[int, bytes]:
+    """Comprime um bloco e retorna (identificador, conteúdo)
+    
+    Se a compressão economizar menos de 1/8 do tamanho, o bloco é gravado
+    sem compressão para não pagar a descompressão na leitura.
+    """
+    if name == ZLIB_COMPRESSION:
+        compressed = zlib.compress(data)
+    elif name == BZ2_COMPRESSION:
+        compressed = bz2.compress(data)
+    elif name == LZMA_COMPRESSION:
+        compressed = lzma.compress(data, format=lzma.FORMAT_RAW, filters=_LZMA_FILTERS)
+    else:
+        return COMPRESSION_IDS[NO_COMPRESSION], data
+    if len(compressed) > len(data) - len(data) // 8:
+        return COMPRESSION_IDS[NO_COMPRESSION], data
+    return COMPRESSION_IDS[name], compressed
+
+def decompress(compression_id: int, data: bytes) -> bytes:
+    """Desfaz compress() a partir do identificador gravado no trailer"""
+    name = _COMPRESSION_NAMES.get(compression_id)
+    if name == NO_COMPRESSION:
+        return data
+    if name == ZLIB_COMPRESSION:
+        return zlib.decompress(data)
+    if name == BZ2_COMPRESSION:
+        return bz2.decompress(data)
+    if name == LZMA_COMPRESSION and lzma is not None:
+        return lzma.decompress(data, format=lzma.FORMAT_RAW, filters=_LZMA_FILTERS)
+    raise IOError(f"Unsupported block compression type: {compression_id}")
@@ -0,0 +1,548 @@
+#!/usr/bin/env python3
+"""
+Benchmark no estilo do db_bench do RocksDB
+Executa cargas nomeadas contra um banco do simulador e mede vazão (ops/s e
+MB/s) e a latência de cada operação (percentis). O resumo de cada carga vai
+para stderr e os resultados, em JSON, para stdout ou --json; --compare
+compara dois arquivos de resultado e termina com erro se houver regressão:
+    
+    python db_bench.py --benchmarks fillseq,readrandom --num 100000 --json base.json
+    python db_bench.py --benchmarks fillseq,readrandom --num 100000 --json novo.json
+    python db_bench.py --compare base.json novo.json
+"""
+
+import argparse
+import ast
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import threading
+import time
+from functools import partial
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import rocksdb_simulator as rocksdb
+import ycsb
+from rate_limiter import RateLimiter
+from stats import Histogram
+from ycsb import ValueGenerator
+
+# Tamanho das chaves (número decimal com zeros à esquerda, como no db_bench)
+KEY_SIZE = 16
+
+def make_key(k: int) -> bytes:
+    return b"%016d" % k
+
+class ThreadState:
+    """Estado de uma thread do benchmark: sua fatia de operações e suas medições"""
+    
+    def __init__(self, tid: int, begin: int, end: int, seed: int, value_size: int):
+        self.tid = tid
+        # Fatia [begin, end) das num operações; as cargas sequenciais usam as chaves da fatia
+        self.begin = begin
+        self.end = end
+        self.rng = random.Random(seed)
+        self.values = ValueGenerator(seed, value_size)
+        self.histogram = Histogram()
+        # Latências por tipo de operação, nas cargas com operações mistas
+        self.op_histograms: Dict[str, Histogram] = {}
+        self.ops = 0
+        self.bytes = 0
+        self.found = 0
+    
+    @property
+    def count(self) -> int:
+        return self.end - self.begin
+    
+    def random_keys(self, num: int) -> Iterable[int]:
+        randrange = self.rng.randrange
+        return (randrange(num) for _ in range(self.count))
+
+class Benchmark:
+    """Executa cargas contra o banco em db_path com os parâmetros informados
+    
+    Cada carga divide num operações entre threads; batch_size agrupa as
+    escritas em WriteBatch e define o tamanho dos lotes de multireadrandom.
+    As cargas fill* recriam o banco (salvo com use_existing_db); as demais
+    usam o banco deixado pelas anteriores.
+    """
+    
+    def __init__(self, db_path: str, num: int = 100000, value_size: int = 100, threads: int = 1,
+                 batch_size: int = 1, options: Optional[rocksdb.Options] = None, seed: int = 0,
+                 use_existing_db: bool = False, statistics: bool = False,
+                 ycsb_distribution: Optional[str] = None,
+                 ycsb_custom: Optional[ycsb.Workload] = None):
+        if num <= 0 or value_size < 0 or threads <= 0 or batch_size <= 0:
+            raise ValueError("num, threads and batch_size must be positive and value_size non-negative")
+        self.db_path = db_path
+        self.num = num
+        self.value_size = value_size
+        self.threads = threads
+        self.batch_size = batch_size
+        self.options = options if options is not None else rocksdb.Options()
+        self.options.create_if_missing = True
+        self.seed = seed
+        # Threads criadas desde o início, somando todas as cargas: a semente de
+        # cada thread usa esse número, para cada carga sortear chaves diferentes
+        # das anteriores (mas sempre as mesmas para o mesmo --seed)
+        self._total_thread_count = 0
+        self.use_existing_db = use_existing_db
+        self.statistics = statistics
+        self.db = None
+        self.ycsb_distribution = ycsb_distribution
+        # Numeração das inserções das cargas YCSB, recriada a cada carga
+        self._insert_counter = ycsb.AcknowledgedCounter(num)
+        # Nome -> (função da carga, recria o banco antes)
+        self.workloads: Dict[str, Tuple[Callable[[ThreadState], None], bool]] = {
+            "fillseq": (self.fill_seq, True),
+            "fillrandom": (self.fill_random, True),
+            "overwrite": (self.fill_random, False),
+            "readrandom": (self.read_random, False),
+            "readseq": (self.read_seq, False),
+            "readreverse": (self.read_reverse, False),
+            "seekrandom": (self.seek_random, False),
+            "multireadrandom": (self.multi_read_random, False),
+            "deleterandom": (self.delete_random, False),
+            "ycsbload": (self.ycsb_load, True),
+        }
+        # Cargas YCSB (ycsba a ycsbf e, se definida, ycsbcustom)
+        ycsb_workloads = dict(ycsb.WORKLOADS)
+        if ycsb_custom is not None:
+            ycsb_workloads["custom"] = ycsb_custom
+        for letter, workload in ycsb_workloads.items():
+            if ycsb_distribution is not None:
+                workload = workload.with_distribution(ycsb_distribution)
+            self.workloads["ycsb" + letter] = (partial(self.ycsb_run, workload), False)
+    
+    def config(self) -> dict:
+        """Parâmetros do benchmark, gravados junto dos resultados"""
+        return {
+            'num': self.num, 'key_size': KEY_SIZE, 'value_size': self.value_size,
+            'threads': self.threads, 'batch_size': self.batch_size, 'seed': self.seed,
+            'options': {name: value for name, value in vars(self.options).items()
+                        if isinstance(value, (bool, int, float, str, list)) or value is None},
+            'ycsb_distribution': self.ycsb_distribution,
+            'rate_limiter_bytes_per_sec': (self.options.rate_limiter.get_bytes_per_second()
+                                           if self.options.rate_limiter is not None else None),
+            'python': platform.python_version(),
+        }
+    
+    def open(self, fresh: bool = False):
+        if fresh and self.db is not None:
+            self.close()
+        if fresh and os.path.exists(self.db_path):
+            shutil.rmtree(self.db_path)
+        if self.db is None:
+            self.db = rocksdb.DB(self.db_path, self.options)
+    
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+    
+    def run(self, name: str) -> dict:
+        """Executa uma carga e retorna suas medições"""
+        if name not in self.workloads:
+            raise ValueError(f"Unknown benchmark: {name!r}")
+        workload, fresh = self.workloads[name]
+        self.open(fresh and not self.use_existing_db)
+        self.db.statistics.reset()
+        self._insert_counter = ycsb.AcknowledgedCounter(self.num)
+        
+        share, extra = divmod(self.num, self.threads)
+        states = []
+        begin = 0
+        for tid in range(self.threads):
+            end = begin + share + (1 if tid < extra else 0)
+            self._total_thread_count += 1
+            states.append(ThreadState(tid, begin, end, self.seed * 1000 + self._total_thread_count,
+                                      self.value_size))
+            begin = end
+        
+        limiter = self.options.rate_limiter
+        limiter_wait = limiter.get_total_wait_micros() if limiter is not None else 0.0
+        errors = []
+        
+        def thread_main(state: ThreadState):
+            try:
+                workload(state)
+            except Exception as e:
+                errors.append(e)
+        
+        start = time.perf_counter()
+        if self.threads == 1:
+            thread_main(states[0])
+        else:
+            workers = [threading.Thread(target=thread_main, args=(state,)) for state in states]
+            for t in workers:
+                t.start()
+            for t in workers:
+                t.join()
+        seconds = time.perf_counter() - start
+        if errors:
+            raise errors[0]
+        
+        histogram = Histogram()
+        op_histograms: Dict[str, Histogram] = {}
+        for state in states:
+            histogram.merge(state.histogram)
+            for op, h in state.op_histograms.items():
+                op_histograms.setdefault(op, Histogram()).merge(h)
+        ops = sum(state.ops for state in states)
+        result = {
+            'benchmark': name,
+            'ops': ops,
+            'seconds': seconds,
+            'micros_per_op': seconds * 1e6 / ops if ops else 0.0,
+            'ops_per_sec': ops / seconds if seconds else 0.0,
+            'mb_per_sec': sum(state.bytes for state in states) / 1048576 / seconds if seconds else 0.0,
+            'found': sum(state.found for state in states),
+            'latency_micros': histogram.data().to_dict(),
+        }
+        if op_histograms:
+            result['latency_micros_by_operation'] = {op: h.data().to_dict()
+                                                     for op, h in sorted(op_histograms.items())}
+        if limiter is not None:
+            result['rate_limiter_wait_micros'] = limiter.get_total_wait_micros() - limiter_wait
+        if self.statistics:
+            result['stats'] = self.db.get_property("rocksdb.stats")
+        return result
+    
+    # Cargas: cada função executa a fatia de uma thread
+    
+    def _write(self, state: ThreadState, keys: Iterable[bytes], delete: bool = False):
+        db = self.db
+        value_size = self.value_size
+        add = state.histogram.add
+        perf_counter = time.perf_counter
+        if self.batch_size == 1:
+            for key in keys:
+                start = perf_counter()
+                if delete:
+                    db.delete(key)
+                    state.bytes += len(key)
+                else:
+                    value = state.values.generate(value_size)
+                    db.put(key, value)
+                    state.bytes += len(key) + len(value)
+                add((perf_counter() - start) * 1e6)
+                state.ops += 1
+            return
+        batch = rocksdb.WriteBatch()
+        for key in keys:
+            if delete:
+                batch.delete(key)
+                state.bytes += len(key)
+            else:
+                value = state.values.generate(value_size)
+                batch.put(key, value)
+                state.bytes += len(key) + len(value)
+            if batch.count() == self.batch_size:
+                start = perf_counter()
+                db.write(batch)
+                add((perf_counter() - start) * 1e6)
+                state.ops += batch.count()
+                batch = rocksdb.WriteBatch()
+        if batch.count():
+            start = perf_counter()
+            db.write(batch)
+            add((perf_counter() - start) * 1e6)
+            state.ops += batch.count()
+    
+    def fill_seq(self, state: ThreadState):
+        self._write(state, map(make_key, range(state.begin, state.end)))
+    
+    def fill_random(self, state: ThreadState):
+        self._write(state, map(make_key, state.random_keys(self.num)))
+    
+    def delete_random(self, state: ThreadState):
+        self._write(state, map(make_key, state.random_keys(self.num)), delete=True)
+    
+    def read_random(self, state: ThreadState):
+        db = self.db
+        add = state.histogram.add
+        perf_counter = time.perf_counter
+        for k in state.random_keys(self.num):
+            key = make_key(k)
+            start = perf_counter()
+            value = db.get(key)
+            add((perf_counter() - start) * 1e6)
+            state.ops += 1
+            if value is not None:
+                state.found += 1
+                state.bytes += len(key) + len(value)
+    
+    def multi_read_random(self, state: ThreadState):
+        db = self.db
+        add = state.histogram.add
+        perf_counter = time.perf_counter
+        keys = [make_key(k) for k in state.random_keys(self.num)]
+        for i in range(0, len(keys), self.batch_size):
+            batch = keys[i:i + self.batch_size]
+            start = perf_counter()
+            values = db.multi_get(batch)
+            add((perf_counter() - start) * 1e6)
+            state.ops += len(batch)
+            for key, value in zip(batch, values):
+                if value is not None:
+                    state.found += 1
+                    state.bytes += len(key) + len(value)
+    
+    def _scan(self, state: ThreadState, reverse: bool):
+        it = self.db.iteritems()
+        add = state.histogram.add
+        perf_counter = time.perf_counter
+        if reverse:
+            it.seek_for_prev(make_key(self.num - 1 - state.begin))
+            step = it.prev
+        else:
+            it.seek(make_key(state.begin))
+            step = it.next
+        for _ in range(state.count):
+            if not it.valid():
+                break
+            start = perf_counter()
+            key, value = it.key(), it.value()
+            step()
+            add((perf_counter() - start) * 1e6)
+            state.ops += 1
+            state.found += 1
+            state.bytes += len(key) + len(value)
+    
+    def read_seq(self, state: ThreadState):
+        self._scan(state, reverse=False)
+    
+    def read_reverse(self, state: ThreadState):
+        self._scan(state, reverse=True)
+    
+    def seek_random(self, state: ThreadState):
+        # Um único iterador por thread, como no db_bench
+        it = self.db.iteritems()
+        add = state.histogram.add
+        perf_counter = time.perf_counter
+        for k in state.random_keys(self.num):
+            key = make_key(k)
+            start = perf_counter()
+            it.seek(key)
+            found = it.valid() and it.key() == key
+            add((perf_counter() - start) * 1e6)
+            state.ops += 1
+            if found:
+                state.found += 1
+                state.bytes += len(key) + len(it.value())
+    
+    def ycsb_load(self, state: ThreadState):
+        """Fase de carga do YCSB: grava os registros 0 a num - 1"""
+        self._write(state, map(ycsb.build_key, range(state.begin, state.end)))
+    
+    def ycsb_run(self, workload: ycsb.Workload, state: ThreadState):
+        """Fase de execução do YCSB sobre os registros gravados por ycsbload"""
+        db = self.db
+        counter = self._insert_counter
+        value_size = self.value_size
+        perf_counter = time.perf_counter
+        operations = workload.operations(self.num, counter, state.count, state.rng.getrandbits(64))
+        for op, keynum, scan_length in operations:
+            key = ycsb.build_key(keynum)
+            if op != ycsb.READ and op != ycsb.SCAN:
+                value = state.values.generate(value_size)
+            start = perf_counter()
+            if op == ycsb.READ:
+                value = db.get(key)
+                if value is not None:
+                    state.found += 1
+                    state.bytes += len(key) + len(value)
+            elif op == ycsb.SCAN:
+                it = db.iteritems()
+                it.seek(key)
+                for _ in range(scan_length):
+                    if not it.valid():
+                        break
+                    state.bytes += len(it.key()) + len(it.value())
+                    it.next()
+                state.found += 1
+            elif op == ycsb.READ_MODIFY_WRITE:
+                if db.get(key) is not None:
+                    state.found += 1
+                db.put(key, value)
+                state.bytes += len(key) + len(value)
+            else:
+                db.put(key, value)
+                state.bytes += len(key) + len(value)
+                if op == ycsb.INSERT:
+                    counter.acknowledge(keynum)
+            elapsed = (perf_counter() - start) * 1e6
+            state.histogram.add(elapsed)
+            histogram = state.op_histograms.get(op)
+            if histogram is None:
+                histogram = state.op_histograms[op] = Histogram()
+            histogram.add(elapsed)
+            state.ops += 1
+
+def format_result(result: dict) -> str:
+    """Linha de resumo no formato do db_bench, seguida dos percentis"""
+    latency = result['latency_micros']
+    line = (f"{result['benchmark']:<16}: {result['micros_per_op']:11.3f} micros/op "
+            f"{result['ops_per_sec']:9.0f} ops/sec; {result['mb_per_sec']:7.1f} MB/s")
+    if result['benchmark'].startswith(("read", "seek", "multiread")):
+        line += f" ({result['found']} of {result['ops']} found)"
+    lines = [line, f"{'':<18}P50: {latency['median']:.2f} P99: {latency['percentile99']:.2f} "
+                   f"P99.9: {latency['percentile999']:.2f} Max: {latency['max']:.2f} micros"]
+    for op, latency in result.get('latency_micros_by_operation', {}).items():
+        lines.append(f"{'':<18}{op}: {latency['count']} ops, P50: {latency['median']:.2f} "
+                     f"P99: {latency['percentile99']:.2f} P99.9: {latency['percentile999']:.2f} micros")
+    return "\n".join(lines)
+
+def parse_options(assignments: List[str]) -> rocksdb.Options:
+    """Options com os valores nome=valor aplicados (literais Python ou texto)"""
+    options = rocksdb.Options()
+    for assignment in assignments:
+        name, sep, text = assignment.partition("=")
+        if not sep or not hasattr(options, name):
+            raise ValueError(f"Invalid option: {assignment!r}")
+        try:
+            value = ast.literal_eval(text)
+        except (ValueError, SyntaxError):
+            value = text
+        setattr(options, name, value)
+    return options
+
+def parse_ycsb_mix(text: str) -> ycsb.Workload:
+    """Carga ycsbcustom a partir de op=proporção separados por vírgula"""
+    proportions = {}
+    for item in text.split(","):
+        op, sep, value = item.partition("=")
+        if not sep or op not in (ycsb.READ, ycsb.UPDATE, ycsb.INSERT, ycsb.SCAN, ycsb.READ_MODIFY_WRITE):
+            raise ValueError(f"Invalid YCSB mix entry: {item!r}")
+        proportions[op] = float(value)
+    return ycsb.Workload("custom", proportions.get(ycsb.READ, 0.0), proportions.get(ycsb.UPDATE, 0.0),
+                         proportions.get(ycsb.INSERT, 0.0), proportions.get(ycsb.SCAN, 0.0),
+                         proportions.get(ycsb.READ_MODIFY_WRITE, 0.0))
+
+def run_benchmarks(benchmark: Benchmark, names: List[str], out=sys.stderr) -> dict:
+    """Executa as cargas em ordem e retorna o documento de resultados"""
+    results = []
+    try:
+        for name in names:
+            result = benchmark.run(name)
+            print(format_result(result), file=out)
+            if 'stats' in result:
+                print(result['stats'], file=out)
+            results.append(result)
+    finally:
+        benchmark.close()
+    return {'config': benchmark.config(), 'results': results}
+
+def compare_results(base: dict, new: dict, threshold: float = 5.0,
+                    latency_threshold: Optional[float] = None) -> Tuple[List[str], List[str]]:
+    """Compara dois documentos de resultados, carga a carga
+    
+    Retorna as linhas do relatório e os nomes das cargas cuja vazão caiu
+    mais que threshold por cento ou cuja latência p50 ou p99 subiu mais que
+    latency_threshold por cento (None = threshold).
+    """
+    if latency_threshold is None:
+        latency_threshold = threshold
+    base_results = {r['benchmark']: r for r in base['results']}
+    lines = [f"{'benchmark':<16} {'base ops/s':>12} {'new ops/s':>12} {'change':>8} "
+             f"{'base p50':>10} {'new p50':>10} {'change':>8} "
+             f"{'base p99':>10} {'new p99':>10} {'change':>8}"]
+    regressions = []
+    for result in new['results']:
+        name = result['benchmark']
+        old = base_results.get(name)
+        if old is None:
+            continue
+        ops_change = _change(old['ops_per_sec'], result['ops_per_sec'])
+        line = f"{name:<16} {old['ops_per_sec']:12.0f} {result['ops_per_sec']:12.0f} {ops_change:+7.1f}%"
+        reasons = ["vazão"] if ops_change < -threshold else []
+        for key, label in (('median', "p50"), ('percentile99', "p99")):
+            old_latency = old['latency_micros'][key]
+            new_latency = result['latency_micros'][key]
+            latency_change = _change(old_latency, new_latency)
+            line += f" {old_latency:10.2f} {new_latency:10.2f} {latency_change:+7.1f}%"
+            if latency_change > latency_threshold:
+                reasons.append(label)
+        if reasons:
+            regressions.append(name)
+            line += "  <- regressão (" + ", ".join(reasons) + ")"
+        lines.append(line)
+    if base['config'] != new['config']:
+        lines.append("aviso: as configurações dos dois arquivos são diferentes")
+    return lines, regressions
+
+def _change(old: float, new: float) -> float:
+    return (new - old) / old * 100 if old else 0.0
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark do simulador do RocksDB no estilo do db_bench")
+    parser.add_argument("--benchmarks", default="fillseq,fillrandom,readrandom",
+                        help="cargas separadas por vírgula: " + ", ".join(Benchmark("").workloads))
+    parser.add_argument("--num", type=int, default=100000, help="número de operações por carga")
+    parser.add_argument("--value_size", type=int, default=100)
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--batch_size", type=int, default=1,
+                        help="escritas por WriteBatch e chaves por multi_get")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--db", default="data/db_bench", help="diretório do banco")
+    parser.add_argument("--use_existing_db", action="store_true",
+                        help="não recria o banco nas cargas fill*")
+    parser.add_argument("--option", action="append", default=[], metavar="NOME=VALOR",
+                        help="atributo de Options, p.ex. --option write_buffer_size=1048576")
+    parser.add_argument("--ycsb_distribution", choices=(ycsb.UNIFORM, ycsb.ZIPFIAN, ycsb.LATEST),
+                        help="distribuição das chaves das cargas ycsb* (padrão: a de cada carga)")
+    parser.add_argument("--ycsb_mix", metavar="OP=PROPORÇÃO,...",
+                        help="define a carga ycsbcustom, p.ex. read=0.7,update=0.2,scan=0.1 "
+                             "(operações: read, update, insert, scan, readmodifywrite)")
+    parser.add_argument("--rate_limiter_bytes_per_sec", type=int, default=0,
+                        help="limita as gravações de flush e compactação (0 = sem limite)")
+    parser.add_argument("--statistics", action="store_true",
+                        help="inclui rocksdb.stats de cada carga")
+    parser.add_argument("--json", metavar="ARQUIVO", help="grava os resultados aqui em vez de stdout")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NOVO"),
+                        help="compara dois arquivos de resultados")
+    parser.add_argument("--threshold", type=float, default=5.0,
+                        help="queda de vazão (%%) considerada regressão em --compare")
+    parser.add_argument("--latency_threshold", type=float,
+                        help="aumento de latência p50/p99 (%%) considerado regressão em "
+                             "--compare (padrão: --threshold)")
+    args = parser.parse_args(argv)
+    
+    if args.compare:
+        with open(args.compare[0]) as f:
+            base = json.load(f)
+        with open(args.compare[1]) as f:
+            new = json.load(f)
+        lines, regressions = compare_results(base, new, args.threshold, args.latency_threshold)
+        print("\n".join(lines))
+        return 1 if regressions else 0
+    
+    try:
+        options = parse_options(args.option)
+        if args.rate_limiter_bytes_per_sec:
+            options.rate_limiter = RateLimiter(args.rate_limiter_bytes_per_sec)
+        custom = parse_ycsb_mix(args.ycsb_mix) if args.ycsb_mix else None
+        benchmark = Benchmark(args.db, args.num, args.value_size, args.threads, args.batch_size,
+                              options, args.seed, args.use_existing_db, args.statistics,
+                              args.ycsb_distribution, custom)
+        names = [name for name in args.benchmarks.split(",") if name]
+        for name in names:
+            if name not in benchmark.workloads:
+                raise ValueError(f"Unknown benchmark: {name!r}")
+    except ValueError as e:
+        parser.error(str(e))
+    
+    document = run_benchmarks(benchmark, names)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(document, f, indent=2)
+    else:
+        json.dump(document, sys.stdout, indent=2)
+        print()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
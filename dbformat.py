@@ -0,0 +1,39 @@
+"""
+Formato interno compartilhado entre log, memtable e arquivos de tabela
+"""
+
+import os
+from typing import Optional, Tuple
+
+# Tipos de registro
+TYPE_DELETE = 0
+TYPE_PUT = 1
+# Operando de merge, combinado pelo Options.merge_operator da família
+TYPE_MERGE = 2
+# Range tombstone: a chave é o início e o valor é o fim (exclusivo) do intervalo
+TYPE_RANGE_DELETION = 15
+# Só no write-ahead log: operações de uma família de colunas que não é a
+# "default", seguidas do id da família
+TYPE_COLUMN_FAMILY_DELETE = 4
+TYPE_COLUMN_FAMILY_PUT = 5
+TYPE_COLUMN_FAMILY_MERGE = 6
+TYPE_COLUMN_FAMILY_RANGE_DELETION = 14
+
+MANIFEST_FILE = "MANIFEST"
+
+DEFAULT_COLUMN_FAMILY_NAME = "default"
+
+def log_file_name(db_path: str, number: int) -> str:
+    """Caminho do arquivo de log com o número informado"""
+    return os.path.join(db_path, f"{number:06d}.log")
+
+def table_file_name(db_path: str, number: int) -> str:
+    """Caminho do arquivo de tabela ordenada com o número informado"""
+    return os.path.join(db_path, f"{number:06d}.sst")
+
+def parse_file_name(name: str) -> Optional[Tuple[int, str]]:
+    """Extrai (número, extensão) de um nome de arquivo do banco"""
+    stem, _, ext = name.partition(".")
+    if not stem.isdigit() or ext not in ("log", "sst"):
+        return None
+    return int(stem), ext
@@ -2,11 +2,16 @@ import rocksdb_simulator as rocksdb
 import os
 import shutil
 import random
+import sys
+from db_bench import Benchmark, run_benchmarks
 from utils import MetricsCollector, DataGenerator, get_directory_size
 
 class BenchmarkDemo:
-    def __init__(self, db_path="data/benchmark_demo"):
+    def __init__(self, db_path="data/benchmark_demo", seed=0):
         self.db_path = db_path
+        # Banco das cargas do db_bench, recriado por elas
+        self.bench_path = db_path + "_db_bench"
+        self.seed = seed
         self.db = None
         self.metrics = MetricsCollector()
     
@@ -19,35 +24,21 @@ class BenchmarkDemo:
         self.db = rocksdb.DB(self.db_path, opts)
         print("✓ Banco RocksDB inicializado para benchmark")
     
+    def run_db_bench(self, names, **params):
+        """Executa cargas do db_bench.py em um banco próprio e retorna os resultados por nome"""
+        benchmark = Benchmark(self.bench_path, seed=self.seed, **params)
+        results = run_benchmarks(benchmark, names, out=sys.stdout)['results']
+        return {result['benchmark']: result for result in results}
+    
     def benchmark_sequential_vs_random(self, count=5000):
         print(f"\n--- BENCHMARK: Inserção Sequencial vs Aleatória ({count} registros) ---")
         
-        # Teste Sequencial
-        test_data = DataGenerator.generate_test_data(count, 'medium')
-        keys = list(test_data.keys())
-        
-        self.metrics.start_timer("sequential_insert")
-        for key in keys:
-            self.db.put(key.encode(), test_data[key].encode())
-        seq_duration = self.metrics.end_timer("sequential_insert")
-        
-        # Limpar para teste aleatório
-        for key in keys:
-            self.db.delete(key.encode())
-        
-        # Teste Aleatório
-        random.shuffle(keys)
-        self.metrics.start_timer("random_insert")
-        for key in keys:
-            self.db.put(key.encode(), test_data[key].encode())
-        rand_duration = self.metrics.end_timer("random_insert")
-        
-        seq_ops = count / (seq_duration / 1000)
-        rand_ops = count / (rand_duration / 1000)
-        
-        print(f"✓ Sequencial: {seq_duration:.2f}ms ({seq_ops:.0f} ops/s)")
-        print(f"✓ Aleatório: {rand_duration:.2f}ms ({rand_ops:.0f} ops/s)")
-        print(f"✓ Diferença: {((rand_duration - seq_duration) / seq_duration * 100):.1f}%")
+        results = self.run_db_bench(["fillseq", "fillrandom"], num=count, value_size=300)
+        seq_ops = results["fillseq"]['ops_per_sec']
+        rand_ops = results["fillrandom"]['ops_per_sec']
+        self.metrics.record_metric("fillseq_ops_per_sec", seq_ops)
+        self.metrics.record_metric("fillrandom_ops_per_sec", rand_ops)
+        print(f"✓ Diferença: {((seq_ops - rand_ops) / rand_ops * 100):.1f}% de vazão a favor da inserção sequencial")
     
     def benchmark_value_sizes(self):
         print(f"\n--- BENCHMARK: Diferentes Tamanhos de Valor ---")
@@ -59,38 +50,19 @@ class BenchmarkDemo:
         ]
         
         for size_name, size_bytes, count in sizes:
-            # Limpar dados anteriores
-            self.cleanup_data()
-            
-            # Gerar dados do tamanho específico
-            test_data = {}
-            for i in range(count):
-                key = f"key_{i:06d}"
-                value = DataGenerator.generate_string(size_bytes)
-                test_data[key] = value
-            
-            # Benchmark de inserção
-            self.metrics.start_timer(f"insert_{size_name}")
-            for key, value in test_data.items():
-                self.db.put(key.encode(), value.encode())
-            duration = self.metrics.end_timer(f"insert_{size_name}")
-            
-            # Benchmark de leitura
-            keys = list(test_data.keys())
-            self.metrics.start_timer(f"read_{size_name}")
-            for key in keys:
-                self.db.get(key.encode())
-            read_duration = self.metrics.end_timer(f"read_{size_name}")
-            
-            # Calcular métricas
-            insert_ops = count / (duration / 1000)
-            read_ops = count / (read_duration / 1000)
-            db_size = get_directory_size(self.db_path)
-            
             print(f"✓ Tamanho {size_name} ({size_bytes} bytes):")
-            print(f"  - Inserção: {duration:.2f}ms ({insert_ops:.0f} ops/s)")
-            print(f"  - Leitura: {read_duration:.2f}ms ({read_ops:.0f} ops/s)")
-            print(f"  - Tamanho DB: {db_size:.2f} MB")
+            results = self.run_db_bench(["fillrandom", "readrandom"], num=count, value_size=size_bytes)
+            self.metrics.record_metric(f"insert_{size_name}_ops_per_sec", results["fillrandom"]['ops_per_sec'])
+            self.metrics.record_metric(f"read_{size_name}_ops_per_sec", results["readrandom"]['ops_per_sec'])
+            print(f"  - Tamanho DB: {get_directory_size(self.bench_path):.2f} MB")
+    
+    def benchmark_ycsb(self, count=2000, threads=4):
+        print(f"\n--- BENCHMARK: Cargas YCSB A-F ({count} registros, {threads} threads) ---")
+        
+        names = ["ycsbload"] + ["ycsb" + letter for letter in "abcdef"]
+        results = self.run_db_bench(names, num=count, value_size=100, threads=threads)
+        for name in names[1:]:
+            self.metrics.record_metric(f"{name}_ops_per_sec", results[name]['ops_per_sec'])
     
     def benchmark_memory_usage(self, count=10000):
         print(f"\n--- BENCHMARK: Uso de Memória ({count} registros) ---")
@@ -122,29 +94,52 @@ class BenchmarkDemo:
         print(f"✓ Aumento: {memory_increase:.2f} MB")
         print(f"✓ Tamanho em disco: {db_size:.2f} MB")
     
-    def cleanup_data(self):
-        # Remove todos os dados do banco
-        it = self.db.iterkeys()
-        it.seek_to_first()
-        keys_to_delete = []
-        for key in it:
-            keys_to_delete.append(key)
+    def benchmark_multi_get(self, count=20000):
+        print(f"\n--- BENCHMARK: multi_get vs Laço de get() ({count} registros) ---")
         
-        for key in keys_to_delete:
-            self.db.delete(key)
+        test_data = DataGenerator.generate_test_data(count, 'small')
+        for key, value in test_data.items():
+            self.db.put(key.encode(), value.encode())
+        # Leituras a partir dos arquivos de tabela, não da memtable
+        self.db.flush()
+        
+        all_keys = [key.encode() for key in test_data]
+        for batch_size in (10, 100, 1000, 10000):
+            # Mesmas chaves para os dois métodos, em ordem aleatória
+            keys = random.sample(all_keys, batch_size)
+            
+            self.metrics.start_timer(f"get_loop_{batch_size}")
+            loop_values = [self.db.get(key) for key in keys]
+            loop_duration = self.metrics.end_timer(f"get_loop_{batch_size}")
+            
+            self.metrics.start_timer(f"multi_get_{batch_size}")
+            multi_values = self.db.multi_get(keys)
+            multi_duration = self.metrics.end_timer(f"multi_get_{batch_size}")
+            
+            assert loop_values == multi_values
+            speedup = loop_duration / multi_duration if multi_duration else float('inf')
+            self.metrics.record_metric(f"multi_get_speedup_{batch_size}", speedup)
+            
+            print(f"✓ Lote de {batch_size} chaves:")
+            print(f"  - Laço de get(): {loop_duration:.2f}ms")
+            print(f"  - multi_get(): {multi_duration:.2f}ms")
+            print(f"  - Ganho: {speedup:.1f}x")
     
     def run_all_benchmarks(self):
         self.setup()
         self.benchmark_sequential_vs_random()
         self.benchmark_value_sizes()
+        self.benchmark_ycsb()
         self.benchmark_memory_usage()
+        self.benchmark_multi_get()
         self.metrics.print_report()
     
     def cleanup(self):
         if self.db:
             del self.db
-        if os.path.exists(self.db_path):
-            shutil.rmtree(self.db_path)
+        for path in (self.db_path, self.bench_path):
+            if os.path.exists(path):
+                shutil.rmtree(path)
 
 if __name__ == "__main__":
     demo = BenchmarkDemo()
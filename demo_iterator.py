@@ -1,4 +1,5 @@
 import rocksdb_simulator as rocksdb
+from slice_transform import SeparatorPrefixTransform
 import os
 import shutil
 from utils import MetricsCollector, DataGenerator
@@ -15,6 +16,9 @@ class IteratorDemo:
         
         opts = rocksdb.Options()
         opts.create_if_missing = True
+        # Prefixo = tudo até o primeiro ':' (user:, product:, log:)
+        opts.prefix_extractor = SeparatorPrefixTransform(b":")
+        opts.bloom_bits_per_key = 10
         self.db = rocksdb.DB(self.db_path, opts)
         
         # Inserir dados de teste organizados
@@ -75,13 +79,9 @@ class IteratorDemo:
             self.metrics.start_timer(f"prefix_search_{prefix.replace(':', '_')}")
             
             count = 0
-            it = self.db.iteritems()
-            it.seek(prefix.encode())
-            
-            for key, value in it:
+            # O iterador para sozinho quando as chaves saem do prefixo
+            for key, value in self.db.iteritems(prefix=prefix.encode()):
                 key_str = key.decode()
-                if not key_str.startswith(prefix):
-                    break
                 count += 1
                 if count <= 3:  # Mostrar apenas os primeiros
                     print(f"  {key_str}: {value.decode()}")
@@ -102,13 +102,13 @@ class IteratorDemo:
         self.metrics.start_timer("range_iteration")
         
         count = 0
-        it = self.db.iteritems()
-        it.seek(start_key.encode())
+        # Os limites descem até os arquivos de tabela: o motor ignora arquivos
+        # e blocos fora do intervalo e para sozinho em end_key (exclusivo)
+        it = self.db.iteritems(iterate_lower_bound=start_key.encode(),
+                               iterate_upper_bound=end_key.encode())
         
         for key, value in it:
             key_str = key.decode()
-            if key_str > end_key:
-                break
             count += 1
             if count <= 5:  # Mostrar apenas os primeiros
                 print(f"  {key_str}: {value.decode()}")
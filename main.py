@@ -4,6 +4,7 @@ Demonstração Prática do RocksDB
 Projeto acadêmico para mostrar funcionalidades e performance do RocksDB
 """
 
+import argparse
 import sys
 import os
 from demo_crud import CRUDDemo
@@ -19,16 +20,6 @@ def print_header():
     print("e características de performance do RocksDB em Python")
     print("="*60)
 
-def print_menu():
-    print("\nEscolha uma demonstração:")
-    print("1. CRUD - Operações básicas (Create, Read, Update, Delete)")
-    print("2. Benchmark - Testes de performance")
-    print("3. Batch - Operações em lote")
-    print("4. Iterator - Navegação e busca de dados")
-    print("5. Executar TODAS as demonstrações")
-    print("0. Sair")
-    print("-" * 50)
-
 def run_crud_demo():
     print("\n🚀 Executando demonstração CRUD...")
     demo = CRUDDemo()
@@ -65,14 +56,7 @@ def run_all_demos():
     print("\n🚀 Executando TODAS as demonstrações...")
     print("\nEsta execução pode levar alguns minutos...")
     
-    demos = [
-        ("CRUD Operations", run_crud_demo),
-        ("Performance Benchmarks", run_benchmark_demo),
-        ("Batch Operations", run_batch_demo),
-        ("Iterator & Search", run_iterator_demo)
-    ]
-    
-    for name, demo_func in demos:
+    for name, demo_func in DEMOS.values():
         print(f"\n{'='*20} {name} {'='*20}")
         try:
             demo_func()
@@ -92,7 +76,24 @@ def check_dependencies():
         print("Execute: pip install psutil")
         return False
 
-def main():
+# Demonstrações por nome na linha de comando
+DEMOS = {
+    "crud": ("CRUD Operations", run_crud_demo),
+    "benchmark": ("Performance Benchmarks", run_benchmark_demo),
+    "batch": ("Batch Operations", run_batch_demo),
+    "iterator": ("Iterator & Search", run_iterator_demo),
+}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Demonstrações do RocksDB; para benchmarks reproduzíveis use db_bench.py")
+    parser.add_argument("demos", nargs="*", metavar="DEMO",
+                        help="demonstrações a executar: " + ", ".join(DEMOS) + " ou all (padrão)")
+    args = parser.parse_args(argv)
+    for name in args.demos:
+        if name != "all" and name not in DEMOS:
+            parser.error(f"demonstração inválida: {name}")
+    
     print_header()
     
     # Verificar dependências
@@ -102,38 +103,15 @@ def main():
     # Criar diretório de dados se não existir
     os.makedirs("data", exist_ok=True)
     
-    while True:
-        print_menu()
-        
-        try:
-            choice = input("Digite sua escolha (0-5): ").strip()
-            
-            if choice == "0":
-                print("👋 Encerrando demonstração. Obrigado!")
-                break
-            elif choice == "1":
-                run_crud_demo()
-            elif choice == "2":
-                run_benchmark_demo()
-            elif choice == "3":
-                run_batch_demo()
-            elif choice == "4":
-                run_iterator_demo()
-            elif choice == "5":
-                run_all_demos()
-            else:
-                print("❌ Opção inválida. Tente novamente.")
-                continue
-                
-            input("\nPressione Enter para continuar...")
-            
-        except KeyboardInterrupt:
-            print("\n\n👋 Demonstração interrompida pelo usuário.")
-            break
-        except Exception as e:
-            print(f"❌ Erro inesperado: {e}")
-            input("Pressione Enter para continuar...")
-    
+    try:
+        if not args.demos or "all" in args.demos:
+            run_all_demos()
+        else:
+            for name in args.demos:
+                DEMOS[name][1]()
+    except KeyboardInterrupt:
+        print("\n\n👋 Demonstração interrompida pelo usuário.")
+        return 130
     return 0
 
 if __name__ == "__main__":
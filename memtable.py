@@ -0,0 +1,217 @@
+"""
+Memtable: buffer de escrita em memória do motor LSM
+As chaves ficam sempre ordenadas, então iteradores não precisam ordenar
+nada ao serem criados e seek() é uma busca binária. Cada chave guarda
+todas as suas versões (sequência, tipo, valor), da mais nova para a mais
+antiga, para leituras em snapshots
+"""
+
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from bloom import DynamicBloom
+from range_del import FragmentedRangeTombstones, RangeTombstone
+
+# Custo aproximado de cada entrada além da chave e do valor
+ENTRY_OVERHEAD = 16
+
+# Versão de uma chave: (número de sequência, tipo, valor)
+KeyVersion = Tuple[int, int, Optional[bytes]]
+
+class SortedKeyList:
+    """Lista ordenada de chaves dividida em blocos
+    
+    Inserir custa uma busca binária nos maiores valores de cada bloco e uma
+    inserção em um bloco pequeno, em vez de deslocar a lista inteira.
+    """
+    
+    LOAD = 512
+    
+    def __init__(self):
+        self.lists: List[List[bytes]] = []
+        self.maxes: List[bytes] = []
+        self.size = 0
+    
+    def __len__(self):
+        return self.size
+    
+    def __iter__(self) -> Iterator[bytes]:
+        for chunk in self.lists:
+            yield from chunk
+    
+    def add(self, key: bytes):
+        """Insere uma chave que ainda não está na lista"""
+        self.size += 1
+        if not self.maxes:
+            self.lists.append([key])
+            self.maxes.append(key)
+            return
+        i = bisect_left(self.maxes, key)
+        if i == len(self.maxes):
+            i -= 1
+            chunk = self.lists[i]
+            chunk.append(key)
+            self.maxes[i] = key
+        else:
+            chunk = self.lists[i]
+            insort(chunk, key)
+        if len(chunk) > 2 * self.LOAD:
+            self.lists[i:i + 1] = [chunk[:self.LOAD], chunk[self.LOAD:]]
+            self.maxes[i:i + 1] = [chunk[self.LOAD - 1], chunk[-1]]
+    
+    def lower_bound(self, key: bytes) -> Tuple[int, int]:
+        """Posição (bloco, índice) da primeira chave >= key"""
+        i = bisect_left(self.maxes, key)
+        if i == len(self.maxes):
+            return i, 0
+        return i, bisect_left(self.lists[i], key)
+
+class MemTable:
+    """Guarda as escritas mais recentes até ser congelada e gravada em disco"""
+    
+    def __init__(self, prefix_extractor=None, prefix_bloom_bits: int = 0):
+        self._table: Dict[bytes, List[KeyVersion]] = {}
+        # Filtro de Bloom dos prefixos presentes, para iterações por prefixo
+        self._prefix_extractor = prefix_extractor
+        self._prefix_bloom = (DynamicBloom(prefix_bloom_bits)
+                              if prefix_extractor is not None and prefix_bloom_bits > 0 else None)
+        self._keys = SortedKeyList()
+        # Incrementado a cada nova chave; iteradores usam para se reposicionar
+        self.structure_version = 0
+        self.lock = threading.Lock()
+        self.approximate_size = 0
+        # Range tombstones, na ordem de inserção
+        self.range_tombstones: List[RangeTombstone] = []
+        self._range_del: Optional[FragmentedRangeTombstones] = None
+        self._range_del_count = 0
+    
+    def __len__(self):
+        return len(self._table) + len(self.range_tombstones)
+    
+    def add(self, sequence: int, value_type: int, key: bytes, value: Optional[bytes]):
+        """Registra uma escrita; deleções viram marcadores (tombstones)"""
+        versions = self._table.get(key)
+        if versions is not None:
+            versions.insert(0, (sequence, value_type, value))
+        else:
+            # O dicionário é atualizado antes da lista ordenada: um iterador
+            # nunca encontra uma chave sem o respectivo registro
+            self._table[key] = [(sequence, value_type, value)]
+            if self._prefix_bloom is not None and self._prefix_extractor.in_domain(key):
+                self._prefix_bloom.add(self._prefix_extractor.transform(key))
+            with self.lock:
+                self._keys.add(key)
+                self.structure_version += 1
+        self.approximate_size += len(key) + (len(value) if value else 0) + ENTRY_OVERHEAD
+    
+    def add_range_tombstone(self, sequence: int, begin: bytes, end: bytes):
+        """Registra a deleção de [begin, end)"""
+        self.range_tombstones.append((sequence, begin, end))
+        self.approximate_size += len(begin) + len(end) + ENTRY_OVERHEAD
+    
+    def range_del(self) -> Optional[FragmentedRangeTombstones]:
+        """Range tombstones fragmentados para consulta, ou None se não há nenhum"""
+        if not self.range_tombstones:
+            return None
+        count = len(self.range_tombstones)
+        if count != self._range_del_count:
+            # Reconstruído só quando chegam marcadores novos
+            self._range_del = FragmentedRangeTombstones(self.range_tombstones[:count])
+            self._range_del_count = count
+        return self._range_del
+    
+    def get(self, key: bytes) -> Optional[List[KeyVersion]]:
+        """Versões da chave, da mais nova para a mais antiga, ou None"""
+        return self._table.get(key)
+    
+    def prefix_may_match(self, prefix: bytes) -> bool:
+        """False garante que nenhuma chave tem o prefixo (já extraído)"""
+        return self._prefix_bloom is None or self._prefix_bloom.may_contain(prefix)
+    
+    def sorted_keys(self) -> Iterator[bytes]:
+        """Chaves em ordem crescente (memtable congelada)"""
+        return iter(self._keys)
+
+class MemTableIterator:
+    """Iterador interno ordenado sobre uma memtable
+    
+    Criar o iterador não custa nada. Se chaves novas forem inseridas
+    durante a iteração, ele se reposiciona pela chave atual.
+    """
+    
+    def __init__(self, memtable: MemTable):
+        self._memtable = memtable
+        self._keys = memtable._keys
+        self._chunk = 0
+        self._pos = 0
+        self._key: Optional[bytes] = None
+        self._structure_version = -1
+    
+    def _load(self):
+        """Atualiza a chave atual a partir da posição (bloco, índice)"""
+        lists = self._keys.lists
+        while self._chunk < len(lists) and self._pos >= len(lists[self._chunk]):
+            self._chunk += 1
+            self._pos = 0
+        self._key = lists[self._chunk][self._pos] if self._chunk < len(lists) else None
+        self._structure_version = self._memtable.structure_version
+    
+    def _load_backward(self):
+        """Como _load, mas recua para o bloco anterior quando a posição fica negativa"""
+        lists = self._keys.lists
+        while self._chunk >= 0 and self._pos < 0:
+            self._chunk -= 1
+            self._pos = len(lists[self._chunk]) - 1 if self._chunk >= 0 else 0
+        self._key = lists[self._chunk][self._pos] if self._chunk >= 0 else None
+        self._structure_version = self._memtable.structure_version
+    
+    def _relocate(self):
+        """Se a lista mudou, volta para a chave atual pela busca binária"""
+        if self._structure_version != self._memtable.structure_version:
+            self._chunk, self._pos = self._keys.lower_bound(self._key)
+    
+    def valid(self) -> bool:
+        return self._key is not None
+    
+    def seek_to_first(self):
+        with self._memtable.lock:
+            self._chunk, self._pos = 0, 0
+            self._load()
+    
+    def seek_to_last(self):
+        with self._memtable.lock:
+            self._chunk, self._pos = len(self._keys.lists), -1
+            self._load_backward()
+    
+    def seek(self, target: bytes):
+        with self._memtable.lock:
+            self._chunk, self._pos = self._keys.lower_bound(target)
+            self._load()
+    
+    def seek_for_prev(self, target: bytes):
+        """Posiciona na última chave <= target"""
+        with self._memtable.lock:
+            self._chunk, self._pos = self._keys.lower_bound(target)
+            self._load()
+            if self._key != target:
+                self._pos -= 1
+                self._load_backward()
+    
+    def next(self):
+        with self._memtable.lock:
+            self._relocate()
+            self._pos += 1
+            self._load()
+    
+    def prev(self):
+        with self._memtable.lock:
+            self._relocate()
+            self._pos -= 1
+            self._load_backward()
+    
+    def key(self) -> bytes:
+        return self._key
+    
+    def versions(self) -> List[KeyVersion]:
+        return self._memtable.get(self._key)
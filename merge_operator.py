@@ -0,0 +1,95 @@
+"""
+Operadores de merge: atualizações de leitura-modificação-escrita sem leitura
+db.merge(key, operando) só grava o operando; o operador da família
+(Options.merge_operator) combina os operandos com o valor anterior quando a
+chave é lida, gravada em disco por um flush ou compactada
+"""
+
+import struct
+import time
+from typing import List, Optional
+
+import perf_context
+
+class MergeOperator:
+    """Interface de um operador de merge
+    
+    full_merge recebe o valor existente (None se a chave não existe ou foi
+    deletada) e os operandos do mais antigo para o mais novo. partial_merge
+    combina dois operandos sem o valor base; None indica que não é possível
+    e os operandos ficam separados até a base aparecer.
+    """
+    
+    def name(self) -> str:
+        raise NotImplementedError
+    
+    def full_merge(self, key: bytes, existing_value: Optional[bytes], operands: List[bytes]) -> bytes:
+        raise NotImplementedError
+    
+    def partial_merge(self, key: bytes, left_operand: bytes, right_operand: bytes) -> Optional[bytes]:
+        return None
+
+class AssociativeMergeOperator(MergeOperator):
+    """Operador em que operandos e valores têm o mesmo formato
+    
+    Basta implementar merge(key, existing_value, value); como a operação é
+    associativa, operandos sem base também são combinados entre si.
+    """
+    
+    def merge(self, key: bytes, existing_value: Optional[bytes], value: bytes) -> bytes:
+        raise NotImplementedError
+    
+    def full_merge(self, key: bytes, existing_value: Optional[bytes], operands: List[bytes]) -> bytes:
+        for operand in operands:
+            existing_value = self.merge(key, existing_value, operand)
+        return existing_value
+    
+    def partial_merge(self, key: bytes, left_operand: bytes, right_operand: bytes) -> Optional[bytes]:
+        return self.merge(key, left_operand, right_operand)
+
+UINT64 = struct.Struct("<Q")
+
+class UInt64AddOperator(AssociativeMergeOperator):
+    """Contadores: valores e operandos são inteiros de 64 bits sem sinal (little-endian)
+    
+    A soma dá a volta em 2**64. Valores com outro tamanho contam como zero.
+    """
+    
+    def name(self) -> str:
+        return "uint64add"
+    
+    def merge(self, key: bytes, existing_value: Optional[bytes], value: bytes) -> bytes:
+        total = _decode_uint64(existing_value) + _decode_uint64(value)
+        return UINT64.pack(total & 0xFFFFFFFFFFFFFFFF)
+
+class StringAppendOperator(AssociativeMergeOperator):
+    """Listas: cada operando é anexado ao valor, separado por delimiter"""
+    
+    def __init__(self, delimiter: bytes = b","):
+        self.delimiter = delimiter
+    
+    def name(self) -> str:
+        return "stringappend"
+    
+    def merge(self, key: bytes, existing_value: Optional[bytes], value: bytes) -> bytes:
+        if existing_value is None:
+            return bytes(value)
+        return existing_value + self.delimiter + value
+
+def _decode_uint64(value: Optional[bytes]) -> int:
+    if value is None or len(value) != UINT64.size:
+        return 0
+    return UINT64.unpack(value)[0]
+
+def full_merge(merge_operator: Optional[MergeOperator], key: bytes,
+               existing_value: Optional[bytes], operands: List[bytes]) -> bytes:
+    """Aplica o operador da família; operands do mais antigo para o mais novo"""
+    if merge_operator is None:
+        raise RuntimeError("Merge operands found but no merge_operator is configured")
+    ctx = perf_context.current()
+    if ctx is None or not ctx.timed:
+        return merge_operator.full_merge(key, existing_value, operands)
+    start = time.perf_counter_ns()
+    value = merge_operator.full_merge(key, existing_value, operands)
+    ctx.merge_operator_time_nanos += time.perf_counter_ns() - start
+    return value
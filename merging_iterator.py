@@ -0,0 +1,111 @@
+"""
+Iterador que combina vários iteradores internos ordenados em uma única visão
+"""
+
+from typing import List, Optional, Tuple
+
+FORWARD = 1
+BACKWARD = -1
+
+class MergingIterator:
+    """Combina iteradores ordenados; os filhos vêm do mais novo para o mais antigo
+    
+    Quando a mesma chave aparece em vários filhos, as versões de todos eles
+    são concatenadas na ordem dos filhos, ou seja, da mais nova para a mais
+    antiga. O iterador anda nas duas direções:
+    ao trocar de direção, os filhos são reposicionados em relação à chave
+    atual.
+    """
+    
+    def __init__(self, children: List):
+        self._children = children
+        self._current = None
+        self._direction = FORWARD
+    
+    def _find_smallest(self):
+        current = None
+        for child in self._children:
+            if child.valid() and (current is None or child.key() < current.key()):
+                current = child
+        self._current = current
+    
+    def _find_largest(self):
+        current = None
+        for child in self._children:
+            if child.valid() and (current is None or child.key() > current.key()):
+                current = child
+        self._current = current
+    
+    def valid(self) -> bool:
+        return self._current is not None
+    
+    def seek_to_first(self):
+        for child in self._children:
+            child.seek_to_first()
+        self._direction = FORWARD
+        self._find_smallest()
+    
+    def seek_to_last(self):
+        for child in self._children:
+            child.seek_to_last()
+        self._direction = BACKWARD
+        self._find_largest()
+    
+    def seek(self, target: bytes):
+        for child in self._children:
+            child.seek(target)
+        self._direction = FORWARD
+        self._find_smallest()
+    
+    def seek_for_prev(self, target: bytes):
+        for child in self._children:
+            child.seek_for_prev(target)
+        self._direction = BACKWARD
+        self._find_largest()
+    
+    def next(self):
+        key = self._current.key()
+        if self._direction == BACKWARD:
+            # Filhos estão antes da chave atual: leva todos para depois dela
+            for child in self._children:
+                child.seek(key)
+                if child.valid() and child.key() == key:
+                    child.next()
+            self._direction = FORWARD
+        else:
+            # Avança todos os filhos que estão na chave atual (versões mais antigas)
+            for child in self._children:
+                if child.valid() and child.key() == key:
+                    child.next()
+        self._find_smallest()
+    
+    def prev(self):
+        key = self._current.key()
+        if self._direction == FORWARD:
+            # Filhos estão depois da chave atual: leva todos para antes dela
+            for child in self._children:
+                child.seek_for_prev(key)
+                if child.valid() and child.key() == key:
+                    child.prev()
+            self._direction = BACKWARD
+        else:
+            for child in self._children:
+                if child.valid() and child.key() == key:
+                    child.prev()
+        self._find_largest()
+    
+    def key(self) -> bytes:
+        return self._current.key()
+    
+    def versions(self) -> List[Tuple[int, int, Optional[bytes]]]:
+        """Versões da chave atual em todos os filhos, da mais nova para a mais antiga"""
+        current = self._current
+        key = current.key()
+        result = None
+        for child in self._children:
+            if child is current or (child.valid() and child.key() == key):
+                if result is None:
+                    result = child.versions()
+                else:
+                    result = result + child.versions()
+        return result
@@ -0,0 +1,96 @@
+"""
+Contexto de desempenho por thread (perf context)
+Mede onde o tempo de uma chamada foi gasto: memtable, arquivos, blocos lidos,
+filtros de Bloom, log e espera na fila de escritas. Desligado por padrão;
+set_perf_level() liga a medição só na thread atual:
+    
+    perf_context.set_perf_level(perf_context.ENABLE_TIME)
+    ctx = perf_context.get_perf_context()
+    ctx.reset()
+    db.get(b"chave")
+    print(ctx)
+"""
+
+import threading
+from typing import Dict, Optional
+
+# Níveis de medição
+DISABLE = 1
+ENABLE_COUNT = 2      # só contadores
+ENABLE_TIME = 3       # contadores e tempos (nanossegundos)
+
+class PerfContext:
+    """Contadores e tempos (em nanossegundos) acumulados pela thread"""
+    
+    __slots__ = (
+        "timed",
+        # Leituras pontuais
+        "get_from_memtable_count",
+        "get_from_memtable_time",
+        "get_from_output_files_time",
+        "merge_operator_time_nanos",
+        # Arquivos de tabela
+        "block_cache_hit_count",
+        "block_read_count",
+        "block_read_byte",
+        "block_read_time",
+        "block_decompress_time",
+        "bloom_sst_hit_count",
+        "bloom_sst_miss_count",
+        # Iteradores
+        "iter_seek_count",
+        "iter_next_count",
+        "iter_prev_count",
+        "internal_key_skipped_count",
+        # Escritas
+        "write_wal_time",
+        "write_memtable_time",
+        "write_delay_time",
+        "write_thread_wait_nanos",
+    )
+    
+    def __init__(self):
+        self.timed = False
+        self.reset()
+    
+    def reset(self):
+        for name in self.__slots__[1:]:
+            setattr(self, name, 0)
+    
+    def to_dict(self) -> Dict[str, int]:
+        return {name: getattr(self, name) for name in self.__slots__[1:]}
+    
+    def __str__(self):
+        return ", ".join(f"{name} = {value}" for name, value in self.to_dict().items() if value)
+
+class _ThreadState(threading.local):
+    # Valores padrão na classe: ler um atributo ausente não gera exceção
+    context: Optional[PerfContext] = None
+    active: Optional[PerfContext] = None
+
+_local = _ThreadState()
+
+def get_perf_context() -> PerfContext:
+    """Contexto da thread atual (criado na primeira chamada)"""
+    context = _local.context
+    if context is None:
+        context = _local.context = PerfContext()
+    return context
+
+def set_perf_level(level: int):
+    """Define o nível de medição da thread atual"""
+    if level not in (DISABLE, ENABLE_COUNT, ENABLE_TIME):
+        raise ValueError(f"Invalid perf level: {level!r}")
+    context = get_perf_context()
+    context.timed = level == ENABLE_TIME
+    _local.active = context if level != DISABLE else None
+
+def get_perf_level() -> int:
+    context = _local.active
+    if context is None:
+        return DISABLE
+    return ENABLE_TIME if context.timed else ENABLE_COUNT
+
+def current() -> Optional[PerfContext]:
+    """Contexto da thread se a medição estiver ligada, senão None (caminho rápido)"""
+    return _local.active
@@ -0,0 +1,83 @@
+"""
+Range tombstones: deleção de todas as chaves de um intervalo com uma escrita
+db.delete_range(begin, end) grava um marcador (sequência, begin, end) que
+esconde as versões de [begin, end) com sequência menor. Leituras e
+iteradores consultam os marcadores; a compactação remove as chaves cobertas
+"""
+
+import struct
+from bisect import bisect_left, bisect_right
+from typing import Iterable, List, Sequence, Tuple
+
+# Marcador: (sequência, início inclusivo, fim exclusivo)
+RangeTombstone = Tuple[int, bytes, bytes]
+
+# Cada marcador no bloco de metadados: sequência, tamanho do início e do fim
+TOMBSTONE_HEADER = struct.Struct("<QII")
+
+class FragmentedRangeTombstones:
+    """Marcadores divididos em fragmentos que não se sobrepõem
+    
+    Cada fragmento [pontos[i], pontos[i + 1]) guarda, em ordem crescente, as
+    sequências dos marcadores que o cobrem; achar os marcadores que cobrem
+    uma chave é uma busca binária.
+    """
+    
+    def __init__(self, tombstones: Iterable[RangeTombstone]):
+        tombstones = [t for t in tombstones if t[1] < t[2]]
+        self.tombstones = tombstones
+        self._points = sorted({t[1] for t in tombstones} | {t[2] for t in tombstones})
+        self._seqs: List[List[int]] = [[] for _ in range(max(0, len(self._points) - 1))]
+        for sequence, begin, end in tombstones:
+            for i in range(bisect_left(self._points, begin), bisect_left(self._points, end)):
+                self._seqs[i].append(sequence)
+        for seqs in self._seqs:
+            seqs.sort()
+    
+    def __len__(self):
+        return len(self.tombstones)
+    
+    def covering(self, key: bytes) -> Sequence[int]:
+        """Sequências (crescentes) dos marcadores que cobrem a chave"""
+        i = bisect_right(self._points, key) - 1
+        if 0 <= i < len(self._seqs):
+            return self._seqs[i]
+        return ()
+    
+    def max_covering(self, key: bytes, sequence: int) -> int:
+        """Maior sequência <= sequence de um marcador que cobre a chave (0 se nenhum)"""
+        seqs = self.covering(key)
+        i = bisect_right(seqs, sequence) - 1
+        return seqs[i] if i >= 0 else 0
+    
+    def covered_in_stripe(self, key: bytes, sequence: int, snapshots: Sequence[int]) -> bool:
+        """Indica se um marcador mais novo esconde a versão de todos os snapshots
+        
+        Isso vale quando nenhum snapshot fica entre a versão e o marcador
+        mais antigo que a cobre, e então a compactação pode descartá-la.
+        """
+        seqs = self.covering(key)
+        i = bisect_right(seqs, sequence)
+        if i == len(seqs):
+            return False
+        return bisect_left(snapshots, seqs[i]) == bisect_left(snapshots, sequence)
+
+def encode_tombstones(tombstones: Iterable[RangeTombstone]) -> bytes:
+    parts = []
+    for sequence, begin, end in tombstones:
+        parts.append(TOMBSTONE_HEADER.pack(sequence, len(begin), len(end)))
+        parts.append(begin)
+        parts.append(end)
+    return b"".join(parts)
+
+def decode_tombstones(data: bytes) -> List[RangeTombstone]:
+    result = []
+    pos = 0
+    while pos < len(data):
+        sequence, begin_len, end_len = TOMBSTONE_HEADER.unpack_from(data, pos)
+        pos += TOMBSTONE_HEADER.size
+        begin = data[pos:pos + begin_len]
+        pos += begin_len
+        result.append((sequence, begin, data[pos:pos + end_len]))
+        pos += end_len
+    return result
@@ -0,0 +1,145 @@
+"""
+Limitador de taxa de I/O (token bucket) para flush e compactação
+A cada período de reposição o balde recebe bytes_per_sec * período bytes;
+uma gravação pede bytes ao balde e espera enquanto não houver saldo. Pedidos
+em espera são atendidos por prioridade: IO_HIGH (flush) antes de IO_LOW
+(compactação), mas uma vez a cada fairness reposições a fila de baixa
+prioridade vai primeiro, para a compactação não ficar parada. Passado em
+Options.rate_limiter, pode ser compartilhado entre bancos e ajustado com
+db.set_options({"rate_limiter_bytes_per_sec": ...})
+
+A disputa com o primeiro plano é resolvida limitando só o segundo plano:
+leituras e gravações no log (o primeiro plano) nunca passam pelo limitador,
+para não ganharem a latência que ele existe para evitar. Por isso a
+prioridade e a fairness dividem a taxa entre flush e compactação, como no
+limitador padrão do RocksDB, e não há prioridade de primeiro plano
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from typing import Deque, Optional
+
+# Prioridades dos pedidos
+IO_LOW = 0      # compactação
+IO_HIGH = 1     # flush
+
+class _Request:
+    __slots__ = ("remaining", "granted")
+    
+    def __init__(self, remaining: int):
+        self.remaining = remaining
+        self.granted = False
+
+class RateLimiter:
+    """Limita a bytes_per_sec os bytes gravados pelas tarefas de segundo plano"""
+    
+    def __init__(self, bytes_per_sec: int, refill_period_us: int = 100 * 1000, fairness: int = 10):
+        if bytes_per_sec <= 0 or refill_period_us <= 0 or fairness <= 0:
+            raise ValueError("bytes_per_sec, refill_period_us and fairness must be positive")
+        self.refill_period_us = refill_period_us
+        self.fairness = fairness
+        self._lock = threading.Lock()
+        self._cv = threading.Condition(self._lock)
+        self._queues = (deque(), deque())
+        self._rnd = random.Random()
+        self._set_rate(bytes_per_sec)
+        self._available = self._refill_bytes
+        self._next_refill = time.monotonic() + refill_period_us / 1e6
+        # Totais por prioridade
+        self._total_bytes = [0, 0]
+        self._total_requests = [0, 0]
+        self._total_wait_micros = [0.0, 0.0]
+    
+    def _set_rate(self, bytes_per_sec: int):
+        self._bytes_per_sec = bytes_per_sec
+        # Bytes por reposição: também o maior pedido atendido de uma só vez
+        self._refill_bytes = max(1, bytes_per_sec * self.refill_period_us // 1000000)
+    
+    def set_bytes_per_second(self, bytes_per_sec: int):
+        """Muda a taxa; vale a partir da próxima reposição"""
+        if bytes_per_sec <= 0:
+            raise ValueError("bytes_per_sec must be positive")
+        with self._lock:
+            self._set_rate(bytes_per_sec)
+    
+    def get_bytes_per_second(self) -> int:
+        return self._bytes_per_sec
+    
+    def get_single_burst_bytes(self) -> int:
+        return self._refill_bytes
+    
+    def request(self, num_bytes: int, priority: int = IO_LOW):
+        """Bloqueia até num_bytes serem liberados para a prioridade
+        
+        Pedidos maiores que uma reposição são atendidos em partes, ao longo
+        de várias reposições.
+        """
+        if num_bytes <= 0:
+            return
+        start = time.perf_counter()
+        with self._lock:
+            self._total_requests[priority] += 1
+            self._total_bytes[priority] += num_bytes
+            now = time.monotonic()
+            if now >= self._next_refill:
+                self._refill(now)
+            if not self._queues[IO_HIGH] and not self._queues[IO_LOW] and self._available >= num_bytes:
+                self._available -= num_bytes
+                return
+            request = _Request(num_bytes)
+            self._queues[priority].append(request)
+            while not request.granted:
+                # Quem acordar primeiro depois do prazo faz a reposição e
+                # distribui os bytes entre os pedidos em espera
+                now = time.monotonic()
+                if now >= self._next_refill:
+                    self._refill(now)
+                if not request.granted:
+                    self._cv.wait(max(0.0, self._next_refill - time.monotonic()))
+            self._total_wait_micros[priority] += (time.perf_counter() - start) * 1e6
+    
+    def _refill(self, now: float):
+        """Repõe o balde e atende os pedidos na ordem das prioridades (com o lock)"""
+        self._next_refill = now + self.refill_period_us / 1e6
+        # Saldo não usado não se acumula além de uma reposição
+        self._available = min(self._available + self._refill_bytes, self._refill_bytes)
+        order = (IO_HIGH, IO_LOW)
+        if self._rnd.randrange(self.fairness) == 0:
+            order = (IO_LOW, IO_HIGH)
+        granted = False
+        for priority in order:
+            queue: Deque[_Request] = self._queues[priority]
+            while queue and self._available > 0:
+                request = queue[0]
+                if request.remaining > self._available:
+                    request.remaining -= self._available
+                    self._available = 0
+                    break
+                self._available -= request.remaining
+                request.remaining = 0
+                request.granted = True
+                queue.popleft()
+                granted = True
+        if granted:
+            self._cv.notify_all()
+    
+    def get_total_bytes_through(self, priority: Optional[int] = None) -> int:
+        if priority is None:
+            return sum(self._total_bytes)
+        return self._total_bytes[priority]
+    
+    def get_total_requests(self, priority: Optional[int] = None) -> int:
+        if priority is None:
+            return sum(self._total_requests)
+        return self._total_requests[priority]
+    
+    def get_total_wait_micros(self, priority: Optional[int] = None) -> float:
+        """Tempo total que os pedidos passaram esperando por bytes"""
+        if priority is None:
+            return sum(self._total_wait_micros)
+        return self._total_wait_micros[priority]
+    
+    def __repr__(self):
+        return f"RateLimiter({self._bytes_per_sec} bytes/s, burst={self._refill_bytes})"
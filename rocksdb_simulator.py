@@ -4,161 +4,1701 @@ Implementa as principais funcionalidades sem dependências externas
 """
 
 import os
+import copy
 import json
 import time
 import pickle
-from typing import Dict, Any, Optional, Iterator, Tuple
+import shutil
+import struct
+import threading
+import weakref
+from bisect import bisect_left, bisect_right
+from collections import deque
+from typing import Callable, Dict, Any, List, Optional, Iterator, Tuple
+
+import wal
+from cache import LRUCache
+import perf_context
+from stats import (BYTES_READ, BYTES_WRITTEN, COMPACTION_TIME, DB_GET, DB_MULTIGET, DB_SEEK,
+                   DB_WRITE, FLUSH_TIME, FLUSH_WRITE_BYTES, GET_HIT_L0, GET_HIT_L1,
+                   GET_HIT_L2_AND_UP, ITER_BYTES_READ, MEMTABLE_HIT, MEMTABLE_MISS,
+                   NUMBER_DB_NEXT, NUMBER_DB_PREV, NUMBER_DB_SEEK, NUMBER_KEYS_READ,
+                   NUMBER_KEYS_WRITTEN, NUMBER_MULTIGET_CALLS, NUMBER_MULTIGET_KEYS_READ,
+                   STALL_MICROS, WAL_FILE_BYTES, WRITE_DONE_BY_OTHER, WRITE_DONE_BY_SELF,
+                   WRITE_STALL, Statistics)
+from compression import NO_COMPRESSION, check_compression, compression_for_level
+from compaction import (Compaction, CompactionJob, compaction_for_range, compaction_score,
+                        pick_compaction, visible_versions)
+from column_family import ColumnFamilyData, ColumnFamilyHandle
+from dbformat import (MANIFEST_FILE, TYPE_COLUMN_FAMILY_DELETE, TYPE_COLUMN_FAMILY_MERGE,
+                      TYPE_COLUMN_FAMILY_PUT, TYPE_COLUMN_FAMILY_RANGE_DELETION, TYPE_DELETE,
+                      TYPE_MERGE, TYPE_PUT, TYPE_RANGE_DELETION, log_file_name, table_file_name,
+                      parse_file_name)
+from merge_operator import full_merge
+from range_del import FragmentedRangeTombstones
+from memtable import MemTable, MemTableIterator
+from merging_iterator import MergingIterator
+from table import TableBuilder, TableReader, TableIterator
+from version_set import FileMetaData, LevelIterator, VersionSet
+from sst_file_writer import ExternalSstFileInfo, SstFileWriter
+from rate_limiter import IO_HIGH, RateLimiter
+from compaction_filter import CallbackFilter, CompactionFilter
+from ttl import append_timestamp, read_value, ttl_options
 
 class RocksDBSimulator:
-    """Simulador do RocksDB que mantém dados em memória e persiste em arquivo"""
+    """Simulador do RocksDB baseado em uma LSM-tree
+    
+    As escritas vão para o write-ahead log e para a memtable. Quando a
+    memtable atinge Options.write_buffer_size ela é congelada e uma thread
+    de segundo plano a grava em um arquivo de tabela do nível 0. A mesma
+    thread compacta os níveis conforme os tamanhos alvo de Options.
+    
+    O banco pode ser usado por várias threads. Escritas concorrentes formam
+    grupos: a primeira da fila (líder) grava as demais junto com a sua em um
+    único registro do log, com um único fsync, e as insere na memtable.
+    
+    Cada escrita recebe um número de sequência crescente. Leituras e
+    iteradores enxergam o banco no número de sequência em que começaram, ou
+    no de um snapshot obtido com snapshot().
     
-    def __init__(self, db_path: str):
+    As chaves ficam na família de colunas "default" ou em famílias criadas
+    com create_column_family(), cada uma com suas opções, memtables e
+    arquivos. Todas gravam no mesmo log, então um WriteBatch que envolve
+    várias famílias continua atômico. column_families informa as opções das
+    famílias existentes ao reabrir o banco; as omitidas usam options.
+    Com ttl (segundos), as chaves expiram ttl segundos depois de gravadas
+    (ver ttl.py); o banco deve ser sempre aberto com ttl.
+    """
+    
+    def __init__(self, db_path: str, options: Optional['Options'] = None,
+                 column_families: Optional[Dict[str, 'Options']] = None,
+                 ttl: Optional[int] = None):
         self.db_path = db_path
-        self.data: Dict[bytes, bytes] = {}
+        # Cópia: set_options() não altera o Options de quem abriu o banco
+        self.options = copy.copy(options) if options is not None else Options()
+        self.ttl = ttl
+        self._column_family_options = dict(column_families or {})
         self.is_open = False
+        self._start_time = time.time()
+        # Contadores do motor; podem ser compartilhados via Options.statistics
+        self.statistics = self.options.statistics or Statistics()
+        # Cache de blocos compartilhado por todos os leitores de tabela;
+        # Options.block_cache permite compartilhá-lo entre bancos
+        self.block_cache = self.options.block_cache
+        if self.block_cache is None and self.options.block_cache_size > 0:
+            self.block_cache = LRUCache(self.options.block_cache_size)
         
         # Criar diretório se não existir
         os.makedirs(db_path, exist_ok=True)
-        self.data_file = os.path.join(db_path, "data.pkl")
         
-        # Carregar dados existentes
-        self._load_data()
+        # Protege memtables, versão atual e estado do trabalho em segundo plano
+        self._mutex = threading.Lock()
+        self._bg_cv = threading.Condition(self._mutex)
+        self._versions = VersionSet(db_path, self._new_column_family_data)
+        self._log: Optional[wal.LogWriter] = None
+        self._log_number = 0
+        # Tamanho dos logs fechados que alguma família ainda precisa
+        self._alive_logs: Dict[int, int] = {}
+        self._manual_compaction = None
+        # Arquivos de famílias removidas esperam a thread de segundo plano
+        self._obsolete_files_pending = False
+        # Arquivos de tabela sendo ingeridos, ainda fora das versões
+        self._pending_outputs: set = set()
+        # Enquanto positivo, nenhum arquivo é removido (checkpoints e backups)
+        self._file_deletions_disabled = 0
+        self._bg_error: Optional[Exception] = None
+        self._shutting_down = False
+        # Fila de escritas; a primeira é o líder do grupo em andamento
+        self._writers: 'deque[_Writer]' = deque()
+        # Sinalizada quando a fila de escritas esvazia (usada por close())
+        self._writers_empty_cv = threading.Condition(self._mutex)
+        # Snapshots vivos; somem sozinhos quando coletados pelo coletor de lixo
+        self._snapshots: 'weakref.WeakSet[Snapshot]' = weakref.WeakSet()
+        
+        with self._mutex:
+            self._recover()
         self.is_open = True
+        
+        # A thread guarda só uma referência fraca para não impedir o
+        # fechamento automático do banco quando ele deixa de ser usado
+        self._bg_thread = threading.Thread(target=_background_thread_main,
+                                           args=(weakref.ref(self), self._bg_cv),
+                                           name="rocksdb-bg", daemon=True)
+        self._bg_thread.start()
     
-    def _load_data(self):
-        """Carrega dados do arquivo de persistência"""
-        if os.path.exists(self.data_file):
+    def _new_column_family_data(self, id: int, name: str) -> ColumnFamilyData:
+        # Cada família tem sua cópia das opções, alterada só por set_options()
+        options = self._column_family_options.get(name, self.options)
+        if self.ttl is not None:
+            return ColumnFamilyData(id, name, ttl_options(options, self.ttl))
+        return ColumnFamilyData(id, name, copy.copy(options))
+    
+    def _stamp(self, operations):
+        """Anexa o horário da escrita a valores e operandos de merge (bancos com TTL)"""
+        if self.ttl is None:
+            return operations
+        now = time.time()
+        return [(op, key, append_timestamp(value, now), cf) if op in ('put', 'merge')
+                else (op, key, value, cf) for op, key, value, cf in operations]
+    
+    @property
+    def _default_cf(self) -> ColumnFamilyData:
+        return self._versions.column_families[0]
+    
+    def _recover(self):
+        """Carrega o MANIFEST e reaplica os logs ainda não gravados em tabelas"""
+        if not self._versions.recover():
+            self._versions.log_and_apply(self._default_cf)
+            self._import_legacy_data()
+        
+        families = list(self._versions.column_families.values())
+        for cfd in families:
+            for f in cfd.current.all_files():
+                self._get_table(f)
+        
+        log_numbers = []
+        for name in os.listdir(self.db_path):
+            parsed = parse_file_name(name)
+            if parsed and parsed[1] == "log" and parsed[0] >= self._versions.log_number:
+                log_numbers.append(parsed[0])
+        
+        for number in sorted(log_numbers):
+            # Famílias que já gravaram o conteúdo deste log em tabelas o ignoram
+            mems = {cfd.id: cfd.mem for cfd in families if number >= cfd.log_number}
+            for record in wal.read_records(log_file_name(self.db_path, number)):
+                sequence, operations = WriteBatch._decode(record)
+                self._insert_into(mems, sequence, operations)
+                last_sequence = sequence + len(operations) - 1
+                self._versions.last_sequence = max(self._versions.last_sequence, last_sequence)
+            self._alive_logs[number] = os.path.getsize(log_file_name(self.db_path, number))
+            # Nunca reutilizar o número de um log existente
+            self._versions.next_file_number = max(self._versions.next_file_number, number + 1)
+        
+        self._new_log()
+        self._delete_obsolete_files()
+        full = [cfd for cfd in families if cfd.mem.approximate_size >= cfd.options.write_buffer_size]
+        if full:
+            self._switch_memtables(full)
+            for cfd in full:
+                self._flush_memtable_job(cfd)
+    
+    def _import_legacy_data(self):
+        """Converte um banco no formato antigo (data.pkl + wal.log) em um arquivo de tabela"""
+        data_file = os.path.join(self.db_path, "data.pkl")
+        legacy_log = os.path.join(self.db_path, "wal.log")
+        if not os.path.exists(data_file) and not os.path.exists(legacy_log):
+            return
+        
+        mem = MemTable()
+        operations = []
+        if os.path.exists(data_file):
+            with open(data_file, 'rb') as f:
+                operations.extend(('put', key, value, 0) for key, value in pickle.load(f).items())
+        for record in wal.read_records(legacy_log):
+            # O log antigo não tinha número de sequência: só a contagem
+            (count,) = struct.unpack_from("<I", record, 0)
+            operations.extend(WriteBatch._decode_operations(record, count, 4))
+        self._insert_into({0: mem}, self._versions.last_sequence + 1, operations)
+        self._versions.last_sequence += len(operations)
+        
+        cfd = self._default_cf
+        meta = self._write_level0_table(cfd, mem)
+        self._versions.log_and_apply(cfd, added=[(0, meta)] if meta else [])
+        for path in (data_file, legacy_log):
+            if os.path.exists(path):
+                os.remove(path)
+    
+    def _new_log(self):
+        """Abre um novo arquivo de log para a memtable atual"""
+        self._log_number = self._versions.new_file_number()
+        self._log = wal.LogWriter(log_file_name(self.db_path, self._log_number),
+                                  self.options.wal_sync_mode,
+                                  self.options.wal_sync_interval_ms)
+    
+    @staticmethod
+    def _insert_into(mems: Dict[int, MemTable], sequence: int, operations):
+        """Aplica operações já registradas no log às memtables das famílias
+        
+        A operação i do lote recebe o número de sequência sequence + i.
+        Operações de famílias ausentes de mems são ignoradas.
+        """
+        for op, key, value, cf in operations:
+            mem = mems.get(cf)
+            if mem is not None:
+                if op == 'delete_range':
+                    mem.add_range_tombstone(sequence, key, value)
+                else:
+                    mem.add(sequence, _VALUE_TYPES[op], key, value)
+            sequence += 1
+    
+    def _column_family(self, handle: Optional[ColumnFamilyHandle]) -> ColumnFamilyData:
+        """Estado da família do handle (None = "default")"""
+        if handle is None:
+            return self._versions.column_families[0]
+        cfd = self._versions.column_families.get(handle.id)
+        if cfd is None:
+            raise ValueError(f"Column family {handle.name!r} does not exist")
+        return cfd
+    
+    def _check_batch(self, operations):
+        """Rejeita lotes com famílias inexistentes ou merges sem merge_operator"""
+        families = self._versions.column_families
+        for op, cf in {(op[0], op[3]) for op in operations}:
+            cfd = families.get(cf)
+            if cfd is None:
+                raise ValueError(f"Column family {cf} does not exist")
+            if op == 'merge' and cfd.options.merge_operator is None:
+                raise ValueError(f"Column family {cfd.name!r} has no merge_operator")
+    
+    def _check_bg_error(self):
+        if self._bg_error is not None:
+            raise RuntimeError(f"Background error: {self._bg_error}")
+    
+    def _write(self, operations, flush_cfd: Optional[ColumnFamilyData] = None,
+               exclusive: Optional[Callable[[], None]] = None):
+        """Caminho de escrita com commit em grupo
+        
+        Cada escrita entra na fila e espera até ser concluída por um líder ou
+        chegar à frente da fila, quando passa a liderar: junta as escritas
+        seguintes, grava todas em um único registro do log e as insere nas
+        memtables com o mutex liberado. operations=None força a troca da
+        memtable de flush_cfd (usado por flush()) ou executa exclusive com o
+        mutex e sem nenhuma escrita em andamento (usado pela ingestão).
+        As operações são validadas e serializadas antes de entrar na fila:
+        uma escrita inválida falha sozinha, sem afetar o grupo nem o banco.
+        """
+        start = time.perf_counter()
+        ctx = perf_context.current()
+        encoded = None if operations is None else WriteBatch._encode_operations(operations)
+        w = _Writer(operations, encoded)
+        with self._mutex:
+            self._writers.append(w)
+            while not w.done and w is not self._writers[0]:
+                if w.cv is None:
+                    w.cv = threading.Condition(self._mutex)
+                w.cv.wait()
+            if ctx is not None and ctx.timed:
+                ctx.write_thread_wait_nanos += int((time.perf_counter() - start) * 1e9)
+            if w.done:
+                # Gravada por outro líder
+                self.statistics.record_tick(WRITE_DONE_BY_OTHER)
+                self.statistics.record_in_histogram(DB_WRITE, (time.perf_counter() - start) * 1e6)
+                if w.error is not None:
+                    raise w.error
+                return
+            
+            group = [w]
+            error = None
+            try:
+                self._make_room_for_write(flush_cfd)
+            except Exception as e:
+                error = e
+            if error is None and operations is not None:
+                if len(self._writers) > 1:
+                    group = self._build_write_group()
+                    batch = [op for writer in group for op in writer.operations]
+                    bodies = [writer.encoded for writer in group]
+                else:
+                    batch = operations
+                    bodies = [encoded]
+                sequence = self._versions.last_sequence + 1
+                log = self._log
+                mems = {cfd.id: cfd.mem for cfd in self._versions.column_families.values()}
+                # Só o líder escreve no log e na memtable: o mutex pode ser
+                # liberado para leituras e novas escritas entrarem na fila
+                self._mutex.release()
+                try:
+                    # O grupo vira um único registro no log, garantindo atomicidade
+                    record = WriteBatch._encode_record(sequence, len(batch), bodies)
+                    if ctx is not None and ctx.timed:
+                        wal_start = time.perf_counter_ns()
+                        log.add_record(record)
+                        memtable_start = time.perf_counter_ns()
+                        self._insert_into(mems, sequence, batch)
+                        ctx.write_wal_time += memtable_start - wal_start
+                        ctx.write_memtable_time += time.perf_counter_ns() - memtable_start
+                    else:
+                        log.add_record(record)
+                        self._insert_into(mems, sequence, batch)
+                except Exception as e:
+                    error = e
+                finally:
+                    self._mutex.acquire()
+                if error is None:
+                    # Só depois de inserido o grupo fica visível para novas leituras
+                    self._versions.last_sequence = sequence + len(batch) - 1
+                    self.statistics.record_ticks(((WRITE_DONE_BY_SELF, 1),
+                                                  (NUMBER_KEYS_WRITTEN, len(batch)),
+                                                  (BYTES_WRITTEN, len(record)),
+                                                  (WAL_FILE_BYTES, len(record))))
+                else:
+                    # Falha no log ou na memtable: o log pode ter ficado
+                    # inconsistente, então novas escritas falham
+                    self._bg_error = error
+            elif error is None and exclusive is not None:
+                try:
+                    exclusive()
+                except Exception as e:
+                    error = e
+            
+            for writer in group:
+                self._writers.popleft()
+                writer.error = error
+                writer.done = True
+                if writer.cv is not None:
+                    writer.cv.notify()
+            if self._writers:
+                if self._writers[0].cv is not None:
+                    self._writers[0].cv.notify()
+            else:
+                self._writers_empty_cv.notify_all()
+            if operations is not None:
+                self.statistics.record_in_histogram(DB_WRITE, (time.perf_counter() - start) * 1e6)
+            if error is not None:
+                raise error
+    
+    def _build_write_group(self) -> List['_Writer']:
+        """Junta ao líder as escritas seguintes da fila, até um limite de bytes
+        
+        O limite é menor quando a escrita do líder é pequena, para não atrasar
+        escritas pequenas esperando por um grupo grande.
+        """
+        first = self._writers[0]
+        size = len(first.encoded)
+        max_size = MAX_WRITE_GROUP_BYTES
+        if size <= SMALL_WRITE_BYTES:
+            max_size = size + SMALL_WRITE_BYTES
+        group = [first]
+        for i in range(1, len(self._writers)):
+            writer = self._writers[i]
+            if writer.operations is None:
+                # Troca forçada de memtable fica para o próximo grupo
+                break
+            size += len(writer.encoded)
+            if size > max_size:
+                break
+            group.append(writer)
+        return group
+    
+    def _make_room_for_write(self, force: Optional[ColumnFamilyData] = None):
+        """Garante espaço nas memtables, parando a escrita só quando necessário
+        
+        As paradas são explícitas e medidas em STALL_MICROS: uma pausa curta
+        quando o nível 0 de alguma família acumula arquivos demais e uma
+        espera quando uma família cheia ainda tem uma memtable congelada
+        aguardando flush ou está com o nível 0 no limite. Com force, a
+        memtable dessa família é trocada mesmo com espaço, se não estiver vazia.
+        """
+        delayed = force is not None
+        while True:
+            self._check_bg_error()
+            if force is not None and (force.dropped or len(force.mem) == 0):
+                return
+            families = self._versions.column_families.values()
+            full = []
+            slowdown = False
+            for cfd in families:
+                if len(cfd.current.levels[0]) >= cfd.options.level0_slowdown_writes_trigger:
+                    slowdown = True
+                if cfd is force or cfd.mem.approximate_size >= cfd.options.write_buffer_size:
+                    full.append(cfd)
+            if not delayed and slowdown:
+                # Atrasa cada escrita em 1ms para a compactação acompanhar
+                delayed = True
+                start = time.perf_counter()
+                self._mutex.release()
+                try:
+                    time.sleep(0.001)
+                finally:
+                    self._mutex.acquire()
+                self._record_stall(start)
+                continue
+            if self._log.size + sum(self._alive_logs.values()) >= self.options.max_total_wal_size:
+                # Log grande demais: todas as famílias com dados liberam os logs antigos
+                full = [cfd for cfd in families if len(cfd.mem) > 0]
+            if not full:
+                return
+            if any(cfd.imm is not None or len(cfd.current.levels[0]) >= cfd.options.level0_stop_writes_trigger
+                   for cfd in full):
+                start = time.perf_counter()
+                self._bg_cv.wait()
+                self._record_stall(start)
+            else:
+                self._switch_memtables(full)
+                force = None
+    
+    def _record_stall(self, start: float):
+        micros = (time.perf_counter() - start) * 1e6
+        self.statistics.record_tick(STALL_MICROS, int(micros))
+        self.statistics.record_in_histogram(WRITE_STALL, micros)
+        ctx = perf_context.current()
+        if ctx is not None and ctx.timed:
+            ctx.write_delay_time += int(micros * 1000)
+    
+    def _switch_memtables(self, families: List[ColumnFamilyData]):
+        """Congela as memtables das famílias; novas escritas vão para memtables e um log novos"""
+        for cfd in families:
+            cfd.imm = cfd.mem
+            cfd.mem = cfd.new_memtable()
+        self._alive_logs[self._log_number] = self._log.size
+        self._log.close()
+        self._new_log()
+        for cfd in families:
+            cfd.imm_log_number = self._log_number
+        # Famílias sem nenhum dado fora das tabelas não prendem mais os logs antigos
+        for cfd in self._versions.column_families.values():
+            if cfd.imm is None and len(cfd.mem) == 0:
+                cfd.log_number = self._log_number
+        self._bg_cv.notify_all()
+    
+    def flush(self, column_family: Optional[ColumnFamilyHandle] = None):
+        """Grava a memtable atual da família em um arquivo de tabela e espera a conclusão"""
+        cfd = self._column_family(column_family)
+        # A troca de memtable passa pela fila de escritas para não disputar
+        # o log com um líder em andamento
+        self._write(None, cfd)
+        with self._mutex:
+            while cfd.imm is not None and not cfd.dropped:
+                self._check_bg_error()
+                self._bg_cv.wait()
+    
+    def compact_range(self, begin: Optional[bytes] = None, end: Optional[bytes] = None,
+                      column_family: Optional[ColumnFamilyHandle] = None):
+        """Compacta manualmente as chaves da família em [begin, end] (None = sem limite)"""
+        if not self.is_open:
+            raise RuntimeError("Database is closed")
+        cfd = self._column_family(column_family)
+        self.flush(column_family)
+        with self._mutex:
+            while self._manual_compaction is not None:
+                self._bg_cv.wait()
+            request = {'cfd': cfd, 'begin': begin, 'end': end, 'done': False}
+            self._manual_compaction = request
+            self._bg_cv.notify_all()
+            while not request['done']:
+                self._check_bg_error()
+                self._bg_cv.wait()
+    
+    def _has_background_work(self) -> bool:
+        if self._manual_compaction is not None or self._obsolete_files_pending:
+            return True
+        families = self._versions.column_families.values()
+        return any(cfd.imm is not None for cfd in families) or \
+            any(self._max_compaction_score(cfd) >= 1 for cfd in families)
+    
+    @staticmethod
+    def _max_compaction_score(cfd: ColumnFamilyData) -> float:
+        if cfd.options.disable_auto_compactions:
+            return 0
+        version = cfd.current
+        return max((compaction_score(version, cfd.options, level)
+                    for level in range(version.num_levels - 1)), default=0)
+    
+    def _background_work(self):
+        """Executa uma unidade de trabalho: flush, compactação manual ou automática"""
+        families = list(self._versions.column_families.values())
+        flushing = next((cfd for cfd in families if cfd.imm is not None), None)
+        if flushing is not None:
+            self._flush_memtable_job(flushing)
+        elif self._manual_compaction is not None:
+            request = self._manual_compaction
+            try:
+                self._manual_compaction_job(request['cfd'], request['begin'], request['end'])
+            finally:
+                request['done'] = True
+                self._manual_compaction = None
+        elif families:
+            # A família mais atrasada em relação aos seus tamanhos alvo compacta primeiro
+            cfd = max(families, key=self._max_compaction_score)
+            if self._max_compaction_score(cfd) >= 1:
+                c = pick_compaction(cfd.current, cfd.options, cfd.compact_pointers)
+                if c is not None:
+                    self._compaction_job(cfd, c)
+        if self._obsolete_files_pending:
+            self._delete_obsolete_files()
+    
+    def _flush_memtable_job(self, cfd: ColumnFamilyData):
+        """Grava a memtable congelada da família no nível 0; o mutex é liberado durante o I/O"""
+        imm = cfd.imm
+        snapshots = self._live_snapshots()
+        start = time.perf_counter()
+        self._mutex.release()
+        try:
+            meta = self._write_level0_table(cfd, imm, snapshots)
+        finally:
+            self._mutex.acquire()
+        self.statistics.record_in_histogram(FLUSH_TIME, (time.perf_counter() - start) * 1e6)
+        if meta is not None:
+            self._get_table(meta)
+            self.statistics.record_tick(FLUSH_WRITE_BYTES, meta.file_size)
+        # Logs anteriores ao da troca de memtable deixam de ter dados da família
+        self._versions.log_and_apply(cfd, added=[(0, meta)] if meta else [],
+                                     log_number=cfd.imm_log_number)
+        cfd.imm = None
+        self._delete_obsolete_files()
+    
+    def _manual_compaction_job(self, cfd: ColumnFamilyData, begin: Optional[bytes], end: Optional[bytes]):
+        """Leva as chaves do intervalo nível a nível até o último nível com dados"""
+        version = cfd.current
+        last_level = max((level for level in range(version.num_levels) if version.levels[level]),
+                         default=0)
+        for level in range(max(1, last_level)):
+            if cfd.dropped:
+                break
+            c = compaction_for_range(cfd.current, level, begin, end)
+            if c is not None:
+                self._compaction_job(cfd, c)
+    
+    def _compaction_job(self, cfd: ColumnFamilyData, c: Compaction):
+        """Executa a compactação; o mutex é liberado enquanto os arquivos são gravados"""
+        deleted = [(level, f.number) for level, f in c.all_inputs()]
+        if c.is_trivial_move():
+            added = [(c.output_level, c.inputs[0])]
+        else:
+            job = CompactionJob(c, self.db_path, cfd.options, self._versions.new_file_number,
+                                self._get_table, self.statistics, self._live_snapshots(),
+                                self.options.rate_limiter)
+            start = time.perf_counter()
+            self._mutex.release()
             try:
-                with open(self.data_file, 'rb') as f:
-                    self.data = pickle.load(f)
-            except:
-                self.data = {}
+                outputs = job.run()
+                for meta in outputs:
+                    self._get_table(meta)
+            finally:
+                self._mutex.acquire()
+            self.statistics.record_in_histogram(COMPACTION_TIME, (time.perf_counter() - start) * 1e6)
+            added = [(c.output_level, meta) for meta in outputs]
+        self._versions.log_and_apply(cfd, added=added, deleted=deleted)
+        cfd.compact_pointers[c.level] = max(f.largest for f in c.inputs)
+        self._delete_obsolete_files()
+    
+    def _write_level0_table(self, cfd: ColumnFamilyData, mem: MemTable,
+                            snapshots: List[int] = ()) -> Optional[FileMetaData]:
+        """Grava o conteúdo de uma memtable em um novo arquivo de tabela da família
+        
+        Só são gravadas as versões que a leitura atual ou algum snapshot enxerga
+        e que nenhum range tombstone da memtable esconde de todos eles.
+        """
+        number = self._versions.new_file_number()
+        builder = TableBuilder(table_file_name(self.db_path, number), cfd.options,
+                               compression_for_level(cfd.options, 0), self.statistics,
+                               rate_limiter=self.options.rate_limiter, io_priority=IO_HIGH)
+        merge_operator = cfd.options.merge_operator
+        range_del = mem.range_del()
+        for key in mem.sorted_keys():
+            versions = mem.get(key)
+            if range_del is not None:
+                versions = [v for v in versions if not range_del.covered_in_stripe(key, v[0], snapshots)]
+                if not versions:
+                    continue
+            builder.add(key, visible_versions(versions, snapshots, key, merge_operator))
+        for sequence, begin, end in mem.range_tombstones:
+            builder.add_range_tombstone(sequence, begin, end)
+        if builder.num_entries == 0 and not builder.range_tombstones:
+            builder.abandon()
+            return None
+        file_size = builder.finish()
+        smallest, largest = builder.key_range()
+        return FileMetaData(number, file_size, smallest, largest, builder.num_entries)
+    
+    def _delete_obsolete_files(self):
+        """Remove logs já incorporados e tabelas que não fazem parte das versões atuais
+        
+        Só é chamado pela thread de segundo plano (ou antes de ela existir),
+        para não remover um arquivo que um flush ou compactação está gravando.
+        Com as remoções desativadas, fica para enable_file_deletions().
+        """
+        self._obsolete_files_pending = False
+        if self._file_deletions_disabled:
+            return
+        live_tables = self._versions.live_files() | self._pending_outputs
+        log_number = self._versions.log_number
+        for number in [n for n in self._alive_logs if n < log_number]:
+            del self._alive_logs[number]
+        for name in os.listdir(self.db_path):
+            parsed = parse_file_name(name)
+            if parsed is None:
+                continue
+            number, ext = parsed
+            # Leitores de versões antigas continuam válidos: o mmap mantém o
+            # conteúdo acessível mesmo depois da remoção do arquivo
+            if (ext == "log" and number < log_number) or \
+                    (ext == "sst" and number not in live_tables):
+                os.remove(os.path.join(self.db_path, name))
+    
+    def _get_table(self, meta: FileMetaData) -> TableReader:
+        """Retorna o leitor do arquivo de tabela, abrindo-o na primeira vez"""
+        if meta.table_reader is None:
+            meta.table_reader = TableReader(table_file_name(self.db_path, meta.number),
+                                            self.statistics, self.block_cache, meta.global_seqno)
+        return meta.table_reader
     
-    def _save_data(self):
-        """Salva dados no arquivo de persistência"""
-        with open(self.data_file, 'wb') as f:
-            pickle.dump(self.data, f)
+    def _get_state(self, cfd: ColumnFamilyData):
+        """Referências consistentes para memtables e versão atual da família e última sequência"""
+        with self._mutex:
+            return cfd.mem, cfd.imm, cfd.current, self._versions.last_sequence
     
-    def put(self, key: bytes, value: bytes):
+    def _live_snapshots(self) -> List[int]:
+        """Números de sequência dos snapshots vivos, em ordem crescente"""
+        return sorted({snapshot.sequence for snapshot in list(self._snapshots)})
+    
+    def _new_internal_iterator(self, cfd: ColumnFamilyData, lower: Optional[bytes] = None,
+                               upper: Optional[bytes] = None, prefix: Optional[bytes] = None):
+        """Visão ordenada de memtables e arquivos da família, do mais novo para o mais antigo
+        
+        Arquivos fora de [lower, upper) ficam de fora e os iteradores de tabela
+        não leem blocos além dos limites. Com prefix, também ficam de fora as
+        memtables e arquivos cujo filtro de prefixo o descarta, mas os seus
+        range tombstones continuam valendo.
+        Retorna o iterador, o número de sequência atual e os range tombstones.
+        """
+        mem, imm, version, sequence = self._get_state(cfd)
+        extractor = cfd.options.prefix_extractor
+        filter_prefix = None
+        if prefix is not None and extractor is not None and extractor.in_domain(prefix):
+            filter_prefix = extractor.transform(prefix)
+        
+        def may_match_file(f: FileMetaData) -> bool:
+            if (lower is not None and f.largest < lower) or (upper is not None and f.smallest >= upper):
+                return False
+            return filter_prefix is None or \
+                self._get_table(f).prefix_may_match(filter_prefix, extractor.name())
+        
+        def new_table_iterator(f: FileMetaData) -> TableIterator:
+            return TableIterator(self._get_table(f), lower, upper)
+        
+        tombstones = [t for m in (mem, imm) if m is not None for t in list(m.range_tombstones)]
+        for f in version.all_files():
+            range_del = self._get_table(f).range_del
+            if range_del is not None and (lower is None or f.largest >= lower) and \
+                    (upper is None or f.smallest < upper):
+                tombstones.extend(range_del.tombstones)
+        
+        children = [MemTableIterator(m) for m in (mem, imm)
+                    if m is not None and (filter_prefix is None or m.prefix_may_match(filter_prefix))]
+        for f in version.levels[0]:
+            if may_match_file(f):
+                children.append(new_table_iterator(f))
+        for files in version.levels[1:]:
+            files = tuple(f for f in files if may_match_file(f))
+            if files:
+                children.append(LevelIterator(files, new_table_iterator))
+        return MergingIterator(children), sequence, tombstones
+    
+    def put(self, key: bytes, value: bytes, column_family: Optional[ColumnFamilyHandle] = None):
         """Insere ou atualiza um valor"""
         if not self.is_open:
             raise RuntimeError("Database is closed")
-        self.data[key] = value
-        self._save_data()
+        self._write(self._stamp([('put', key, value, self._column_family(column_family).id)]))
     
-    def get(self, key: bytes) -> Optional[bytes]:
-        """Recupera um valor pela chave"""
+    def get(self, key: bytes, snapshot: Optional['Snapshot'] = None,
+            column_family: Optional[ColumnFamilyHandle] = None) -> Optional[bytes]:
+        """Recupera um valor pela chave, opcionalmente como estava em um snapshot"""
         if not self.is_open:
             raise RuntimeError("Database is closed")
-        return self.data.get(key)
+        start = time.perf_counter()
+        cfd = self._column_family(column_family)
+        mem, imm, version, sequence = self._get_state(cfd)
+        if snapshot is not None:
+            sequence = snapshot.sequence
+        value, source = self._get(cfd, key, mem, imm, version, sequence, perf_context.current())
+        if self.ttl is not None:
+            value = read_value(value, self.ttl)
+        ticks = [(NUMBER_KEYS_READ, 1),
+                 (MEMTABLE_HIT if source == _SOURCE_MEMTABLE else MEMTABLE_MISS, 1)]
+        if source is not None and source >= 0:
+            ticks.append((_GET_HIT_TICKERS[min(source, 2)], 1))
+        if value is not None:
+            ticks.append((BYTES_READ, len(value)))
+        self.statistics.record_ticks(ticks)
+        self.statistics.record_in_histogram(DB_GET, (time.perf_counter() - start) * 1e6)
+        return value
+    
+    def _get(self, cfd: ColumnFamilyData, key: bytes, mem: MemTable, imm: Optional[MemTable],
+             version, sequence: int, ctx: Optional[perf_context.PerfContext]):
+        """Valor da chave em sequence e a fonte onde a busca terminou
+        
+        A fonte é _SOURCE_MEMTABLE, o nível do arquivo ou None se a chave
+        não foi encontrada em nenhuma fonte.
+        """
+        # Procura da fonte mais nova para a mais antiga; a primeira versão
+        # visível vence, e operandos de merge acumulam até achar a base.
+        # cutoff é a sequência do range tombstone mais novo que cobre a chave
+        merge_operator = cfd.options.merge_operator
+        operands = []
+        cutoff = 0
+        timed = ctx is not None and ctx.timed
+        start = time.perf_counter_ns() if timed else 0
+        for m in (mem, imm):
+            if m is not None:
+                if ctx is not None:
+                    ctx.get_from_memtable_count += 1
+                if m.range_tombstones:
+                    cutoff = max(cutoff, m.range_del().max_covering(key, sequence))
+                entry = _lookup(m.get(key), sequence, operands, cutoff)
+                if entry is not None:
+                    if timed:
+                        ctx.get_from_memtable_time += time.perf_counter_ns() - start
+                    return _resolve(merge_operator, key, entry, operands), _SOURCE_MEMTABLE
+        if timed:
+            now = time.perf_counter_ns()
+            ctx.get_from_memtable_time += now - start
+            start = now
+        source = None
+        entry = None
+        for f in version.levels[0]:
+            if f.smallest <= key <= f.largest:
+                reader = self._get_table(f)
+                if reader.range_del is not None:
+                    cutoff = max(cutoff, reader.range_del.max_covering(key, sequence))
+                entry = _lookup(reader.get(key), sequence, operands, cutoff)
+                if entry is not None:
+                    source = 0
+                    break
+        if entry is None:
+            for level in range(1, version.num_levels):
+                f = version.find_file(level, key)
+                if f is not None:
+                    reader = self._get_table(f)
+                    if reader.range_del is not None:
+                        cutoff = max(cutoff, reader.range_del.max_covering(key, sequence))
+                    entry = _lookup(reader.get(key), sequence, operands, cutoff)
+                    if entry is not None:
+                        source = level
+                        break
+        if timed:
+            ctx.get_from_output_files_time += time.perf_counter_ns() - start
+        if entry is None and not operands:
+            return None, None
+        return _resolve(merge_operator, key, entry, operands), source
     
-    def delete(self, key: bytes):
+    def multi_get(self, keys: List[bytes], snapshot: Optional['Snapshot'] = None,
+                  column_family: Optional[ColumnFamilyHandle] = None) -> List[Optional[bytes]]:
+        """Recupera vários valores de uma vez, na ordem das chaves recebidas
+        
+        As chaves são ordenadas e percorridas fonte a fonte: cada arquivo de
+        tabela recebe de uma vez todas as chaves do seu intervalo e lê cada
+        bloco uma única vez.
+        """
+        if not self.is_open:
+            raise RuntimeError("Database is closed")
+        start = time.perf_counter()
+        cfd = self._column_family(column_family)
+        merge_operator = cfd.options.merge_operator
+        mem, imm, version, sequence = self._get_state(cfd)
+        if snapshot is not None:
+            sequence = snapshot.sequence
+        found: Dict[bytes, Optional[bytes]] = {}
+        # Operandos de merge já vistos das chaves ainda sem base
+        merging: Dict[bytes, List[bytes]] = {}
+        # Sequência do range tombstone mais novo que cobre cada chave
+        cutoffs: Dict[bytes, int] = {}
+        
+        def cover(keys: List[bytes], range_del: Optional[FragmentedRangeTombstones]):
+            """Aplica os range tombstones de uma fonte às chaves ainda pendentes"""
+            if range_del is not None:
+                for key in keys:
+                    cutoff = range_del.max_covering(key, sequence)
+                    if cutoff > cutoffs.get(key, 0):
+                        cutoffs[key] = cutoff
+        
+        def resolved(key: bytes, versions) -> bool:
+            """Registra o valor se a fonte tem uma versão visível da chave"""
+            operands = merging.pop(key, [])
+            entry = _lookup(versions, sequence, operands, cutoffs.get(key, 0))
+            if entry is None:
+                if operands:
+                    merging[key] = operands
+                return False
+            found[key] = _resolve(merge_operator, key, entry, operands)
+            return True
+        
+        pending = sorted(set(keys))
+        for m in (mem, imm):
+            if m is not None and pending:
+                cover(pending, m.range_del())
+                pending = [key for key in pending if not resolved(key, m.get(key))]
+        for level in range(version.num_levels):
+            if not pending:
+                break
+            hits = {}
+            for f in version.levels[level]:
+                lo = bisect_left(pending, f.smallest)
+                hi = bisect_right(pending, f.largest, lo)
+                if lo == hi:
+                    continue
+                cover(pending[lo:hi], self._get_table(f).range_del)
+                if level == 0:
+                    # Arquivos do nível 0 se sobrepõem: o mais novo resolve primeiro
+                    file_hits = self._get_table(f).multi_get(pending[lo:hi])
+                    if file_hits:
+                        pending = [key for key in pending
+                                   if key not in file_hits or not resolved(key, file_hits[key])]
+                else:
+                    hits.update(self._get_table(f).multi_get(pending[lo:hi]))
+            if hits:
+                pending = [key for key in pending if key not in hits or not resolved(key, hits[key])]
+        for key, operands in merging.items():
+            found[key] = _resolve(merge_operator, key, None, operands)
+        self.statistics.record_ticks(((NUMBER_MULTIGET_CALLS, 1), (NUMBER_MULTIGET_KEYS_READ, len(keys))))
+        self.statistics.record_in_histogram(DB_MULTIGET, (time.perf_counter() - start) * 1e6)
+        if self.ttl is not None:
+            return [read_value(found.get(key), self.ttl) for key in keys]
+        return [found.get(key) for key in keys]
+    
+    def merge(self, key: bytes, operand: bytes, column_family: Optional[ColumnFamilyHandle] = None):
+        """Grava um operando para o merge_operator da família, sem ler o valor atual"""
+        if not self.is_open:
+            raise RuntimeError("Database is closed")
+        cfd = self._column_family(column_family)
+        if cfd.options.merge_operator is None:
+            raise ValueError(f"Column family {cfd.name!r} has no merge_operator")
+        self._write(self._stamp([('merge', key, operand, cfd.id)]))
+    
+    def delete(self, key: bytes, column_family: Optional[ColumnFamilyHandle] = None):
         """Remove uma chave"""
         if not self.is_open:
             raise RuntimeError("Database is closed")
-        if key in self.data:
-            del self.data[key]
-            self._save_data()
+        self._write([('delete', key, None, self._column_family(column_family).id)])
+    
+    def delete_range(self, begin: bytes, end: bytes, column_family: Optional[ColumnFamilyHandle] = None):
+        """Remove todas as chaves em [begin, end) com uma única escrita (range tombstone)"""
+        if not self.is_open:
+            raise RuntimeError("Database is closed")
+        self._write([('delete_range', begin, end, self._column_family(column_family).id)])
+    
+    def iterkeys(self, snapshot: Optional['Snapshot'] = None, prefix: Optional[bytes] = None,
+                 iterate_lower_bound: Optional[bytes] = None,
+                 iterate_upper_bound: Optional[bytes] = None,
+                 column_family: Optional[ColumnFamilyHandle] = None):
+        """Retorna iterador de chaves
+        
+        prefix restringe às chaves com o prefixo; iterate_lower_bound
+        (inclusivo) e iterate_upper_bound (exclusivo) restringem ao intervalo.
+        """
+        return RocksDBIterator(self, 'keys', snapshot, prefix,
+                               iterate_lower_bound, iterate_upper_bound, column_family)
+    
+    def itervalues(self, snapshot: Optional['Snapshot'] = None, prefix: Optional[bytes] = None,
+                   iterate_lower_bound: Optional[bytes] = None,
+                   iterate_upper_bound: Optional[bytes] = None,
+                   column_family: Optional[ColumnFamilyHandle] = None):
+        """Retorna iterador de valores; mesmos filtros de iterkeys()"""
+        return RocksDBIterator(self, 'values', snapshot, prefix,
+                               iterate_lower_bound, iterate_upper_bound, column_family)
+    
+    def iteritems(self, snapshot: Optional['Snapshot'] = None, prefix: Optional[bytes] = None,
+                  iterate_lower_bound: Optional[bytes] = None,
+                  iterate_upper_bound: Optional[bytes] = None,
+                  column_family: Optional[ColumnFamilyHandle] = None):
+        """Retorna iterador de pares chave-valor; mesmos filtros de iterkeys()"""
+        return RocksDBIterator(self, 'items', snapshot, prefix,
+                               iterate_lower_bound, iterate_upper_bound, column_family)
+    
+    def create_column_family(self, name: str, options: Optional['Options'] = None) -> ColumnFamilyHandle:
+        """Cria uma família de colunas com opções próprias (None = opções do banco)"""
+        if not self.is_open:
+            raise RuntimeError("Database is closed")
+        with self._mutex:
+            if any(cfd.name == name for cfd in self._versions.column_families.values()):
+                raise ValueError(f"Column family {name!r} already exists")
+            self._column_family_options[name] = options or self.options
+            # Os dados da família nova começam no log atual
+            cfd = self._versions.create_column_family(name, self._log_number)
+        return cfd.handle
+    
+    def drop_column_family(self, column_family: ColumnFamilyHandle):
+        """Remove a família e todos os seus dados
+        
+        Os arquivos de tabela são apagados pela thread de segundo plano;
+        iteradores já abertos sobre a família continuam válidos.
+        """
+        if not self.is_open:
+            raise RuntimeError("Database is closed")
+        if column_family.id == 0:
+            raise ValueError("The default column family cannot be dropped")
+        with self._mutex:
+            cfd = self._column_family(column_family)
+            self._versions.drop_column_family(cfd)
+            self._column_family_options.pop(cfd.name, None)
+            self._obsolete_files_pending = True
+            self._bg_cv.notify_all()
+    
+    def ingest_external_file(self, paths: List[str], column_family: Optional[ColumnFamilyHandle] = None,
+                             move_files: bool = False):
+        """Incorpora à família arquivos gerados por SstFileWriter, sem passar pelo log
+        
+        Cada arquivo vai para o nível mais profundo em que não se sobrepõe a
+        nenhum dado da família e só recebe uma sequência nova se sobrepuser
+        algum dado ou houver snapshots (que assim não o enxergam). Antes, a
+        memtable é gravada se tiver chaves no intervalo de algum arquivo. Os
+        arquivos não podem se sobrepor entre si; com move_files, são
+        ligados (hard link) ao banco e removidos da origem em vez de copiados.
+        """
+        if not self.is_open:
+            raise RuntimeError("Database is closed")
+        if self.ttl is not None:
+            # Os valores dos arquivos externos não têm o horário da escrita
+            raise ValueError("External files cannot be ingested into a database with ttl")
+        cfd = self._column_family(column_family)
+        files = []
+        for path in paths:
+            reader = TableReader(path)
+            try:
+                if not reader.properties.get('external_sst_file'):
+                    raise ValueError(f"Not an external table file: {path}")
+                smallest, largest = reader.key_range()
+                num_entries = reader.properties['num_entries']
+            finally:
+                reader.close()
+            if smallest is None:
+                raise ValueError(f"External table file is empty: {path}")
+            files.append((smallest, largest, num_entries, path))
+        files.sort()
+        for previous, f in zip(files, files[1:]):
+            if f[0] <= previous[1]:
+                raise ValueError(f"External files overlap: {previous[3]} and {f[3]}")
+        
+        numbers = [self._versions.new_file_number() for _ in files]
+        with self._mutex:
+            self._pending_outputs.update(numbers)
+        metas = []
+        try:
+            for number, (smallest, largest, num_entries, path) in zip(numbers, files):
+                target = table_file_name(self.db_path, number)
+                linked = False
+                if move_files:
+                    try:
+                        os.link(path, target)
+                        linked = True
+                    except OSError:
+                        pass
+                if not linked:
+                    _copy_file(path, target)
+                metas.append(FileMetaData(number, os.path.getsize(target), smallest, largest,
+                                          num_entries))
+            self._write(None, exclusive=lambda: self._install_external_files(cfd, metas))
+        except Exception:
+            for meta in metas:
+                os.remove(table_file_name(self.db_path, meta.number))
+            raise
+        finally:
+            with self._mutex:
+                self._pending_outputs.difference_update(numbers)
+        if move_files:
+            for path in paths:
+                os.remove(path)
+    
+    def _install_external_files(self, cfd: ColumnFamilyData, metas: List[FileMetaData]):
+        """Escolhe nível e sequência dos arquivos ingeridos e os registra no MANIFEST
+        
+        Roda na frente da fila de escritas, então nenhuma sequência está em uso.
+        """
+        if cfd.dropped:
+            raise ValueError(f"Column family {cfd.name!r} was dropped")
+        if any(_memtable_overlaps(m, meta.smallest, meta.largest)
+               for m in (cfd.mem, cfd.imm) if m is not None for meta in metas):
+            # Dados da memtable seriam lidos antes dos arquivos: grava-os primeiro
+            self._make_room_for_write(cfd)
+            while cfd.imm is not None and not cfd.dropped:
+                self._check_bg_error()
+                self._bg_cv.wait()
+            if cfd.dropped:
+                raise ValueError(f"Column family {cfd.name!r} was dropped")
+        
+        version = cfd.current
+        overlap = False
+        added = []
+        for meta in metas:
+            target = 0
+            for level in range(version.num_levels):
+                if version.overlapping_files(level, meta.smallest, meta.largest):
+                    overlap = True
+                    break
+                target = level
+            added.append((target, meta))
+        previous_sequence = self._versions.last_sequence
+        if overlap or len(self._snapshots) > 0:
+            # Mais nova que tudo o que já existe no banco
+            self._versions.last_sequence += 1
+            for meta in metas:
+                meta.global_seqno = self._versions.last_sequence
+        try:
+            self._versions.log_and_apply(cfd, added=added)
+        except Exception:
+            self._versions.last_sequence = previous_sequence
+            raise
+        for meta in metas:
+            self._get_table(meta)
+        self._bg_cv.notify_all()
+    
+    def disable_file_deletions(self):
+        """Impede a remoção de arquivos obsoletos até o enable_file_deletions() correspondente"""
+        with self._mutex:
+            self._file_deletions_disabled += 1
+    
+    def enable_file_deletions(self):
+        with self._mutex:
+            if self._file_deletions_disabled > 0:
+                self._file_deletions_disabled -= 1
+            if not self._file_deletions_disabled:
+                self._obsolete_files_pending = True
+                self._bg_cv.notify_all()
+    
+    def get_live_files_storage_info(self) -> List['LiveFileStorageInfo']:
+        """Arquivos que formam um estado consistente do banco, para cópia
+        
+        O estado é capturado na frente da fila de escritas: dos logs, só os
+        primeiros size bytes pertencem a ele, e o conteúdo do MANIFEST vem
+        junto. Chame disable_file_deletions() antes para que os arquivos
+        continuem existindo durante a cópia.
+        """
+        if not self.is_open:
+            raise RuntimeError("Database is closed")
+        files: List[LiveFileStorageInfo] = []
+        
+        def capture():
+            for number in sorted(self._versions.live_files()):
+                name = os.path.basename(table_file_name(self.db_path, number))
+                files.append(LiveFileStorageInfo(
+                    name, os.path.getsize(os.path.join(self.db_path, name)), "table"))
+            log_number = self._versions.log_number
+            logs = {number: size for number, size in self._alive_logs.items() if number >= log_number}
+            logs[self._log_number] = self._log.size
+            for number in sorted(logs):
+                files.append(LiveFileStorageInfo(
+                    os.path.basename(log_file_name(self.db_path, number)), logs[number], "log"))
+            with open(self._versions.manifest_file, 'rb') as f:
+                manifest = f.read()
+            files.append(LiveFileStorageInfo(MANIFEST_FILE, len(manifest), "manifest", manifest))
+        
+        self._write(None, exclusive=capture)
+        return files
     
-    def iterkeys(self):
-        """Retorna iterador de chaves"""
-        return RocksDBIterator(self.data, 'keys')
+    def create_checkpoint(self, checkpoint_dir: str):
+        """Cria em checkpoint_dir uma cópia consistente do banco, que pode ser aberta com DB()
+        
+        Os arquivos de tabela, imutáveis, são ligados com hard links (ou
+        copiados, em outro sistema de arquivos); só os logs vivos e o
+        MANIFEST são copiados. O diretório não pode existir.
+        """
+        if os.path.exists(checkpoint_dir):
+            raise ValueError(f"Checkpoint directory already exists: {checkpoint_dir}")
+        tmp_dir = checkpoint_dir.rstrip(os.sep) + ".tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        self.disable_file_deletions()
+        try:
+            for info in self.get_live_files_storage_info():
+                src = os.path.join(self.db_path, info.relative_filename)
+                dst = os.path.join(tmp_dir, info.relative_filename)
+                if info.replacement_contents is not None:
+                    with open(dst, 'wb') as f:
+                        f.write(info.replacement_contents)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    continue
+                if info.file_type == "table":
+                    try:
+                        os.link(src, dst)
+                        continue
+                    except OSError:
+                        pass
+                _copy_file(src, dst, info.size)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        finally:
+            self.enable_file_deletions()
+        os.rename(tmp_dir, checkpoint_dir)
     
-    def itervalues(self):
-        """Retorna iterador de valores"""
-        return RocksDBIterator(self.data, 'values')
+    def get_property(self, name: str, column_family: Optional[ColumnFamilyHandle] = None) -> Optional[str]:
+        """Valor textual de uma propriedade do banco, ou None se ela não existe
+        
+        rocksdb.stats reúne os níveis da família, os totais do banco e todos
+        os contadores e histogramas; rocksdb.levelstats,
+        rocksdb.options-statistics, rocksdb.num-files-at-level<N>,
+        rocksdb.estimate-num-keys, rocksdb.cur-size-all-mem-tables,
+        rocksdb.num-immutable-mem-table e rocksdb.num-snapshots trazem só uma parte.
+        """
+        if not self.is_open:
+            raise RuntimeError("Database is closed")
+        cfd = self._column_family(column_family)
+        with self._mutex:
+            mem, imm, version = cfd.mem, cfd.imm, cfd.current
+            num_snapshots = len(self._snapshots)
+        prefix = "rocksdb.num-files-at-level"
+        if name.startswith(prefix):
+            level = name[len(prefix):]
+            if not level.isdigit() or int(level) >= version.num_levels:
+                return None
+            return str(len(version.levels[int(level)]))
+        if name == "rocksdb.estimate-num-keys":
+            entries = sum(f.num_entries for f in version.all_files())
+            return str(entries + sum(len(m) for m in (mem, imm) if m is not None))
+        if name == "rocksdb.cur-size-all-mem-tables":
+            return str(sum(m.approximate_size for m in (mem, imm) if m is not None))
+        if name == "rocksdb.num-immutable-mem-table":
+            return str(int(imm is not None))
+        if name == "rocksdb.num-snapshots":
+            return str(num_snapshots)
+        if name == "rocksdb.levelstats":
+            return self._level_stats(cfd, version)
+        if name == "rocksdb.options-statistics":
+            return self.statistics.to_string()
+        if name == "rocksdb.stats":
+            return "\n".join([self._level_stats(cfd, version), self._db_stats(),
+                              self.statistics.to_string()])
+        return None
     
-    def iteritems(self):
-        """Retorna iterador de pares chave-valor"""
-        return RocksDBIterator(self.data, 'items')
+    def get_int_property(self, name: str, column_family: Optional[ColumnFamilyHandle] = None) -> Optional[int]:
+        """Propriedades numéricas de get_property() como inteiro"""
+        value = self.get_property(name, column_family)
+        return int(value) if value is not None and value.isdigit() else None
+    
+    @staticmethod
+    def _level_stats(cfd: ColumnFamilyData, version) -> str:
+        lines = [f"** Compaction Stats [{cfd.name}] **",
+                 "Level  Files   Size(MB)  Score  Entries"]
+        for level in range(version.num_levels):
+            files = version.levels[level]
+            score = (compaction_score(version, cfd.options, level)
+                     if level < version.num_levels - 1 else 0.0)
+            lines.append(f"  L{level}  {len(files):5d}  {version.level_bytes(level) / 1048576:9.2f}  "
+                         f"{score:5.2f}  {sum(f.num_entries for f in files):7d}")
+        lines.append(f" Sum  {len(version.all_files()):5d}  "
+                     f"{sum(f.file_size for f in version.all_files()) / 1048576:9.2f}")
+        return "\n".join(lines)
+    
+    def _db_stats(self) -> str:
+        statistics = self.statistics
+        uptime = time.time() - self._start_time
+        writes = (statistics.get_ticker_count(WRITE_DONE_BY_SELF) +
+                  statistics.get_ticker_count(WRITE_DONE_BY_OTHER))
+        groups = statistics.get_ticker_count(WRITE_DONE_BY_SELF)
+        keys = statistics.get_ticker_count(NUMBER_KEYS_WRITTEN)
+        written_mb = statistics.get_ticker_count(BYTES_WRITTEN) / 1048576
+        stall = statistics.get_ticker_count(STALL_MICROS) / 1e6
+        lines = ["** DB Stats **",
+                 f"Uptime(secs): {uptime:.1f}",
+                 f"Cumulative writes: {writes} writes, {keys} keys, {groups} commit groups, "
+                 f"{writes / groups if groups else 0:.1f} writes per commit group, "
+                 f"ingest: {written_mb:.2f} MB, {written_mb / uptime if uptime else 0:.2f} MB/s",
+                 f"Cumulative WAL: {groups} writes, "
+                 f"{statistics.get_ticker_count(WAL_FILE_BYTES) / 1048576:.2f} MB written",
+                 f"Cumulative stall: {stall:.3f} secs, {100 * stall / uptime if uptime else 0:.1f} percent"]
+        limiter = self.options.rate_limiter
+        if limiter is not None:
+            lines.append(f"Rate limiter: {limiter.get_bytes_per_second() / 1048576:.2f} MB/s, "
+                         f"{limiter.get_total_bytes_through() / 1048576:.2f} MB through, "
+                         f"{limiter.get_total_requests()} requests, "
+                         f"waited {limiter.get_total_wait_micros() / 1e6:.3f} secs "
+                         f"(flush {limiter.get_total_wait_micros(IO_HIGH) / 1e6:.3f})")
+        lines.append("** Latency (micros) **")
+        for histogram in (DB_GET, DB_WRITE, DB_MULTIGET, DB_SEEK, FLUSH_TIME, COMPACTION_TIME):
+            d = statistics.get_histogram_data(histogram)
+            if d.count:
+                lines.append(f"{histogram}: count {d.count} avg {d.average:.2f} p50 {d.median:.2f} "
+                             f"p99 {d.percentile99:.2f} p99.9 {d.percentile999:.2f} max {d.max:.2f}")
+        return "\n".join(lines)
+    
+    def set_options(self, new_options: Dict[str, Any], column_family: Optional[ColumnFamilyHandle] = None):
+        """Muda opções com o banco aberto
+        
+        Aceita as opções da família em MUTABLE_CF_OPTIONS (valem para os
+        próximos arquivos, memtables e compactações) e as do banco em
+        MUTABLE_DB_OPTIONS; rate_limiter_bytes_per_sec muda a taxa do
+        Options.rate_limiter. As opções de família mudam só na família
+        informada: cada uma tem sua cópia, e o Options passado a DB() não muda.
+        """
+        if not self.is_open:
+            raise RuntimeError("Database is closed")
+        for name, value in new_options.items():
+            if name not in MUTABLE_CF_OPTIONS and name not in MUTABLE_DB_OPTIONS:
+                raise ValueError(f"Option {name!r} cannot be changed with set_options")
+            if name == 'compression':
+                check_compression(value)
+            if name == 'compression_per_level' and value is not None:
+                for compression in value:
+                    check_compression(compression)
+            if name == 'rate_limiter_bytes_per_sec' and (not isinstance(value, int) or value <= 0):
+                raise ValueError("rate_limiter_bytes_per_sec must be a positive integer")
+        if 'rate_limiter_bytes_per_sec' in new_options and self.options.rate_limiter is None:
+            raise ValueError("Options.rate_limiter is not set")
+        with self._mutex:
+            cfd = self._column_family(column_family)
+            for name, value in new_options.items():
+                if name == 'rate_limiter_bytes_per_sec':
+                    self.options.rate_limiter.set_bytes_per_second(value)
+                elif name in MUTABLE_DB_OPTIONS:
+                    setattr(self.options, name, value)
+                elif name == 'compression_per_level' and value is not None:
+                    setattr(cfd.options, name, list(value))
+                else:
+                    setattr(cfd.options, name, value)
+            # Gatilhos de compactação e paradas de escrita podem ter mudado
+            self._bg_cv.notify_all()
+    
+    def get_column_family(self, name: str) -> Optional[ColumnFamilyHandle]:
+        """Handle da família com o nome informado, ou None"""
+        for cfd in list(self._versions.column_families.values()):
+            if cfd.name == name:
+                return cfd.handle
+        return None
+    
+    @property
+    def column_families(self) -> List[ColumnFamilyHandle]:
+        """Handles de todas as famílias, a começar pela default"""
+        return [cfd.handle for cfd in list(self._versions.column_families.values())]
+    
+    def snapshot(self) -> 'Snapshot':
+        """Congela a visão atual do banco para leituras repetíveis"""
+        if not self.is_open:
+            raise RuntimeError("Database is closed")
+        with self._mutex:
+            snapshot = Snapshot(self, self._versions.last_sequence)
+            self._snapshots.add(snapshot)
+        return snapshot
+    
+    def release_snapshot(self, snapshot: 'Snapshot'):
+        """Libera as versões antigas preservadas pelo snapshot"""
+        with self._mutex:
+            self._snapshots.discard(snapshot)
     
     def write(self, batch):
-        """Executa operações em lote"""
+        """Executa operações em lote, atomicamente mesmo entre famílias"""
         if not self.is_open:
             raise RuntimeError("Database is closed")
-        batch.apply(self)
-        self._save_data()
+        if not batch.operations:
+            return
+        self._check_batch(batch.operations)
+        self._write(self._stamp(batch.operations))
     
     def close(self):
         """Fecha o banco de dados"""
+        if not self.is_open:
+            return
         self.is_open = False
+        # Termina o trabalho em andamento; a memtable não precisa ser
+        # gravada porque o log é reaplicado na próxima abertura
+        with self._mutex:
+            while self._writers:
+                self._writers_empty_cv.wait()
+            self._shutting_down = True
+            self._bg_cv.notify_all()
+        if self._bg_thread is not threading.current_thread():
+            self._bg_thread.join()
+        with self._mutex:
+            self._log.close()
+            for cfd in self._versions.column_families.values():
+                for f in cfd.current.all_files():
+                    if f.table_reader is not None:
+                        f.table_reader.close()
     
     def __del__(self):
         """Destrutor"""
         if hasattr(self, 'is_open') and self.is_open:
             self.close()
 
+# Opções que set_options() pode mudar, da família e do banco
+MUTABLE_CF_OPTIONS = frozenset((
+    'write_buffer_size', 'block_size', 'bloom_bits_per_key', 'compression',
+    'compression_per_level', 'level0_file_num_compaction_trigger',
+    'level0_slowdown_writes_trigger', 'level0_stop_writes_trigger', 'max_bytes_for_level_base',
+    'max_bytes_for_level_multiplier', 'target_file_size_base', 'disable_auto_compactions',
+))
+MUTABLE_DB_OPTIONS = frozenset(('max_total_wal_size', 'rate_limiter_bytes_per_sec'))
+
+# Limites de bytes de um grupo de escritas
+MAX_WRITE_GROUP_BYTES = 1 << 20
+SMALL_WRITE_BYTES = 128 << 10
+# Tamanho dos pedaços lidos ao copiar arquivos
+COPY_CHUNK_SIZE = 1 << 20
+
+class _Writer:
+    """Escrita na fila; o líder do grupo a conclui e acorda a thread dona"""
+    
+    __slots__ = ("operations", "encoded", "done", "error", "cv")
+    
+    def __init__(self, operations, encoded: Optional[bytes] = None):
+        self.operations = operations
+        # Operações já serializadas para o registro do log
+        self.encoded = encoded
+        self.done = False
+        self.error: Optional[Exception] = None
+        # Criada só se a escrita precisar esperar na fila
+        self.cv: Optional[threading.Condition] = None
+
+# Tipo de registro de cada operação de um lote
+_VALUE_TYPES = {'put': TYPE_PUT, 'delete': TYPE_DELETE, 'merge': TYPE_MERGE,
+                'delete_range': TYPE_RANGE_DELETION}
+_COLUMN_FAMILY_TYPES = {'put': TYPE_COLUMN_FAMILY_PUT, 'delete': TYPE_COLUMN_FAMILY_DELETE,
+                        'merge': TYPE_COLUMN_FAMILY_MERGE,
+                        'delete_range': TYPE_COLUMN_FAMILY_RANGE_DELETION}
+_RECORD_OPS = {value_type: op for op, value_type in _VALUE_TYPES.items()}
+_COLUMN_FAMILY_RECORD_OPS = {value_type: op for op, value_type in _COLUMN_FAMILY_TYPES.items()}
+
+# Fonte de uma leitura pontual resolvida na memtable
+_SOURCE_MEMTABLE = -1
+# Contador de acertos por nível: 0, 1 e 2 em diante
+_GET_HIT_TICKERS = (GET_HIT_L0, GET_HIT_L1, GET_HIT_L2_AND_UP)
+
+def _lookup(versions, sequence: int, operands: List[bytes], cutoff: int = 0):
+    """Primeira versão (sequência, tipo, valor) visível em sequence que não é merge
+    
+    Os operandos de merge visíveis encontrados antes dela são acrescentados
+    a operands, do mais novo para o mais antigo. Versões mais antigas que
+    cutoff (um range tombstone) contam como deleção. None se a fonte não tem a base.
+    """
+    if versions:
+        for entry in versions:
+            if entry[0] <= sequence:
+                if entry[0] < cutoff:
+                    return (cutoff, TYPE_DELETE, None)
+                if entry[1] != TYPE_MERGE:
+                    return entry
+                operands.append(entry[2])
+    return None
+
+def _resolve(merge_operator, key: bytes, entry, operands: List[bytes]) -> Optional[bytes]:
+    """Valor da chave a partir da versão base (ou None) e dos operandos acumulados"""
+    value = entry[2] if entry is not None and entry[1] == TYPE_PUT else None
+    if operands:
+        value = full_merge(merge_operator, key, value, operands[::-1])
+    return value
+
+def _memtable_overlaps(mem: MemTable, smallest: bytes, largest: bytes) -> bool:
+    """Indica se a memtable tem chaves ou range tombstones em [smallest, largest]"""
+    it = MemTableIterator(mem)
+    it.seek(smallest)
+    if it.valid() and it.key() <= largest:
+        return True
+    return any(begin <= largest and end > smallest for _, begin, end in list(mem.range_tombstones))
+
+def _copy_file(src: str, dst: str, size: Optional[int] = None):
+    """Copia um arquivo (ou só os primeiros size bytes) e sincroniza a cópia com o disco"""
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        if size is None:
+            shutil.copyfileobj(fsrc, fdst)
+        else:
+            while size > 0:
+                chunk = fsrc.read(min(size, COPY_CHUNK_SIZE))
+                if not chunk:
+                    break
+                fdst.write(chunk)
+                size -= len(chunk)
+        fdst.flush()
+        os.fsync(fdst.fileno())
+
+def _prefix_successor(prefix: bytes) -> Optional[bytes]:
+    """Menor chave maior que todas as que começam com prefix (None se não existe)"""
+    prefix = prefix.rstrip(b"\xff")
+    if not prefix:
+        return None
+    return prefix[:-1] + bytes([prefix[-1] + 1])
+
+def _background_thread_main(db_ref, cv: threading.Condition):
+    """Laço da thread de segundo plano: flushes e compactações"""
+    with cv:
+        while True:
+            db = db_ref()
+            if db is None or db._shutting_down:
+                return
+            if db._bg_error is not None or not db._has_background_work():
+                # Não segura referência forte ao banco enquanto espera
+                del db
+                cv.wait()
+                continue
+            try:
+                db._background_work()
+            except Exception as e:
+                db._bg_error = e
+            cv.notify_all()
+            del db
+
+class LiveFileStorageInfo:
+    """Arquivo do banco a copiar: nome relativo, bytes que pertencem ao estado e tipo
+    
+    file_type é "table", "log" ou "manifest"; replacement_contents, quando
+    presente, substitui o conteúdo atual do arquivo na cópia.
+    """
+    
+    __slots__ = ("relative_filename", "size", "file_type", "replacement_contents")
+    
+    def __init__(self, relative_filename: str, size: int, file_type: str,
+                 replacement_contents: Optional[bytes] = None):
+        self.relative_filename = relative_filename
+        self.size = size
+        self.file_type = file_type
+        self.replacement_contents = replacement_contents
+    
+    def __repr__(self):
+        return f"LiveFileStorageInfo({self.relative_filename!r}, {self.size}, {self.file_type!r})"
+
+class Snapshot:
+    """Visão do banco congelada em um número de sequência
+    
+    Obtido com db.snapshot(). Enquanto existir, a compactação preserva as
+    versões que ele enxerga; release(), o fim de um bloco with ou a coleta
+    pelo coletor de lixo liberam essas versões.
+    """
+    
+    def __init__(self, db: RocksDBSimulator, sequence: int):
+        self._db = weakref.ref(db)
+        self.sequence = sequence
+    
+    def release(self):
+        db = self._db()
+        if db is not None:
+            db.release_snapshot(self)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
 class RocksDBIterator:
-    """Simulador de iterador do RocksDB"""
+    """Simulador de iterador do RocksDB
+    
+    Cursor bidirecional sobre a visão combinada de memtables e arquivos:
+    seek_to_first(), seek_to_last(), seek(), seek_for_prev(), next(),
+    prev(), valid(), key() e value(). Também pode ser percorrido com for,
+    a partir da posição atual, e reversed() percorre a partir dela para trás.
     
-    def __init__(self, data: Dict[bytes, bytes], mode: str):
-        self.data = data
+    O iterador enxerga o banco como estava ao ser criado (ou no snapshot
+    informado): escritas concorrentes não alteram o que ele percorre. Com
+    prefix ou limites (lower inclusivo, upper exclusivo), só percorre as
+    chaves dentro deles e deixa de ser válido ao sair. Percorre a família
+    column_family (None = "default").
+    """
+    
+    def __init__(self, db: RocksDBSimulator, mode: str, snapshot: Optional[Snapshot] = None,
+                 prefix: Optional[bytes] = None, lower: Optional[bytes] = None,
+                 upper: Optional[bytes] = None,
+                 column_family: Optional[ColumnFamilyHandle] = None):
+        self.db = db
         self.mode = mode
-        self.keys = sorted(data.keys())
-        self.position = 0
+        # Um prefixo equivale ao intervalo [prefix, sucessor do prefixo)
+        if prefix is not None:
+            end = _prefix_successor(prefix)
+            lower = prefix if lower is None else max(lower, prefix)
+            upper = end if upper is None else (upper if end is None else min(upper, end))
+        self._lower = lower
+        self._upper = upper
+        cfd = db._column_family(column_family)
+        self._merge_operator = cfd.options.merge_operator
+        self._ttl = db.ttl
+        self._iter, self._sequence, tombstones = db._new_internal_iterator(cfd, lower, upper, prefix)
+        if snapshot is not None:
+            self._sequence = snapshot.sequence
+        tombstones = [t for t in tombstones if t[0] <= self._sequence]
+        self._range_del = FragmentedRangeTombstones(tombstones) if tombstones else None
+        # Valor visível da chave atual
+        self._value = None
+        self._valid = False
+        # O posicionamento é adiado até o primeiro seek ou next: criar o
+        # iterador não lê nada
+        self._positioned = False
+        # Contadores locais, somados às estatísticas do banco a cada seek e
+        # quando o iterador é descartado
+        self._next_count = 0
+        self._prev_count = 0
+        self._bytes_read = 0
+    
+    def _record_seek(self, start: float):
+        """Registra um seek e descarrega os contadores locais nas estatísticas"""
+        statistics = self.db.statistics
+        statistics.record_in_histogram(DB_SEEK, (time.perf_counter() - start) * 1e6)
+        statistics.record_tick(NUMBER_DB_SEEK)
+        self._flush_stats()
+        ctx = perf_context.current()
+        if ctx is not None:
+            ctx.iter_seek_count += 1
+    
+    def _flush_stats(self):
+        statistics = self.db.statistics
+        if self._next_count:
+            statistics.record_tick(NUMBER_DB_NEXT, self._next_count)
+            self._next_count = 0
+        if self._prev_count:
+            statistics.record_tick(NUMBER_DB_PREV, self._prev_count)
+            self._prev_count = 0
+        if self._bytes_read:
+            statistics.record_tick(ITER_BYTES_READ, self._bytes_read)
+            self._bytes_read = 0
+    
+    def __del__(self):
+        if getattr(self, '_positioned', False):
+            self._flush_stats()
+    
+    def _is_live(self) -> bool:
+        """Carrega o valor visível da chave atual; False se não há ou é deleção"""
+        operands = []
+        cutoff = 0
+        if self._range_del is not None:
+            cutoff = self._range_del.max_covering(self._iter.key(), self._sequence)
+        entry = _lookup(self._iter.versions(), self._sequence, operands, cutoff)
+        if not operands and (entry is None or entry[1] == TYPE_DELETE):
+            return False
+        self._value = _resolve(self._merge_operator, self._iter.key(), entry, operands)
+        if self._ttl is not None:
+            # Expiradas ainda não compactadas ficam escondidas
+            self._value = read_value(self._value, self._ttl)
+            return self._value is not None
+        return True
+    
+    def _in_bounds(self) -> bool:
+        key = self._iter.key()
+        return ((self._lower is None or key >= self._lower) and
+                (self._upper is None or key < self._upper))
+    
+    def _skip_deleted_forward(self):
+        """Pula chaves deletadas ou invisíveis avançando; para ao sair dos limites"""
+        it = self._iter
+        skipped = 0
+        while it.valid() and self._in_bounds() and not self._is_live():
+            it.next()
+            skipped += 1
+        self._settle(skipped)
+    
+    def _skip_deleted_backward(self):
+        """Pula chaves deletadas ou invisíveis recuando; para ao sair dos limites"""
+        it = self._iter
+        skipped = 0
+        while it.valid() and self._in_bounds() and not self._is_live():
+            it.prev()
+            skipped += 1
+        self._settle(skipped)
+    
+    def _settle(self, skipped: int):
+        """Fixa a validade da nova posição e conta bytes lidos e chaves puladas"""
+        self._valid = self._iter.valid() and self._in_bounds()
+        if self._valid:
+            self._bytes_read += len(self._iter.key()) + len(self._value)
+        if skipped:
+            ctx = perf_context.current()
+            if ctx is not None:
+                ctx.internal_key_skipped_count += skipped
     
     def seek_to_first(self):
         """Move para o primeiro elemento"""
-        self.position = 0
+        start = time.perf_counter()
+        if self._lower is None:
+            self._iter.seek_to_first()
+        else:
+            self._iter.seek(self._lower)
+        self._skip_deleted_forward()
+        self._positioned = True
+        self._record_seek(start)
     
     def seek_to_last(self):
         """Move para o último elemento"""
-        self.position = len(self.keys) - 1 if self.keys else 0
+        start = time.perf_counter()
+        if self._upper is None:
+            self._iter.seek_to_last()
+        else:
+            self._iter.seek_for_prev(self._upper)
+            if self._iter.valid() and self._iter.key() == self._upper:
+                self._iter.prev()
+        self._skip_deleted_backward()
+        self._positioned = True
+        self._record_seek(start)
     
     def seek(self, key: bytes):
         """Move para a chave especificada ou a próxima"""
-        for i, k in enumerate(self.keys):
-            if k >= key:
-                self.position = i
-                return
-        self.position = len(self.keys)
+        start = time.perf_counter()
+        if self._lower is not None and key < self._lower:
+            key = self._lower
+        self._iter.seek(key)
+        self._skip_deleted_forward()
+        self._positioned = True
+        self._record_seek(start)
+    
+    def seek_for_prev(self, key: bytes):
+        """Move para a chave especificada ou a anterior"""
+        if self._upper is not None and key >= self._upper:
+            self.seek_to_last()
+            return
+        start = time.perf_counter()
+        self._iter.seek_for_prev(key)
+        self._skip_deleted_backward()
+        self._positioned = True
+        self._record_seek(start)
+    
+    def valid(self) -> bool:
+        """Indica se o iterador está posicionado em um elemento"""
+        return self._positioned and self._valid
+    
+    def next(self):
+        """Avança para o próximo elemento"""
+        self._next_count += 1
+        ctx = perf_context.current()
+        if ctx is not None:
+            ctx.iter_next_count += 1
+        self._iter.next()
+        self._skip_deleted_forward()
+    
+    def prev(self):
+        """Recua para o elemento anterior"""
+        self._prev_count += 1
+        ctx = perf_context.current()
+        if ctx is not None:
+            ctx.iter_prev_count += 1
+        self._iter.prev()
+        self._skip_deleted_backward()
+    
+    def key(self) -> bytes:
+        """Chave do elemento atual"""
+        return self._iter.key()
+    
+    def value(self) -> bytes:
+        """Valor do elemento atual"""
+        return self._value
+    
+    def _current(self):
+        if self.mode == 'keys':
+            return self.key()
+        elif self.mode == 'values':
+            return self.value()
+        else:  # items
+            return self.key(), self.value()
     
     def __iter__(self):
         return self
     
     def __next__(self):
-        if self.position >= len(self.keys):
+        if not self._positioned:
+            self.seek_to_first()
+        if not self._valid:
             raise StopIteration
         
-        key = self.keys[self.position]
-        self.position += 1
-        
-        if self.mode == 'keys':
-            return key
-        elif self.mode == 'values':
-            return self.data[key]
-        else:  # items
-            return key, self.data[key]
+        result = self._current()
+        self.next()
+        return result
     
     def __reversed__(self):
-        """Iteração reversa"""
-        return RocksDBReverseIterator(self.data, self.mode)
+        """Iteração reversa a partir da posição atual (ou do último elemento)"""
+        if not self.valid():
+            self.seek_to_last()
+        return RocksDBReverseIterator(self)
 
 class RocksDBReverseIterator:
-    """Iterador reverso"""
+    """Iterador reverso: percorre o mesmo cursor com prev()"""
     
-    def __init__(self, data: Dict[bytes, bytes], mode: str):
-        self.data = data
-        self.mode = mode
-        self.keys = sorted(data.keys(), reverse=True)
-        self.position = 0
+    def __init__(self, it: RocksDBIterator):
+        self._it = it
     
     def __iter__(self):
         return self
     
     def __next__(self):
-        if self.position >= len(self.keys):
+        if not self._it.valid():
             raise StopIteration
         
-        key = self.keys[self.position]
-        self.position += 1
-        
-        if self.mode == 'keys':
-            return key
-        elif self.mode == 'values':
-            return self.data[key]
-        else:  # items
-            return key, self.data[key]
+        result = self._it._current()
+        self._it.prev()
+        return result
 
 class WriteBatch:
     """Simulador de batch de operações"""
@@ -166,29 +1706,167 @@ class WriteBatch:
     def __init__(self):
         self.operations = []
     
-    def put(self, key: bytes, value: bytes):
+    def put(self, key: bytes, value: bytes, column_family: Optional[ColumnFamilyHandle] = None):
         """Adiciona operação de inserção ao batch"""
-        self.operations.append(('put', key, value))
+        self.operations.append(('put', key, value, 0 if column_family is None else column_family.id))
+    
+    def merge(self, key: bytes, operand: bytes, column_family: Optional[ColumnFamilyHandle] = None):
+        """Adiciona um operando de merge ao batch"""
+        self.operations.append(('merge', key, operand, 0 if column_family is None else column_family.id))
     
-    def delete(self, key: bytes):
+    def delete(self, key: bytes, column_family: Optional[ColumnFamilyHandle] = None):
         """Adiciona operação de deleção ao batch"""
-        self.operations.append(('delete', key, None))
+        self.operations.append(('delete', key, None, 0 if column_family is None else column_family.id))
+    
+    def delete_range(self, begin: bytes, end: bytes, column_family: Optional[ColumnFamilyHandle] = None):
+        """Adiciona a deleção de todas as chaves em [begin, end) ao batch"""
+        self.operations.append(('delete_range', begin, end,
+                                0 if column_family is None else column_family.id))
+    
+    def count(self) -> int:
+        """Número de operações no batch"""
+        return len(self.operations)
+    
+    def clear(self):
+        """Remove todas as operações do batch"""
+        self.operations = []
     
     def apply(self, db: RocksDBSimulator):
         """Aplica todas as operações no banco"""
-        for op, key, value in self.operations:
-            if op == 'put':
-                db.data[key] = value
-            elif op == 'delete':
-                if key in db.data:
-                    del db.data[key]
+        db.write(self)
+    
+    @staticmethod
+    def _encode_record(sequence: int, count: int, bodies: List[bytes]) -> bytes:
+        """Registro do write-ahead log com count operações já serializadas em bodies
+        
+        O registro começa pelo número de sequência da primeira operação e
+        pela quantidade de operações. Operações fora da família "default"
+        usam tipos próprios, seguidos do id da família.
+        """
+        return b"".join([struct.pack("<QI", sequence, count)] + bodies)
+    
+    @staticmethod
+    def _encode_operations(operations) -> bytes:
+        """Serializa as operações, sem o cabeçalho; rejeita operações inválidas"""
+        parts = []
+        for op, key, value, cf in operations:
+            if op not in _VALUE_TYPES:
+                raise ValueError(f"Unknown operation: {op!r}")
+            if not isinstance(key, bytes) or not (value is None if op == 'delete' else isinstance(value, bytes)):
+                raise TypeError(f"Keys and values must be bytes: {op} {key!r}")
+            if not isinstance(cf, int):
+                raise TypeError(f"Invalid column family id: {cf!r}")
+            value_len = 0 if value is None else len(value)
+            if cf:
+                parts.append(struct.pack("<BIII", _COLUMN_FAMILY_TYPES[op], cf, len(key), value_len))
+            else:
+                parts.append(struct.pack("<BII", _VALUE_TYPES[op], len(key), value_len))
+            parts.append(key)
+            if value_len:
+                parts.append(value)
+        return b"".join(parts)
+    
+    @staticmethod
+    def _decode(record: bytes):
+        """Reconstrói (sequência, operações) de um registro do write-ahead log"""
+        sequence, count = struct.unpack_from("<QI", record, 0)
+        return sequence, WriteBatch._decode_operations(record, count, 12)
+    
+    @staticmethod
+    def _decode_operations(record: bytes, count: int, pos: int):
+        operations = []
+        for _ in range(count):
+            op = _RECORD_OPS.get(record[pos])
+            cf = 0
+            if op is None:
+                op = _COLUMN_FAMILY_RECORD_OPS[record[pos]]
+                (cf,) = struct.unpack_from("<I", record, pos + 1)
+                pos += 4
+            key_len, value_len = struct.unpack_from("<II", record, pos + 1)
+            pos += 9
+            key = record[pos:pos + key_len]
+            pos += key_len
+            if op == 'delete':
+                operations.append((op, key, None, cf))
+            else:
+                operations.append((op, key, record[pos:pos + value_len], cf))
+                pos += value_len
+        return operations
 
 class Options:
-    """Simulador de opções do RocksDB"""
+    """Simulador de opções do RocksDB
+    
+    Passadas para create_column_family(), valem só as opções de memtable,
+    tabelas, compressão e compactação; log, cache e contadores são do banco.
+    """
     
     def __init__(self):
         self.create_if_missing = False
+        
+        # Write-ahead log: "always" (fsync a cada escrita), "interval"
+        # (fsync no máximo a cada wal_sync_interval_ms) ou "never"
+        self.wal_sync_mode = wal.SYNC_NEVER
+        self.wal_sync_interval_ms = 1000
+        # Tamanho do log a partir do qual a memtable é gravada em disco
+        self.max_total_wal_size = 64 * 1024 * 1024
+        
+        # Tamanho da memtable a partir do qual ela é congelada e gravada
+        # em um arquivo de tabela
+        self.write_buffer_size = 4 * 1024 * 1024
+        # Tamanho aproximado dos blocos de dados dos arquivos de tabela
+        self.block_size = 4096
+        # Bits por chave do filtro de Bloom de cada arquivo de tabela
+        # (0 desativa o filtro; 10 bits dão cerca de 1% de falsos positivos)
+        self.bloom_bits_per_key = 0
+        # Orçamento em bytes do cache LRU de blocos (0 desativa) e, opcionalmente,
+        # um cache.LRUCache já existente para compartilhar entre bancos
+        self.block_cache_size = 8 * 1024 * 1024
+        self.block_cache = None
+        # Compressão dos blocos de dados: "none", "zlib", "bz2" ou "lzma".
+        # compression_per_level (lista por nível, o último item vale para os
+        # níveis seguintes) tem prioridade, p.ex. ["none", "none", "zlib", "lzma"]
+        self.compression = NO_COMPRESSION
+        self.compression_per_level = None
+        
+        # Compactação por níveis
+        self.num_levels = 7
+        # Número de arquivos no nível 0 que dispara a compactação para o nível 1
+        self.level0_file_num_compaction_trigger = 4
+        # Número de arquivos no nível 0 que atrasa (slowdown) ou para (stop) as escritas
+        self.level0_slowdown_writes_trigger = 20
+        self.level0_stop_writes_trigger = 36
+        # Tamanho alvo do nível 1; cada nível seguinte é multiplier vezes maior
+        self.max_bytes_for_level_base = 16 * 1024 * 1024
+        self.max_bytes_for_level_multiplier = 10
+        # Tamanho dos arquivos gerados pela compactação
+        self.target_file_size_base = 2 * 1024 * 1024
+        self.disable_auto_compactions = False
+        
+        # Extrator de prefixo (slice_transform.SliceTransform): com ele os
+        # filtros de Bloom dos arquivos também guardam o prefixo das chaves e
+        # iteritems(prefix=...) descarta arquivos e memtables sem o prefixo
+        self.prefix_extractor = None
+        # Fração de write_buffer_size usada pelo filtro de prefixos da memtable
+        self.memtable_prefix_bloom_size_ratio = 0.1
+        
+        # Operador de merge (merge_operator.MergeOperator) usado por db.merge(),
+        # p.ex. UInt64AddOperator() para contadores
+        self.merge_operator = None
+        
+        # Contadores do motor (stats.Statistics); se None cada banco cria o seu
+        self.statistics = None
+        
+        # Limitador de taxa (rate_limiter.RateLimiter) das gravações de flush
+        # e compactação, p.ex. RateLimiter(8 * 1024 * 1024); pode ser
+        # compartilhado entre bancos. None = sem limite
+        self.rate_limiter = None
+        
+        # Filtro de compactação (compaction_filter.CompactionFilter) que
+        # remove ou reescreve valores durante a compactação
+        self.compaction_filter = None
 
-def DB(path: str, options: Options) -> RocksDBSimulator:
+def DB(path: str, options: Options,
+       column_families: Optional[Dict[str, Options]] = None,
+       ttl: Optional[int] = None) -> RocksDBSimulator:
     """Factory function para criar instância do simulador"""
-    return RocksDBSimulator(path)
+    return RocksDBSimulator(path, options, column_families, ttl)
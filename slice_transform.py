@@ -0,0 +1,55 @@
+"""
+Extratores de prefixo (Options.prefix_extractor)
+Definem o prefixo de cada chave usado nos filtros de Bloom de prefixo e nas
+iterações com db.iteritems(prefix=...)
+"""
+
+class SliceTransform:
+    """Interface de um extrator de prefixo
+    
+    Contrato: se in_domain(p) e k começa com p, então transform(k) == transform(p).
+    Assim o filtro de prefixo pode responder por todas as chaves que começam
+    com p consultando só transform(p).
+    """
+    
+    def name(self) -> str:
+        """Identifica o extrator; gravado nos arquivos de tabela"""
+        raise NotImplementedError
+    
+    def in_domain(self, key: bytes) -> bool:
+        """Indica se a chave tem um prefixo definido"""
+        raise NotImplementedError
+    
+    def transform(self, key: bytes) -> bytes:
+        """Prefixo de uma chave do domínio"""
+        raise NotImplementedError
+
+class FixedPrefixTransform(SliceTransform):
+    """Os primeiros `length` bytes da chave"""
+    
+    def __init__(self, length: int):
+        self.length = length
+    
+    def name(self) -> str:
+        return f"rocksdb.FixedPrefix.{self.length}"
+    
+    def in_domain(self, key: bytes) -> bool:
+        return len(key) >= self.length
+    
+    def transform(self, key: bytes) -> bytes:
+        return key[:self.length]
+
+class SeparatorPrefixTransform(SliceTransform):
+    """Tudo até o primeiro separador, inclusive (b"user:001" -> b"user:")"""
+    
+    def __init__(self, separator: bytes = b":"):
+        self.separator = separator
+    
+    def name(self) -> str:
+        return f"rocksdb.SeparatorPrefix.{self.separator.hex()}"
+    
+    def in_domain(self, key: bytes) -> bool:
+        return self.separator in key
+    
+    def transform(self, key: bytes) -> bytes:
+        return key[:key.index(self.separator) + len(self.separator)]
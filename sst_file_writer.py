@@ -0,0 +1,92 @@
+"""
+Geração de arquivos de tabela fora do banco, para cargas em massa
+SstFileWriter grava chaves já ordenadas direto em um arquivo de tabela, sem
+log, memtable nem compactação; db.ingest_external_file(paths) incorpora os
+arquivos prontos ao banco. Como não depende de um banco aberto, vários
+processos podem gerar arquivos em paralelo, cada um com uma faixa de chaves
+"""
+
+import os
+from typing import Optional
+
+from dbformat import TYPE_DELETE, TYPE_MERGE, TYPE_PUT
+from table import TableBuilder
+
+class ExternalSstFileInfo:
+    """Resumo de um arquivo gerado por SstFileWriter"""
+    
+    __slots__ = ("file_path", "smallest_key", "largest_key", "num_entries",
+                 "num_range_del_entries", "file_size")
+    
+    def __init__(self, file_path: str, smallest_key: Optional[bytes], largest_key: Optional[bytes],
+                 num_entries: int, num_range_del_entries: int, file_size: int):
+        self.file_path = file_path
+        self.smallest_key = smallest_key
+        self.largest_key = largest_key
+        self.num_entries = num_entries
+        self.num_range_del_entries = num_range_del_entries
+        self.file_size = file_size
+    
+    def __repr__(self):
+        return (f"ExternalSstFileInfo({self.file_path!r}, {self.smallest_key!r}, "
+                f"{self.largest_key!r}, num_entries={self.num_entries})")
+
+class SstFileWriter:
+    """Grava um arquivo de tabela a partir de chaves em ordem estritamente crescente
+    
+    Usa o tamanho de bloco, a compressão, o filtro de Bloom e o extrator de
+    prefixo das Options informadas, que devem ser as da família de destino.
+    Todas as versões recebem a sequência 0; a ingestão define a sequência
+    real do arquivo.
+    """
+    
+    def __init__(self, options):
+        self.options = options
+        self._builder: Optional[TableBuilder] = None
+    
+    def open(self, file_path: str):
+        """Começa um novo arquivo; um arquivo anterior não finalizado é descartado"""
+        if self._builder is not None:
+            self._builder.abandon()
+        directory = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._builder = TableBuilder(file_path, self.options, external=True)
+    
+    def _add(self, key: bytes, value_type: int, value: Optional[bytes]):
+        if self._builder is None:
+            raise RuntimeError("SstFileWriter is not open")
+        self._builder.add(key, [(0, value_type, value)])
+    
+    def put(self, key: bytes, value: bytes):
+        self._add(key, TYPE_PUT, value)
+    
+    def merge(self, key: bytes, operand: bytes):
+        self._add(key, TYPE_MERGE, operand)
+    
+    def delete(self, key: bytes):
+        self._add(key, TYPE_DELETE, None)
+    
+    def delete_range(self, begin: bytes, end: bytes):
+        """Remove [begin, end) dos dados já existentes no banco; pode vir fora de ordem"""
+        if self._builder is None:
+            raise RuntimeError("SstFileWriter is not open")
+        if begin < end:
+            self._builder.add_range_tombstone(0, begin, end)
+    
+    def file_size(self) -> int:
+        return self._builder.file_size if self._builder is not None else 0
+    
+    def finish(self) -> ExternalSstFileInfo:
+        """Grava metadados e rodapé e sincroniza o arquivo com o disco"""
+        builder = self._builder
+        if builder is None:
+            raise RuntimeError("SstFileWriter is not open")
+        self._builder = None
+        if builder.num_entries == 0 and not builder.range_tombstones:
+            builder.abandon()
+            raise ValueError("Cannot create an empty table file")
+        file_size = builder.finish()
+        smallest, largest = builder.key_range()
+        return ExternalSstFileInfo(builder.path, smallest, largest, builder.num_entries,
+                                   len(builder.range_tombstones), file_size)
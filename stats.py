@@ -0,0 +1,291 @@
+"""
+Estatísticas internas do motor: contadores (tickers) e histogramas de latência
+"""
+
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+
+# Leituras e escritas
+NUMBER_KEYS_WRITTEN = "rocksdb.number.keys.written"
+NUMBER_KEYS_READ = "rocksdb.number.keys.read"
+BYTES_WRITTEN = "rocksdb.bytes.written"
+BYTES_READ = "rocksdb.bytes.read"
+MEMTABLE_HIT = "rocksdb.memtable.hit"
+MEMTABLE_MISS = "rocksdb.memtable.miss"
+GET_HIT_L0 = "rocksdb.l0.hit"
+GET_HIT_L1 = "rocksdb.l1.hit"
+GET_HIT_L2_AND_UP = "rocksdb.l2andup.hit"
+NUMBER_MULTIGET_CALLS = "rocksdb.number.multiget.get"
+NUMBER_MULTIGET_KEYS_READ = "rocksdb.number.multiget.keys.read"
+NUMBER_DB_SEEK = "rocksdb.number.db.seek"
+NUMBER_DB_NEXT = "rocksdb.number.db.next"
+NUMBER_DB_PREV = "rocksdb.number.db.prev"
+ITER_BYTES_READ = "rocksdb.db.iter.bytes.read"
+
+# Write-ahead log e commit em grupo
+WAL_FILE_BYTES = "rocksdb.wal.bytes"
+WRITE_DONE_BY_SELF = "rocksdb.write.self"
+WRITE_DONE_BY_OTHER = "rocksdb.write.other"
+
+# Filtros de Bloom
+BLOOM_FILTER_USEFUL = "rocksdb.bloom.filter.useful"
+BLOOM_FILTER_FULL_POSITIVE = "rocksdb.bloom.filter.full.positive"
+BLOOM_FILTER_FULL_TRUE_POSITIVE = "rocksdb.bloom.filter.full.true.positive"
+BLOOM_FILTER_PREFIX_CHECKED = "rocksdb.bloom.filter.prefix.checked"
+BLOOM_FILTER_PREFIX_USEFUL = "rocksdb.bloom.filter.prefix.useful"
+
+# Cache de blocos
+BLOCK_CACHE_HIT = "rocksdb.block.cache.hit"
+BLOCK_CACHE_MISS = "rocksdb.block.cache.miss"
+BLOCK_CACHE_ADD = "rocksdb.block.cache.add"
+
+# Compressão de blocos (tempos em nanossegundos acumulados)
+NUMBER_BLOCK_COMPRESSED = "rocksdb.number.block.compressed"
+NUMBER_BLOCK_COMPRESSION_REJECTED = "rocksdb.number.block.compression.rejected"
+NUMBER_BLOCK_DECOMPRESSED = "rocksdb.number.block.decompressed"
+BYTES_COMPRESSED_FROM = "rocksdb.bytes.compressed.from"
+BYTES_COMPRESSED_TO = "rocksdb.bytes.compressed.to"
+BYTES_DECOMPRESSED_FROM = "rocksdb.bytes.decompressed.from"
+BYTES_DECOMPRESSED_TO = "rocksdb.bytes.decompressed.to"
+COMPRESSION_TIMES_NANOS = "rocksdb.compression.times.nanos"
+DECOMPRESSION_TIMES_NANOS = "rocksdb.decompression.times.nanos"
+
+# Flush, compactação e paradas de escrita
+FLUSH_WRITE_BYTES = "rocksdb.flush.write.bytes"
+COMPACT_READ_BYTES = "rocksdb.compact.read.bytes"
+COMPACT_WRITE_BYTES = "rocksdb.compact.write.bytes"
+COMPACTION_KEY_DROP_NEWER_ENTRY = "rocksdb.compaction.key.drop.new"
+COMPACTION_KEY_DROP_OBSOLETE = "rocksdb.compaction.key.drop.obsolete"
+COMPACTION_KEY_DROP_RANGE_DEL = "rocksdb.compaction.key.drop.range_del"
+COMPACTION_KEY_DROP_USER = "rocksdb.compaction.key.drop.user"
+STALL_MICROS = "rocksdb.stall.micros"
+
+TICKERS = (
+    NUMBER_KEYS_WRITTEN,
+    NUMBER_KEYS_READ,
+    BYTES_WRITTEN,
+    BYTES_READ,
+    MEMTABLE_HIT,
+    MEMTABLE_MISS,
+    GET_HIT_L0,
+    GET_HIT_L1,
+    GET_HIT_L2_AND_UP,
+    NUMBER_MULTIGET_CALLS,
+    NUMBER_MULTIGET_KEYS_READ,
+    NUMBER_DB_SEEK,
+    NUMBER_DB_NEXT,
+    NUMBER_DB_PREV,
+    ITER_BYTES_READ,
+    WAL_FILE_BYTES,
+    WRITE_DONE_BY_SELF,
+    WRITE_DONE_BY_OTHER,
+    BLOOM_FILTER_USEFUL,
+    BLOOM_FILTER_FULL_POSITIVE,
+    BLOOM_FILTER_FULL_TRUE_POSITIVE,
+    BLOOM_FILTER_PREFIX_CHECKED,
+    BLOOM_FILTER_PREFIX_USEFUL,
+    BLOCK_CACHE_HIT,
+    BLOCK_CACHE_MISS,
+    BLOCK_CACHE_ADD,
+    NUMBER_BLOCK_COMPRESSED,
+    NUMBER_BLOCK_COMPRESSION_REJECTED,
+    NUMBER_BLOCK_DECOMPRESSED,
+    BYTES_COMPRESSED_FROM,
+    BYTES_COMPRESSED_TO,
+    BYTES_DECOMPRESSED_FROM,
+    BYTES_DECOMPRESSED_TO,
+    COMPRESSION_TIMES_NANOS,
+    DECOMPRESSION_TIMES_NANOS,
+    FLUSH_WRITE_BYTES,
+    COMPACT_READ_BYTES,
+    COMPACT_WRITE_BYTES,
+    COMPACTION_KEY_DROP_NEWER_ENTRY,
+    COMPACTION_KEY_DROP_OBSOLETE,
+    COMPACTION_KEY_DROP_RANGE_DEL,
+    COMPACTION_KEY_DROP_USER,
+    STALL_MICROS,
+)
+
+# Histogramas de latência, em microssegundos. put, delete, merge e
+# delete_range entram em DB_WRITE, como um write() de uma operação
+DB_GET = "rocksdb.db.get.micros"
+DB_WRITE = "rocksdb.db.write.micros"
+DB_MULTIGET = "rocksdb.db.multiget.micros"
+DB_SEEK = "rocksdb.db.seek.micros"
+FLUSH_TIME = "rocksdb.db.flush.micros"
+COMPACTION_TIME = "rocksdb.compaction.times.micros"
+WRITE_STALL = "rocksdb.db.write.stall"
+
+HISTOGRAMS = (
+    DB_GET,
+    DB_WRITE,
+    DB_MULTIGET,
+    DB_SEEK,
+    FLUSH_TIME,
+    COMPACTION_TIME,
+    WRITE_STALL,
+)
+
+def _bucket_limits() -> List[float]:
+    """Limites superiores dos baldes: 1 a 10 e depois crescimento de 1,5x"""
+    limits = [float(i) for i in range(1, 11)]
+    while limits[-1] < 1e12:
+        limit = limits[-1] * 1.5
+        # Arredonda para dois algarismos significativos
+        scale = 10 ** (len(str(int(limit))) - 2)
+        limits.append(float(int(limit / scale) * scale))
+    limits.append(float("inf"))
+    return limits
+
+BUCKET_LIMITS = _bucket_limits()
+
+class HistogramData:
+    """Resumo de um histograma: contagem, soma, extremos e percentis"""
+    
+    __slots__ = ("count", "sum", "min", "max", "average", "std_dev",
+                 "median", "percentile95", "percentile99", "percentile999")
+    
+    def __init__(self, count: int, total: float, minimum: float, maximum: float,
+                 average: float, std_dev: float, median: float, percentile95: float,
+                 percentile99: float, percentile999: float):
+        self.count = count
+        self.sum = total
+        self.min = minimum
+        self.max = maximum
+        self.average = average
+        self.std_dev = std_dev
+        self.median = median
+        self.percentile95 = percentile95
+        self.percentile99 = percentile99
+        self.percentile999 = percentile999
+    
+    def to_dict(self) -> Dict[str, float]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+class Histogram:
+    """Distribuição de valores em baldes de largura crescente
+    
+    Os percentis são interpolados dentro do balde, limitados pelo menor e
+    pelo maior valor registrados; o erro relativo fica abaixo de 50%.
+    """
+    
+    def __init__(self):
+        self.clear()
+    
+    def clear(self):
+        self.buckets = [0] * len(BUCKET_LIMITS)
+        self.count = 0
+        self.sum = 0.0
+        self.sum_squares = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+    
+    def add(self, value: float):
+        self.buckets[bisect_left(BUCKET_LIMITS, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.sum_squares += value * value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+    
+    def merge(self, other: 'Histogram'):
+        """Soma os valores de outro histograma a este"""
+        for i, n in enumerate(other.buckets):
+            self.buckets[i] += n
+        self.count += other.count
+        self.sum += other.sum
+        self.sum_squares += other.sum_squares
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+    
+    def percentile(self, p: float) -> float:
+        if self.count == 0:
+            return 0.0
+        threshold = self.count * p / 100
+        cumulative = 0
+        for i, n in enumerate(self.buckets):
+            if cumulative + n >= threshold and n:
+                low = BUCKET_LIMITS[i - 1] if i > 0 else 0.0
+                high = BUCKET_LIMITS[i]
+                low, high = max(low, self.min), min(high, self.max)
+                return low + (high - low) * (threshold - cumulative) / n
+            cumulative += n
+        return self.max
+    
+    def data(self) -> HistogramData:
+        if self.count == 0:
+            return HistogramData(0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+        average = self.sum / self.count
+        variance = max(0.0, self.sum_squares / self.count - average * average)
+        return HistogramData(self.count, self.sum, self.min, self.max, average, variance ** 0.5,
+                             self.percentile(50), self.percentile(95), self.percentile(99),
+                             self.percentile(99.9))
+
+class Statistics:
+    """Contadores e histogramas do motor, compartilháveis entre instâncias via Options.statistics"""
+    
+    def __init__(self):
+        self.tickers: Dict[str, int] = dict.fromkeys(TICKERS, 0)
+        self.histograms: Dict[str, Histogram] = {name: Histogram() for name in HISTOGRAMS}
+        self._lock = threading.Lock()
+    
+    def record_tick(self, ticker: str, count: int = 1):
+        with self._lock:
+            self.tickers[ticker] = self.tickers.get(ticker, 0) + count
+    
+    def record_ticks(self, ticks: Sequence[Tuple[str, int]]):
+        """Soma vários contadores de uma vez"""
+        with self._lock:
+            tickers = self.tickers
+            for ticker, count in ticks:
+                tickers[ticker] = tickers.get(ticker, 0) + count
+    
+    def get_ticker_count(self, ticker: str) -> int:
+        return self.tickers.get(ticker, 0)
+    
+    def record_in_histogram(self, histogram: str, value: float):
+        with self._lock:
+            h = self.histograms.get(histogram)
+            if h is None:
+                h = self.histograms[histogram] = Histogram()
+            h.add(value)
+    
+    def get_histogram_data(self, histogram: str) -> HistogramData:
+        with self._lock:
+            h = self.histograms.get(histogram)
+            return h.data() if h is not None else Histogram().data()
+    
+    def reset(self):
+        with self._lock:
+            for ticker in self.tickers:
+                self.tickers[ticker] = 0
+            for h in self.histograms.values():
+                h.clear()
+    
+    def bloom_false_positive_rate(self) -> float:
+        """Fração das chaves ausentes que o filtro de Bloom não conseguiu descartar"""
+        positive = self.get_ticker_count(BLOOM_FILTER_FULL_POSITIVE)
+        false_positive = positive - self.get_ticker_count(BLOOM_FILTER_FULL_TRUE_POSITIVE)
+        negatives = self.get_ticker_count(BLOOM_FILTER_USEFUL) + false_positive
+        return false_positive / negatives if negatives else 0.0
+    
+    def compression_ratio(self) -> float:
+        """Bytes originais por byte gravado nos blocos comprimidos (1.0 sem compressão)"""
+        compressed = self.get_ticker_count(BYTES_COMPRESSED_TO)
+        return self.get_ticker_count(BYTES_COMPRESSED_FROM) / compressed if compressed else 1.0
+    
+    def to_dict(self) -> Dict[str, int]:
+        return dict(self.tickers)
+    
+    def to_string(self) -> str:
+        """Todos os contadores e histogramas, um por linha, no formato do RocksDB"""
+        lines = [f"{name} COUNT : {count}" for name, count in self.tickers.items()]
+        for name in self.histograms:
+            d = self.get_histogram_data(name)
+            lines.append(f"{name} P50 : {d.median:.6f} P95 : {d.percentile95:.6f} "
+                         f"P99 : {d.percentile99:.6f} P99.9 : {d.percentile999:.6f} "
+                         f"P100 : {d.max:.6f} COUNT : {d.count} SUM : {d.sum:.0f}")
+        return "\n".join(lines)
@@ -0,0 +1,565 @@
+"""
+Arquivos de tabela ordenada (SST) do motor LSM
+Formato baseado em blocos:
+    
+    [bloco de dados 1] ... [bloco de dados N]
+    [blocos de metadados]
+    [metaindex]
+    [índice]
+    [rodapé]
+
+Cada bloco de dados guarda registros ordenados e termina com a lista de
+offsets dos registros. Um registro reúne todas as versões de uma chave,
+da mais nova para a mais antiga. Os range tombstones (range_del.py) ficam
+em um bloco de metadados próprio. O índice é esparso: uma entrada por bloco com a
+maior chave do bloco. O rodapé tem tamanho fixo e aponta para o índice e
+para o metaindex, que localiza os blocos de metadados pelo nome. Os blocos
+de dados podem ser comprimidos (compression.py); o trailer registra o tipo.
+
+Arquivos gerados fora do banco (sst_file_writer.py) gravam todas as versões
+com sequência 0; ao serem ingeridos, o MANIFEST guarda um número de
+sequência global que o leitor usa no lugar delas.
+"""
+
+import os
+import json
+import mmap
+import struct
+import time
+import zlib
+import itertools
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple
+
+import stats
+import compression
+import perf_context
+from bloom import BloomFilterPolicy
+from cache import LRUCache
+from range_del import FragmentedRangeTombstones, decode_tombstones, encode_tombstones
+from rate_limiter import IO_LOW
+
+# Registro de dados: tamanho da chave, número de versões
+RECORD_HEADER = struct.Struct("<IH")
+# Cada versão do registro: número de sequência, tipo, tamanho do valor
+VERSION_HEADER = struct.Struct("<QBI")
+# Trailer de cada bloco: tipo de compressão, crc32 do conteúdo
+BLOCK_TRAILER = struct.Struct("<BI")
+# Entrada do índice e do metaindex: tamanho da chave, offset e tamanho do bloco
+HANDLE_HEADER = struct.Struct("<IQI")
+# Rodapé: handle do metaindex, handle do índice, número mágico
+FOOTER = struct.Struct("<QIQIQ")
+TABLE_MAGIC = 0x5253494D53535442  # "RSIMSSTB"
+
+# Custo aproximado por chave de um bloco decodificado (objeto bytes + lista)
+BLOCK_KEY_OVERHEAD = 41
+
+# Identificador único de cada leitor aberto, usado como prefixo no cache de blocos
+_next_cache_id = itertools.count(1)
+
+PROPERTIES_BLOCK = "properties"
+FILTER_BLOCK = "filter.bloom"
+RANGE_DEL_BLOCK = "range_del"
+
+class TableBuilder:
+    """Grava um arquivo de tabela a partir de chaves recebidas em ordem crescente"""
+    
+    def __init__(self, path: str, options, compression_type: Optional[str] = None,
+                 statistics: Optional[stats.Statistics] = None, external: bool = False,
+                 rate_limiter=None, io_priority: int = IO_LOW):
+        self.path = path
+        self.external = external
+        # Cada bloco gravado passa antes pelo limitador de taxa, se houver
+        self.rate_limiter = rate_limiter
+        self.io_priority = io_priority
+        self.block_size = options.block_size
+        self.compression = compression_type or options.compression
+        compression.check_compression(self.compression)
+        self.statistics = statistics
+        self._raw_data_size = 0
+        self._filter_policy = (BloomFilterPolicy(options.bloom_bits_per_key)
+                               if options.bloom_bits_per_key > 0 else None)
+        self._filter_keys: List[bytes] = []
+        # Com um extrator de prefixo, o filtro também recebe o prefixo de cada chave
+        self._prefix_extractor = options.prefix_extractor
+        self._last_prefix: Optional[bytes] = None
+        self._file = open(path, 'wb')
+        self._offset = 0
+        self._index: List[Tuple[bytes, int, int]] = []
+        self._block: List[bytes] = []
+        self._block_offsets: List[int] = []
+        self._block_bytes = 0
+        self.num_entries = 0
+        self.largest_seqno = 0
+        self.smallest: Optional[bytes] = None
+        self.largest: Optional[bytes] = None
+        self.range_tombstones: List[Tuple[int, bytes, bytes]] = []
+    
+    @property
+    def file_size(self) -> int:
+        """Tamanho aproximado do arquivo até agora"""
+        return self._offset + self._block_bytes
+    
+    def add(self, key: bytes, versions: List[Tuple[int, int, Optional[bytes]]]):
+        """Adiciona as versões (sequência, tipo, valor) de uma chave, da mais nova
+        para a mais antiga; as chaves devem chegar ordenadas"""
+        if self.largest is not None and key <= self.largest:
+            raise ValueError("Keys must be added in strictly increasing order")
+        parts = [RECORD_HEADER.pack(len(key), len(versions)), key]
+        for sequence, value_type, value in versions:
+            value = value or b""
+            parts.append(VERSION_HEADER.pack(sequence, value_type, len(value)))
+            parts.append(value)
+        record = b"".join(parts)
+        self._block_offsets.append(self._block_bytes)
+        self._block.append(record)
+        self._block_bytes += len(record)
+        self.num_entries += len(versions)
+        self.largest_seqno = max(self.largest_seqno, versions[0][0])
+        if self._filter_policy is not None:
+            self._filter_keys.append(key)
+            extractor = self._prefix_extractor
+            if extractor is not None and extractor.in_domain(key):
+                prefix = extractor.transform(key)
+                if prefix != self._last_prefix:
+                    self._filter_keys.append(prefix)
+                    self._last_prefix = prefix
+        if self.smallest is None:
+            self.smallest = key
+        self.largest = key
+        
+        if self._block_bytes >= self.block_size:
+            self._flush_block()
+    
+    def add_range_tombstone(self, sequence: int, begin: bytes, end: bytes):
+        """Registra um range tombstone; não precisa respeitar a ordem das chaves"""
+        self.range_tombstones.append((sequence, begin, end))
+        self.largest_seqno = max(self.largest_seqno, sequence)
+    
+    def key_range(self) -> Tuple[bytes, bytes]:
+        """Menor e maior chave do arquivo, estendidas para cobrir os range tombstones
+        
+        O fim (exclusivo) de um tombstone entra como maior chave: o intervalo
+        do arquivo pode ficar um pouco maior que o necessário, nunca menor.
+        """
+        smallest, largest = self.smallest, self.largest
+        for _, begin, end in self.range_tombstones:
+            smallest = begin if smallest is None else min(smallest, begin)
+            largest = end if largest is None else max(largest, end)
+        return smallest, largest
+    
+    def _write_block(self, contents: bytes, compression_id: int = 0) -> Tuple[int, int]:
+        """Grava um bloco com o trailer e retorna seu handle (offset, tamanho)"""
+        handle = (self._offset, len(contents))
+        if self.rate_limiter is not None:
+            self.rate_limiter.request(len(contents) + BLOCK_TRAILER.size, self.io_priority)
+        self._file.write(contents)
+        self._file.write(BLOCK_TRAILER.pack(compression_id, zlib.crc32(contents)))
+        self._offset += len(contents) + BLOCK_TRAILER.size
+        return handle
+    
+    def _flush_block(self):
+        """Fecha o bloco de dados atual e registra sua maior chave no índice"""
+        if not self._block:
+            return
+        self._block.append(struct.pack(f"<{len(self._block_offsets)}I", *self._block_offsets))
+        self._block.append(struct.pack("<I", len(self._block_offsets)))
+        offset, size = self._write_block(*self._compress_block(b"".join(self._block)))
+        self._index.append((self.largest, offset, size))
+        self._block = []
+        self._block_offsets = []
+        self._block_bytes = 0
+    
+    def _compress_block(self, raw: bytes) -> Tuple[bytes, int]:
+        """Comprime um bloco de dados conforme o tipo do arquivo, medindo ganho e tempo"""
+        self._raw_data_size += len(raw)
+        if self.compression == compression.NO_COMPRESSION:
+            return raw, 0
+        start = time.perf_counter_ns()
+        compression_id, contents = compression.compress(self.compression, raw)
+        elapsed = time.perf_counter_ns() - start
+        if self.statistics:
+            self.statistics.record_tick(stats.COMPRESSION_TIMES_NANOS, elapsed)
+            if compression_id:
+                self.statistics.record_tick(stats.NUMBER_BLOCK_COMPRESSED)
+                self.statistics.record_tick(stats.BYTES_COMPRESSED_FROM, len(raw))
+                self.statistics.record_tick(stats.BYTES_COMPRESSED_TO, len(contents))
+            else:
+                self.statistics.record_tick(stats.NUMBER_BLOCK_COMPRESSION_REJECTED)
+        return contents, compression_id
+    
+    @staticmethod
+    def _encode_handles(entries) -> bytes:
+        parts = []
+        for key, offset, size in entries:
+            parts.append(HANDLE_HEADER.pack(len(key), offset, size))
+            parts.append(key)
+        return b"".join(parts)
+    
+    def finish(self) -> int:
+        """Grava metadados, índice e rodapé, sincroniza com o disco e retorna o tamanho"""
+        self._flush_block()
+        
+        properties = {
+            'num_entries': self.num_entries,
+            'largest_seqno': self.largest_seqno,
+            'num_data_blocks': len(self._index),
+            'prefix_extractor': (self._prefix_extractor.name()
+                                 if self._prefix_extractor is not None else None),
+            'data_size': self._offset,
+            'raw_data_size': self._raw_data_size,
+            'compression': self.compression,
+            'num_range_deletions': len(self.range_tombstones),
+            'external_sst_file': self.external,
+        }
+        meta_handles = [(PROPERTIES_BLOCK.encode(),) +
+                        self._write_block(json.dumps(properties).encode())]
+        if self._filter_policy is not None:
+            bloom_filter = self._filter_policy.create_filter(self._filter_keys)
+            meta_handles.append((FILTER_BLOCK.encode(),) + self._write_block(bloom_filter))
+        if self.range_tombstones:
+            meta_handles.append((RANGE_DEL_BLOCK.encode(),) +
+                                self._write_block(encode_tombstones(self.range_tombstones)))
+        # O metaindex é ordenado pelo nome do bloco
+        meta_handles.sort()
+        
+        metaindex_handle = self._write_block(self._encode_handles(meta_handles))
+        index_handle = self._write_block(self._encode_handles(self._index))
+        self._file.write(FOOTER.pack(*metaindex_handle, *index_handle, TABLE_MAGIC))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        size = self._file.tell()
+        self._file.close()
+        return size
+    
+    def abandon(self):
+        """Descarta um arquivo incompleto"""
+        self._file.close()
+        os.remove(self.path)
+
+class Block:
+    """Bloco de dados decodificado: chaves em ordem e registros sob demanda"""
+    
+    __slots__ = ("data", "keys", "offsets", "global_seqno")
+    
+    def __init__(self, data: bytes, global_seqno: int = 0):
+        self.data = data
+        self.global_seqno = global_seqno
+        (count,) = struct.unpack_from("<I", data, len(data) - 4)
+        offsets_start = len(data) - 4 - 4 * count
+        self.offsets = struct.unpack_from(f"<{count}I", data, offsets_start)
+        self.keys = []
+        for offset in self.offsets:
+            key_len, _ = RECORD_HEADER.unpack_from(data, offset)
+            start = offset + RECORD_HEADER.size
+            self.keys.append(data[start:start + key_len])
+    
+    @property
+    def charge(self) -> int:
+        """Memória aproximada ocupada pelo bloco no cache"""
+        return len(self.data) + BLOCK_KEY_OVERHEAD * len(self.keys)
+    
+    def versions(self, i: int) -> List[Tuple[int, int, bytes]]:
+        """Versões (sequência, tipo, valor) do registro i, da mais nova para a mais antiga"""
+        data = self.data
+        offset = self.offsets[i]
+        key_len, count = RECORD_HEADER.unpack_from(data, offset)
+        pos = offset + RECORD_HEADER.size + key_len
+        result = []
+        for _ in range(count):
+            sequence, value_type, value_len = VERSION_HEADER.unpack_from(data, pos)
+            pos += VERSION_HEADER.size
+            result.append((sequence or self.global_seqno, value_type, data[pos:pos + value_len]))
+            pos += value_len
+        return result
+
+class TableReader:
+    """Leitura de um arquivo de tabela via mmap
+    
+    Apenas o índice esparso fica em memória; uma leitura pontual faz uma
+    busca binária no índice e decodifica um único bloco de dados.
+    global_seqno substitui a sequência 0 das versões de um arquivo ingerido.
+    """
+    
+    def __init__(self, path: str, statistics: Optional[stats.Statistics] = None,
+                 block_cache: Optional[LRUCache] = None, global_seqno: int = 0):
+        self.path = path
+        self.global_seqno = global_seqno
+        self.statistics = statistics
+        self.block_cache = block_cache
+        self._cache_id = next(_next_cache_id)
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        size = len(self._mmap)
+        if size < FOOTER.size:
+            raise IOError(f"Corrupted table file: {path}")
+        meta_offset, meta_size, index_offset, index_size, magic = \
+            FOOTER.unpack_from(self._mmap, size - FOOTER.size)
+        if magic != TABLE_MAGIC:
+            raise IOError(f"Not a table file: {path}")
+        
+        self.index_keys: List[bytes] = []
+        self.index_handles: List[Tuple[int, int]] = []
+        for key, offset, block_size in self._decode_handles(self._read_block(index_offset, index_size)):
+            self.index_keys.append(key)
+            self.index_handles.append((offset, block_size))
+        
+        self.meta_handles: Dict[str, Tuple[int, int]] = {
+            key.decode(): (offset, block_size)
+            for key, offset, block_size in self._decode_handles(self._read_block(meta_offset, meta_size))
+        }
+        self.properties = json.loads(self.read_meta_block(PROPERTIES_BLOCK))
+        self.bloom_filter = self.read_meta_block(FILTER_BLOCK)
+        range_del_block = self.read_meta_block(RANGE_DEL_BLOCK)
+        # Range tombstones do arquivo, ou None se não há nenhum
+        self.range_del = None
+        if range_del_block:
+            tombstones = decode_tombstones(range_del_block)
+            if global_seqno:
+                tombstones = [(sequence or global_seqno, begin, end) for sequence, begin, end in tombstones]
+            self.range_del = FragmentedRangeTombstones(tombstones)
+    
+    @staticmethod
+    def _decode_handles(data: bytes):
+        pos = 0
+        while pos < len(data):
+            key_len, offset, size = HANDLE_HEADER.unpack_from(data, pos)
+            pos += HANDLE_HEADER.size
+            yield data[pos:pos + key_len], offset, size
+            pos += key_len
+    
+    def _read_block(self, offset: int, size: int) -> bytes:
+        """Lê um bloco do mmap, verifica o checksum e descomprime se preciso"""
+        contents = self._mmap[offset:offset + size]
+        compression_id, crc = BLOCK_TRAILER.unpack_from(self._mmap, offset + size)
+        if zlib.crc32(contents) != crc:
+            raise IOError(f"Block checksum mismatch in {self.path} at offset {offset}")
+        if compression_id == 0:
+            return contents
+        start = time.perf_counter_ns()
+        raw = compression.decompress(compression_id, contents)
+        elapsed = time.perf_counter_ns() - start
+        ctx = perf_context.current()
+        if ctx is not None and ctx.timed:
+            ctx.block_decompress_time += elapsed
+        if self.statistics:
+            self.statistics.record_tick(stats.DECOMPRESSION_TIMES_NANOS, elapsed)
+            self.statistics.record_tick(stats.NUMBER_BLOCK_DECOMPRESSED)
+            self.statistics.record_tick(stats.BYTES_DECOMPRESSED_FROM, len(contents))
+            self.statistics.record_tick(stats.BYTES_DECOMPRESSED_TO, len(raw))
+        return raw
+    
+    def read_meta_block(self, name: str) -> Optional[bytes]:
+        """Conteúdo de um bloco de metadados pelo nome, se existir"""
+        handle = self.meta_handles.get(name)
+        return self._read_block(*handle) if handle else None
+    
+    def read_data_block(self, i: int) -> Block:
+        """Lê e decodifica o bloco de dados i, passando pelo cache de blocos"""
+        ctx = perf_context.current()
+        if self.block_cache is None:
+            return self._load_data_block(i, ctx)
+        cache_key = (self._cache_id, i)
+        block = self.block_cache.lookup(cache_key)
+        if block is not None:
+            if ctx is not None:
+                ctx.block_cache_hit_count += 1
+            if self.statistics:
+                self.statistics.record_tick(stats.BLOCK_CACHE_HIT)
+            return block
+        block = self._load_data_block(i, ctx)
+        self.block_cache.insert(cache_key, block, block.charge)
+        if self.statistics:
+            self.statistics.record_tick(stats.BLOCK_CACHE_MISS)
+            self.statistics.record_tick(stats.BLOCK_CACHE_ADD)
+        return block
+    
+    def _load_data_block(self, i: int, ctx: Optional[perf_context.PerfContext]) -> Block:
+        """Lê o bloco de dados i do arquivo, sem passar pelo cache"""
+        if ctx is None:
+            return Block(self._read_block(*self.index_handles[i]), self.global_seqno)
+        start = time.perf_counter_ns() if ctx.timed else 0
+        offset, size = self.index_handles[i]
+        block = Block(self._read_block(offset, size), self.global_seqno)
+        ctx.block_read_count += 1
+        ctx.block_read_byte += size
+        if ctx.timed:
+            ctx.block_read_time += time.perf_counter_ns() - start
+        return block
+    
+    def key_range(self) -> Tuple[Optional[bytes], Optional[bytes]]:
+        """Menor e maior chave do arquivo, estendidas para cobrir os range tombstones"""
+        smallest = largest = None
+        if self.index_keys:
+            smallest = self.read_data_block(0).keys[0]
+            largest = self.index_keys[-1]
+        if self.range_del is not None:
+            for _, begin, end in self.range_del.tombstones:
+                smallest = begin if smallest is None else min(smallest, begin)
+                largest = end if largest is None else max(largest, end)
+        return smallest, largest
+    
+    def key_may_match(self, key: bytes) -> bool:
+        """Consulta o filtro de Bloom; False garante que a chave não está no arquivo"""
+        if self.bloom_filter is None:
+            return True
+        ctx = perf_context.current()
+        if BloomFilterPolicy.key_may_match(key, self.bloom_filter):
+            if ctx is not None:
+                ctx.bloom_sst_hit_count += 1
+            if self.statistics:
+                self.statistics.record_tick(stats.BLOOM_FILTER_FULL_POSITIVE)
+            return True
+        if ctx is not None:
+            ctx.bloom_sst_miss_count += 1
+        if self.statistics:
+            self.statistics.record_tick(stats.BLOOM_FILTER_USEFUL)
+        return False
+    
+    def prefix_may_match(self, prefix: bytes, extractor_name: str) -> bool:
+        """Consulta o filtro pelo prefixo (já extraído); False garante que nenhuma
+        chave do arquivo o tem. Só vale se o arquivo foi gravado com o mesmo extrator."""
+        if self.bloom_filter is None or self.properties.get('prefix_extractor') != extractor_name:
+            return True
+        if self.statistics:
+            self.statistics.record_tick(stats.BLOOM_FILTER_PREFIX_CHECKED)
+        if BloomFilterPolicy.key_may_match(prefix, self.bloom_filter):
+            return True
+        if self.statistics:
+            self.statistics.record_tick(stats.BLOOM_FILTER_PREFIX_USEFUL)
+        return False
+    
+    def get(self, key: bytes) -> Optional[List[Tuple[int, int, bytes]]]:
+        """Versões da chave, da mais nova para a mais antiga, ou None se ela não está no arquivo"""
+        if not self.key_may_match(key):
+            return None
+        i = bisect_left(self.index_keys, key)
+        if i == len(self.index_keys):
+            return None
+        block = self.read_data_block(i)
+        j = bisect_left(block.keys, key)
+        if j < len(block.keys) and block.keys[j] == key:
+            if self.bloom_filter is not None and self.statistics:
+                self.statistics.record_tick(stats.BLOOM_FILTER_FULL_TRUE_POSITIVE)
+            return block.versions(j)
+        return None
+    
+    def multi_get(self, keys: List[bytes]) -> Dict[bytes, List[Tuple[int, int, bytes]]]:
+        """Busca várias chaves em ordem crescente; retorna {chave: versões} das encontradas
+        
+        Cada bloco de dados é lido (e procurado no cache) uma única vez para
+        todas as chaves que caem nele, e os contadores são atualizados uma vez
+        por chamada.
+        """
+        bloom_filter = self.bloom_filter
+        if bloom_filter is not None:
+            may_match = BloomFilterPolicy.key_may_match
+            candidates = [key for key in keys if may_match(key, bloom_filter)]
+            ctx = perf_context.current()
+            if ctx is not None:
+                ctx.bloom_sst_hit_count += len(candidates)
+                ctx.bloom_sst_miss_count += len(keys) - len(candidates)
+            if self.statistics:
+                self.statistics.record_tick(stats.BLOOM_FILTER_USEFUL, len(keys) - len(candidates))
+                self.statistics.record_tick(stats.BLOOM_FILTER_FULL_POSITIVE, len(candidates))
+            keys = candidates
+        
+        result = {}
+        index_keys = self.index_keys
+        j, n = 0, len(keys)
+        while j < n:
+            i = bisect_left(index_keys, keys[j])
+            if i == len(index_keys):
+                break
+            # Todas as chaves até a maior chave do bloco i só podem estar nele
+            end = bisect_right(keys, index_keys[i], j)
+            block = self.read_data_block(i)
+            block_keys = block.keys
+            pos = 0
+            for key in keys[j:end]:
+                pos = bisect_left(block_keys, key, pos)
+                if pos < len(block_keys) and block_keys[pos] == key:
+                    result[key] = block.versions(pos)
+            j = end
+        if bloom_filter is not None and self.statistics and result:
+            self.statistics.record_tick(stats.BLOOM_FILTER_FULL_TRUE_POSITIVE, len(result))
+        return result
+    
+    def close(self):
+        if not self._mmap.closed:
+            self._mmap.close()
+
+class TableIterator:
+    """Iterador interno ordenado sobre um arquivo de tabela (índice + bloco)
+    
+    Com lower (inclusivo) e upper (exclusivo), o iterador fica inválido em
+    vez de ler blocos inteiramente fora do intervalo.
+    """
+    
+    def __init__(self, reader: TableReader, lower: Optional[bytes] = None,
+                 upper: Optional[bytes] = None):
+        self._reader = reader
+        self._lower = lower
+        self._upper = upper
+        self._block_index = len(reader.index_keys)
+        self._block: Optional[Block] = None
+        self._pos = 0
+    
+    def _load_block(self, i: int):
+        self._block_index = i
+        if 0 <= i < len(self._reader.index_keys):
+            self._block = self._reader.read_data_block(i)
+        else:
+            self._block = None
+        self._pos = 0
+    
+    def valid(self) -> bool:
+        return self._block is not None
+    
+    def seek_to_first(self):
+        self._load_block(0)
+    
+    def seek_to_last(self):
+        self._load_block(len(self._reader.index_keys) - 1)
+        if self._block is not None:
+            self._pos = len(self._block.keys) - 1
+    
+    def seek(self, target: bytes):
+        i = bisect_left(self._reader.index_keys, target)
+        self._load_block(i)
+        if self._block is not None:
+            self._pos = bisect_left(self._block.keys, target)
+    
+    def seek_for_prev(self, target: bytes):
+        """Posiciona na última chave <= target"""
+        self.seek(target)
+        if not self.valid():
+            self.seek_to_last()
+        elif self.key() != target:
+            self.prev()
+    
+    def next(self):
+        self._pos += 1
+        if self._pos >= len(self._block.keys):
+            # A maior chave do bloco já passou do limite: os seguintes ficam fora
+            if self._upper is not None and self._reader.index_keys[self._block_index] >= self._upper:
+                self._block = None
+                return
+            self._load_block(self._block_index + 1)
+    
+    def prev(self):
+        self._pos -= 1
+        if self._pos < 0:
+            i = self._block_index - 1
+            if self._lower is not None and i >= 0 and self._reader.index_keys[i] < self._lower:
+                self._block = None
+                return
+            self._load_block(i)
+            if self._block is not None:
+                self._pos = len(self._block.keys) - 1
+    
+    def key(self) -> bytes:
+        return self._block.keys[self._pos]
+    
+    def versions(self) -> List[Tuple[int, int, bytes]]:
+        return self._block.versions(self._pos)
@@ -0,0 +1,60 @@
+"""
+Testes da fachada asyncio (async_db.py) com famílias de colunas
+
+    python -m unittest test_async_db
+"""
+
+import asyncio
+import shutil
+import tempfile
+import unittest
+
+from async_db import AsyncDB
+from merge_operator import StringAppendOperator
+from rocksdb_simulator import DB, Options
+
+class AsyncColumnFamilyTest(unittest.IsolatedAsyncioTestCase):
+    
+    async def asyncSetUp(self):
+        self.path = tempfile.mkdtemp(prefix="async_db_test_")
+        self.db = DB(self.path, Options())
+        options = Options()
+        options.merge_operator = StringAppendOperator()
+        self.users = self.db.create_column_family("users", options)
+        self.adb = AsyncDB(self.db)
+    
+    async def asyncTearDown(self):
+        await self.adb.close()
+        shutil.rmtree(self.path, ignore_errors=True)
+    
+    async def test_write_and_read_family(self):
+        await self.adb.put(b"k", b"default")
+        await self.adb.put(b"k", b"user", column_family=self.users)
+        await self.adb.merge(b"m", b"a", column_family=self.users)
+        await self.adb.merge(b"m", b"b", column_family=self.users)
+        self.assertEqual(await self.adb.get(b"k"), b"default")
+        self.assertEqual(await self.adb.get(b"k", column_family=self.users), b"user")
+        self.assertEqual(await self.adb.multi_get([b"k", b"m"], column_family=self.users),
+                         [b"user", b"a,b"])
+        self.assertEqual(self.db.get(b"m"), None)
+        
+        await self.adb.delete(b"k", column_family=self.users)
+        self.assertEqual(await self.adb.get(b"k", column_family=self.users), None)
+        self.assertEqual(await self.adb.get(b"k"), b"default")
+    
+    async def test_coalesced_reads_keep_families_apart(self):
+        await asyncio.gather(self.adb.put(b"x", b"1"), self.adb.put(b"x", b"2", column_family=self.users))
+        values = await asyncio.gather(self.adb.get(b"x"), self.adb.get(b"x", column_family=self.users),
+                                      self.adb.get(b"x"), self.adb.get(b"y", column_family=self.users))
+        self.assertEqual(values, [b"1", b"2", b"1", None])
+    
+    async def test_merge_without_operator_fails_alone(self):
+        results = await asyncio.gather(self.adb.put(b"a", b"1", column_family=self.users),
+                                       self.adb.merge(b"c", b"x"),
+                                       return_exceptions=True)
+        self.assertIsNone(results[0])
+        self.assertIsInstance(results[1], ValueError)
+        self.assertEqual(await self.adb.get(b"a", column_family=self.users), b"1")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+Expiração de chaves por tempo de vida (TTL)
+Em um banco aberto com DB(path, options, ttl=segundos), cada valor gravado
+recebe no final o horário da escrita (4 bytes, segundos desde a época).
+Leituras removem o horário e escondem valores com mais de ttl segundos;
+a compactação os descarta pelo TtlCompactionFilter, sem custo extra de
+I/O. ttl <= 0 grava o horário mas nunca expira. O horário também faz parte
+dos operandos de merge: TtlMergeOperator o remove antes do operador da
+família e grava no resultado o horário mais novo entre a base e os
+operandos, então chaves gravadas só com merge também expiram
+"""
+
+import copy
+import struct
+import time
+from typing import List, Optional
+
+from compaction_filter import CompactionFilter
+from merge_operator import MergeOperator
+
+TIMESTAMP = struct.Struct("<I")
+
+def append_timestamp(value: bytes, now: Optional[float] = None) -> bytes:
+    return value + TIMESTAMP.pack(int(time.time() if now is None else now))
+
+def strip_timestamp(value: bytes) -> bytes:
+    if len(value) < TIMESTAMP.size:
+        raise IOError("Value has no TTL timestamp")
+    return value[:-TIMESTAMP.size]
+
+def get_timestamp(value: bytes) -> int:
+    if len(value) < TIMESTAMP.size:
+        raise IOError("Value has no TTL timestamp")
+    return TIMESTAMP.unpack_from(value, len(value) - TIMESTAMP.size)[0]
+
+def is_stale(value: bytes, ttl: int, now: Optional[float] = None) -> bool:
+    if ttl <= 0:
+        return False
+    return get_timestamp(value) + ttl < (time.time() if now is None else now)
+
+def read_value(value: Optional[bytes], ttl: int, now: Optional[float] = None) -> Optional[bytes]:
+    """Valor visível para o usuário: sem o horário, ou None se expirou"""
+    if value is None or is_stale(value, ttl, now):
+        return None
+    return value[:-TIMESTAMP.size]
+
+class TtlCompactionFilter(CompactionFilter):
+    """Remove valores expirados e repassa os demais, sem o horário, ao filtro do usuário"""
+    
+    def __init__(self, ttl: int, user_filter: Optional[CompactionFilter] = None):
+        self.ttl = ttl
+        self.user_filter = user_filter
+    
+    def name(self) -> str:
+        return "ttl" if self.user_filter is None else f"ttl.{self.user_filter.name()}"
+    
+    def filter(self, level: int, key: bytes, existing_value: bytes) -> Optional[bytes]:
+        if is_stale(existing_value, self.ttl):
+            return None
+        if self.user_filter is None:
+            return existing_value
+        value = strip_timestamp(existing_value)
+        new_value = self.user_filter.filter(level, key, value)
+        if new_value is None:
+            return None
+        if new_value == value:
+            return existing_value
+        # Um valor reescrito mantém o horário da escrita original
+        return new_value + existing_value[-TIMESTAMP.size:]
+
+class TtlMergeOperator(MergeOperator):
+    """Operador da família aplicado a valores e operandos sem o horário"""
+    
+    def __init__(self, ttl: int, user_operator: MergeOperator):
+        self.ttl = ttl
+        self.user_operator = user_operator
+    
+    def name(self) -> str:
+        return self.user_operator.name()
+    
+    def full_merge(self, key: bytes, existing_value: Optional[bytes], operands: List[bytes]) -> bytes:
+        # O resultado leva o horário da escrita mais nova, não o da compactação
+        # ou da leitura; uma base expirada é ignorada
+        timestamp = max((get_timestamp(operand) for operand in operands), default=0)
+        if existing_value is not None and not is_stale(existing_value, self.ttl):
+            timestamp = max(timestamp, get_timestamp(existing_value))
+        value = self.user_operator.full_merge(key, read_value(existing_value, self.ttl),
+                                              [strip_timestamp(operand) for operand in operands])
+        return append_timestamp(value, timestamp)
+    
+    def partial_merge(self, key: bytes, left_operand: bytes, right_operand: bytes) -> Optional[bytes]:
+        value = self.user_operator.partial_merge(key, strip_timestamp(left_operand),
+                                                 strip_timestamp(right_operand))
+        if value is None:
+            return None
+        return append_timestamp(value, max(get_timestamp(left_operand), get_timestamp(right_operand)))
+
+def ttl_options(options, ttl: int):
+    """Cópia das opções de uma família com o operador de merge e o filtro de TTL"""
+    options = copy.copy(options)
+    if options.merge_operator is not None:
+        options.merge_operator = TtlMergeOperator(ttl, options.merge_operator)
+    options.compaction_filter = TtlCompactionFilter(ttl, options.compaction_filter)
+    return options
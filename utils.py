@@ -36,10 +36,43 @@ class MetricsCollector:
                 print(f"{key}: {value}")
         print("="*50)
 
+# Cada byte aleatório vira um caractere de _CHARS com bytes.translate, bem
+# mais rápido que random.choices para valores grandes. Só os bytes abaixo de
+# 248 (4 * 62) são usados, para todos os caracteres serem igualmente
+# prováveis; os demais são descartados e sorteados de novo
+_CHARS = string.ascii_letters + string.digits
+_ACCEPTED = len(_CHARS) * (256 // len(_CHARS))
+_TRANSLATE = bytes(ord(_CHARS[i % len(_CHARS)]) for i in range(256))
+_REJECTED = bytes(range(_ACCEPTED, 256))
+
+def _random_text(length):
+    text = b''
+    while len(text) < length:
+        # Sorteia um pouco a mais para compensar os bytes descartados
+        n = length - len(text)
+        n += n // 16 + 8
+        text += random.getrandbits(n * 8).to_bytes(n, 'little').translate(_TRANSLATE, _REJECTED)
+    return text[:length].decode('ascii')
+
 class DataGenerator:
+    # Fração do tamanho de cada valor que é aleatória, como o
+    # compression_ratio do db_bench: o trecho aleatório se repete até
+    # completar o valor. 1.0 = valores incompressíveis (só o alfabeto de
+    # 62 caracteres comprime), 0.5 = comprimem para cerca da metade
+    compression_ratio = 1.0
+    
     @staticmethod
-    def generate_string(length):
-        return ''.join(random.choices(string.ascii_letters + string.digits, k=length))
+    def generate_string(length, compression_ratio=None):
+        """Texto aleatório gerado para cada valor, independente dos anteriores"""
+        if compression_ratio is None:
+            compression_ratio = DataGenerator.compression_ratio
+        if length <= 0:
+            return ''
+        raw = max(1, min(length, int(length * compression_ratio)))
+        piece = _random_text(raw)
+        if raw == length:
+            return piece
+        return (piece * (length // raw + 1))[:length]
     
     @staticmethod
     def generate_json_data():
@@ -0,0 +1,300 @@
+"""
+Controle dos arquivos de tabela vivos do banco (MANIFEST)
+"""
+
+import os
+import json
+import threading
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from dbformat import DEFAULT_COLUMN_FAMILY_NAME, MANIFEST_FILE
+
+class FileMetaData:
+    """Descrição de um arquivo de tabela imutável"""
+    
+    __slots__ = ("number", "file_size", "smallest", "largest", "num_entries", "global_seqno",
+                 "table_reader")
+    
+    def __init__(self, number: int, file_size: int, smallest: bytes, largest: bytes, num_entries: int,
+                 global_seqno: int = 0):
+        self.number = number
+        self.file_size = file_size
+        self.smallest = smallest
+        self.largest = largest
+        self.num_entries = num_entries
+        # Sequência das versões de um arquivo ingerido (0 nos demais)
+        self.global_seqno = global_seqno
+        # Leitor aberto do arquivo; mantém o arquivo acessível enquanto
+        # alguma versão antiga ainda o referencia
+        self.table_reader = None
+    
+    def to_dict(self) -> dict:
+        return {
+            'number': self.number,
+            'file_size': self.file_size,
+            'smallest': self.smallest.hex(),
+            'largest': self.largest.hex(),
+            'num_entries': self.num_entries,
+            'global_seqno': self.global_seqno,
+        }
+    
+    @staticmethod
+    def from_dict(d: dict) -> 'FileMetaData':
+        return FileMetaData(d['number'], d['file_size'],
+                            bytes.fromhex(d['smallest']), bytes.fromhex(d['largest']),
+                            d['num_entries'], d.get('global_seqno', 0))
+
+class Version:
+    """Conjunto imutável de arquivos de tabela organizados em níveis
+    
+    O nível 0 guarda os arquivos gerados pelos flushes, do mais novo para o
+    mais antigo, e eles podem se sobrepor. Nos demais níveis os arquivos
+    são ordenados pela menor chave e não se sobrepõem.
+    """
+    
+    def __init__(self, levels: Tuple[Tuple[FileMetaData, ...], ...]):
+        self.levels = levels
+    
+    @property
+    def num_levels(self) -> int:
+        return len(self.levels)
+    
+    def all_files(self) -> List[FileMetaData]:
+        return [f for files in self.levels for f in files]
+    
+    def level_bytes(self, level: int) -> int:
+        return sum(f.file_size for f in self.levels[level])
+    
+    def find_file(self, level: int, key: bytes) -> Optional[FileMetaData]:
+        """Arquivo de um nível >= 1 cujo intervalo pode conter a chave"""
+        files = self.levels[level]
+        lo, hi = 0, len(files)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if files[mid].largest < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(files) and files[lo].smallest <= key:
+            return files[lo]
+        return None
+    
+    def overlapping_files(self, level: int, begin: Optional[bytes], end: Optional[bytes]) -> List[FileMetaData]:
+        """Arquivos do nível que se sobrepõem ao intervalo [begin, end]"""
+        result = []
+        for f in self.levels[level]:
+            if (begin is None or f.largest >= begin) and (end is None or f.smallest <= end):
+                result.append(f)
+        return result
+    
+    def key_in_deeper_levels(self, level: int, key: bytes) -> bool:
+        """Indica se algum arquivo abaixo do nível informado pode conter a chave"""
+        for deeper in range(level + 1, len(self.levels)):
+            if self.find_file(deeper, key) is not None:
+                return True
+        return False
+
+class VersionSet:
+    """Mantém as famílias de colunas e persiste o MANIFEST a cada alteração
+    
+    new_column_family(id, nome) cria o estado de uma família (com a versão
+    atual dos seus arquivos); a família "default" tem id 0 e sempre existe.
+    """
+    
+    def __init__(self, db_path: str, new_column_family: Callable[[int, str], Any]):
+        self.db_path = db_path
+        self.manifest_file = os.path.join(db_path, MANIFEST_FILE)
+        self._new_column_family = new_column_family
+        self.column_families: Dict[int, Any] = {0: new_column_family(0, DEFAULT_COLUMN_FAMILY_NAME)}
+        self.next_column_family_id = 1
+        self.next_file_number = 1
+        # Último número de sequência visível para leituras
+        self.last_sequence = 0
+        self._number_lock = threading.Lock()
+    
+    @property
+    def log_number(self) -> int:
+        """Logs com número menor que este já foram incorporados em tabelas por todas as famílias"""
+        return min(cfd.log_number for cfd in self.column_families.values())
+    
+    def recover(self) -> bool:
+        """Carrega o MANIFEST; retorna False se o banco ainda não existe"""
+        if not os.path.exists(self.manifest_file):
+            return False
+        with open(self.manifest_file, 'r') as f:
+            state = json.load(f)
+        self.next_file_number = state['next_file_number']
+        self.last_sequence = state.get('last_sequence', 0)
+        self.next_column_family_id = state.get('next_column_family_id', 1)
+        # MANIFEST anterior às famílias de colunas: tudo pertence à "default"
+        families = state.get('column_families') or [
+            {'id': 0, 'name': DEFAULT_COLUMN_FAMILY_NAME,
+             'log_number': state['log_number'], 'levels': state['levels']}]
+        self.column_families = {}
+        for d in families:
+            cfd = self._new_column_family(d['id'], d['name'])
+            cfd.log_number = d['log_number']
+            levels = [tuple(FileMetaData.from_dict(f) for f in files) for files in d['levels']]
+            # Uma família criada com menos níveis continua válida
+            while len(levels) < cfd.current.num_levels:
+                levels.append(())
+            cfd.current = Version(tuple(levels))
+            self.column_families[cfd.id] = cfd
+        return True
+    
+    def new_file_number(self) -> int:
+        with self._number_lock:
+            number = self.next_file_number
+            self.next_file_number += 1
+            return number
+    
+    def create_column_family(self, name: str, log_number: int):
+        """Registra uma nova família no MANIFEST; log_number é o log atual"""
+        cfd = self._new_column_family(self.next_column_family_id, name)
+        cfd.log_number = log_number
+        self.next_column_family_id += 1
+        self.column_families[cfd.id] = cfd
+        self._write_manifest()
+        return cfd
+    
+    def drop_column_family(self, cfd):
+        """Remove a família do MANIFEST; seus arquivos deixam de estar vivos"""
+        cfd.dropped = True
+        del self.column_families[cfd.id]
+        self._write_manifest()
+    
+    def log_and_apply(self, cfd, added: List[Tuple[int, FileMetaData]] = (),
+                      deleted: List[Tuple[int, int]] = (),
+                      log_number: Optional[int] = None):
+        """Instala uma nova versão da família e grava o MANIFEST atomicamente
+        
+        added e deleted são listas de (nível, arquivo) e (nível, número do arquivo).
+        Alterações em uma família já removida são ignoradas.
+        """
+        if cfd.dropped:
+            return
+        levels = [list(files) for files in cfd.current.levels]
+        deleted = set(deleted)
+        if deleted:
+            levels = [[f for f in files if (level, f.number) not in deleted]
+                      for level, files in enumerate(levels)]
+        for level, meta in added:
+            if level == 0:
+                levels[0].insert(0, meta)
+            else:
+                files = levels[level]
+                files.insert(bisect_left([f.smallest for f in files], meta.smallest), meta)
+        version = Version(tuple(tuple(files) for files in levels))
+        previous = cfd.current, cfd.log_number
+        cfd.current = version
+        if log_number is not None:
+            cfd.log_number = log_number
+        try:
+            self._write_manifest()
+        except Exception:
+            cfd.current, cfd.log_number = previous
+            raise
+    
+    def _write_manifest(self):
+        state = {
+            'next_file_number': self.next_file_number,
+            'last_sequence': self.last_sequence,
+            'next_column_family_id': self.next_column_family_id,
+            'column_families': [
+                {'id': cfd.id, 'name': cfd.name, 'log_number': cfd.log_number,
+                 'levels': [[f.to_dict() for f in files] for files in cfd.current.levels]}
+                for cfd in self.column_families.values()],
+        }
+        tmp_file = self.manifest_file + ".tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.manifest_file)
+    
+    def live_files(self) -> set:
+        return {f.number for cfd in self.column_families.values() for f in cfd.current.all_files()}
+
+class LevelIterator:
+    """Iterador interno sobre um nível >= 1: concatena os arquivos em ordem"""
+    
+    def __init__(self, files: Tuple[FileMetaData, ...], new_table_iterator):
+        self._files = files
+        self._new_table_iterator = new_table_iterator
+        self._file_index = len(files)
+        self._iter = None
+    
+    def _open_file(self, i: int):
+        self._file_index = i
+        self._iter = self._new_table_iterator(self._files[i]) if 0 <= i < len(self._files) else None
+    
+    def _find_file(self, target: bytes) -> int:
+        """Índice do primeiro arquivo cuja maior chave é >= target"""
+        lo, hi = 0, len(self._files)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._files[mid].largest < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+    
+    def _skip_empty_files_forward(self):
+        while self._iter is not None and not self._iter.valid():
+            self._open_file(self._file_index + 1)
+            if self._iter is not None:
+                self._iter.seek_to_first()
+    
+    def _skip_empty_files_backward(self):
+        while self._iter is not None and not self._iter.valid():
+            self._open_file(self._file_index - 1)
+            if self._iter is not None:
+                self._iter.seek_to_last()
+    
+    def valid(self) -> bool:
+        return self._iter is not None and self._iter.valid()
+    
+    def seek_to_first(self):
+        self._open_file(0)
+        if self._iter is not None:
+            self._iter.seek_to_first()
+        self._skip_empty_files_forward()
+    
+    def seek_to_last(self):
+        self._open_file(len(self._files) - 1)
+        if self._iter is not None:
+            self._iter.seek_to_last()
+        self._skip_empty_files_backward()
+    
+    def seek(self, target: bytes):
+        self._open_file(self._find_file(target))
+        if self._iter is not None:
+            self._iter.seek(target)
+        self._skip_empty_files_forward()
+    
+    def seek_for_prev(self, target: bytes):
+        i = self._find_file(target)
+        if i == len(self._files) or self._files[i].smallest > target:
+            # target cai antes do arquivo i: a resposta é o fim do anterior
+            self._open_file(i - 1)
+            if self._iter is not None:
+                self._iter.seek_to_last()
+        else:
+            self._open_file(i)
+            self._iter.seek_for_prev(target)
+        self._skip_empty_files_backward()
+    
+    def next(self):
+        self._iter.next()
+        self._skip_empty_files_forward()
+    
+    def prev(self):
+        self._iter.prev()
+        self._skip_empty_files_backward()
+    
+    def key(self) -> bytes:
+        return self._iter.key()
+    
+    def versions(self):
+        return self._iter.versions()
@@ -0,0 +1,86 @@
+"""
+Write-ahead log (WAL) do simulador do RocksDB
+Cada escrita é anexada ao final do log como um registro enquadrado:
+cabeçalho (crc32, tamanho) seguido do payload
+"""
+
+import os
+import time
+import struct
+import zlib
+from typing import Iterator
+
+# Cabeçalho de cada registro: crc32 do payload + tamanho do payload
+HEADER = struct.Struct("<II")
+
+# Políticas de sincronização do log com o disco
+SYNC_ALWAYS = "always"      # fsync a cada escrita
+SYNC_INTERVAL = "interval"  # fsync no máximo a cada N ms
+SYNC_NEVER = "never"        # deixa o sistema operacional decidir
+
+SYNC_MODES = (SYNC_ALWAYS, SYNC_INTERVAL, SYNC_NEVER)
+
+class LogWriter:
+    """Anexa registros ao final de um arquivo de log"""
+    
+    def __init__(self, path: str, sync_mode: str = SYNC_NEVER, sync_interval_ms: int = 1000):
+        if sync_mode not in SYNC_MODES:
+            raise ValueError(f"Invalid WAL sync mode: {sync_mode!r}")
+        self.path = path
+        self.sync_mode = sync_mode
+        self.sync_interval = sync_interval_ms / 1000.0
+        self._file = open(path, 'ab')
+        self.size = self._file.tell()
+        self._last_sync = time.monotonic()
+    
+    def add_record(self, payload: bytes):
+        """Anexa um registro ao log respeitando a política de sincronização"""
+        self._file.write(HEADER.pack(zlib.crc32(payload), len(payload)) + payload)
+        # Sempre entrega ao sistema operacional para sobreviver a uma queda do processo
+        self._file.flush()
+        self.size += HEADER.size + len(payload)
+        
+        if self.sync_mode == SYNC_ALWAYS:
+            self.sync()
+        elif self.sync_mode == SYNC_INTERVAL:
+            if time.monotonic() - self._last_sync >= self.sync_interval:
+                self.sync()
+    
+    def sync(self):
+        """Força os dados do log para o disco"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._last_sync = time.monotonic()
+    
+    def truncate(self):
+        """Descarta todo o conteúdo do log"""
+        self._file.truncate(0)
+        self._file.seek(0)
+        self.sync()
+        self.size = 0
+    
+    def close(self):
+        """Fecha o log, sincronizando o que estiver pendente"""
+        if self._file.closed:
+            return
+        if self.sync_mode != SYNC_NEVER:
+            self.sync()
+        self._file.close()
+
+def read_records(path: str) -> Iterator[bytes]:
+    """Lê os registros do log, parando no primeiro registro incompleto ou corrompido"""
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb') as f:
+        data = f.read()
+    
+    pos = 0
+    while pos + HEADER.size <= len(data):
+        crc, length = HEADER.unpack_from(data, pos)
+        start = pos + HEADER.size
+        payload = data[start:start + length]
+        # Cauda truncada por uma queda durante a escrita
+        if len(payload) < length or zlib.crc32(payload) != crc:
+            return
+        yield payload
+        pos = start + length
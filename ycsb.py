@@ -0,0 +1,228 @@
+"""
+Cargas no estilo do YCSB (Yahoo! Cloud Serving Benchmark)
+Gera, sob demanda e a partir de uma semente, a sequência de operações de
+uma carga: a proporção de leituras, atualizações, inserções, varreduras e
+leitura-modificação-escrita e a distribuição das chaves acessadas (uniform,
+zipfian ou latest). As cargas A a F seguem as definições do YCSB; o
+db_bench.py executa a fase de carga (ycsbload) e as cargas (ycsba a ycsbf)
+com várias threads:
+    
+    python db_bench.py --benchmarks ycsbload,ycsba,ycsbb --num 100000 --threads 4
+"""
+
+import random
+import threading
+from typing import Iterator, Optional, Set, Tuple
+
+# Operações
+READ = "read"
+UPDATE = "update"
+INSERT = "insert"
+SCAN = "scan"
+READ_MODIFY_WRITE = "readmodifywrite"
+
+# Distribuições das chaves
+UNIFORM = "uniform"
+ZIPFIAN = "zipfian"
+LATEST = "latest"
+
+ZIPFIAN_CONSTANT = 0.99
+# Tamanho mínimo do buffer aleatório de onde os valores são fatiados
+VALUE_BUFFER_SIZE = 1 << 20
+
+FNV_OFFSET_BASIS_64 = 0xCBF29CE484222325
+FNV_PRIME_64 = 1099511628211
+
+def fnvhash64(value: int) -> int:
+    """Hash FNV-1a dos 8 bytes de value, como no YCSB"""
+    h = FNV_OFFSET_BASIS_64
+    for _ in range(8):
+        h ^= value & 0xFF
+        h = (h * FNV_PRIME_64) & 0xFFFFFFFFFFFFFFFF
+        value >>= 8
+    return h
+
+def build_key(keynum: int) -> bytes:
+    """Chave do registro keynum; o hash espalha registros vizinhos pelo espaço de chaves"""
+    return b"user%d" % fnvhash64(keynum)
+
+class ValueGenerator:
+    """Valores fatiados de um buffer de bytes aleatórios gerado uma única vez"""
+    
+    def __init__(self, seed: int, max_size: int = 0):
+        size = max(VALUE_BUFFER_SIZE, 2 * max_size)
+        self._data = random.Random(seed).getrandbits(size * 8).to_bytes(size, 'little')
+        self._pos = 0
+    
+    def generate(self, size: int) -> bytes:
+        if self._pos + size > len(self._data):
+            self._pos = 0
+        self._pos += size
+        return self._data[self._pos - size:self._pos]
+
+class AcknowledgedCounter:
+    """Numeração das inserções, compartilhada pelas threads
+    
+    Um registro só pode ser escolhido para leitura depois que todas as
+    inserções anteriores a ele terminaram: limit é o primeiro número ainda
+    não confirmado sem lacunas antes dele.
+    """
+    
+    def __init__(self, start: int):
+        self._next = start
+        self.limit = start
+        self._acknowledged: Set[int] = set()
+        self._lock = threading.Lock()
+    
+    def next(self) -> int:
+        with self._lock:
+            value = self._next
+            self._next += 1
+            return value
+    
+    def acknowledge(self, value: int):
+        with self._lock:
+            self._acknowledged.add(value)
+            while self.limit in self._acknowledged:
+                self._acknowledged.remove(self.limit)
+                self.limit += 1
+
+class ZipfianGenerator:
+    """Inteiros em [0, items) com distribuição de Zipf (algoritmo de Gray et al.)
+    
+    Os menores valores são os mais populares. items pode crescer entre
+    chamadas (next(items)); zeta é estendida incrementalmente.
+    """
+    
+    def __init__(self, items: int, rng: random.Random, theta: float = ZIPFIAN_CONSTANT,
+                 zetan: Optional[float] = None):
+        self.rng = rng
+        self.theta = theta
+        self.alpha = 1.0 / (1.0 - theta)
+        self.zeta2theta = 1.0 + 0.5 ** theta
+        self.items = 0
+        self.zetan = 0.0
+        if zetan is not None:
+            self.items, self.zetan = items, zetan
+        self._resize(items)
+    
+    def _resize(self, items: int):
+        if items > self.items:
+            theta = self.theta
+            self.zetan += sum(1.0 / i ** theta for i in range(self.items + 1, items + 1))
+            self.items = items
+        self.eta = ((1.0 - (2.0 / self.items) ** (1.0 - self.theta))
+                    / (1.0 - self.zeta2theta / self.zetan))
+    
+    def next(self, items: Optional[int] = None) -> int:
+        if items is not None and items != self.items:
+            self._resize(items)
+        u = self.rng.random()
+        uz = u * self.zetan
+        if uz < 1.0:
+            return 0
+        if uz < self.zeta2theta:
+            return 1
+        return int(self.items * (self.eta * u - self.eta + 1.0) ** self.alpha)
+
+class ScrambledZipfianGenerator:
+    """Zipf espalhado pelo hash: os registros populares não ficam vizinhos
+    
+    Como no YCSB, sorteia em um espaço fixo de 10 bilhões de itens (zeta
+    pré-calculada) e reduz o hash ao número de registros.
+    """
+    
+    ITEM_COUNT = 10000000000
+    ZETAN = 26.46902820178302
+    
+    def __init__(self, rng: random.Random):
+        self._zipfian = ZipfianGenerator(self.ITEM_COUNT, rng, zetan=self.ZETAN)
+    
+    def next(self, items: int) -> int:
+        return fnvhash64(self._zipfian.next()) % items
+
+class SkewedLatestGenerator:
+    """Zipf sobre a idade: os registros inseridos por último são os mais populares"""
+    
+    def __init__(self, items: int, rng: random.Random):
+        self._zipfian = ZipfianGenerator(max(items, 2), rng)
+    
+    def next(self, items: int) -> int:
+        return items - 1 - self._zipfian.next(max(items, 2)) % items
+
+class Workload:
+    """Proporções das operações e distribuição das chaves de uma carga"""
+    
+    def __init__(self, name: str, read_proportion: float = 0.0, update_proportion: float = 0.0,
+                 insert_proportion: float = 0.0, scan_proportion: float = 0.0,
+                 read_modify_write_proportion: float = 0.0,
+                 request_distribution: str = ZIPFIAN, max_scan_length: int = 100):
+        if request_distribution not in (UNIFORM, ZIPFIAN, LATEST):
+            raise ValueError(f"Unknown request distribution: {request_distribution!r}")
+        self.name = name
+        self.proportions = [(READ, read_proportion), (UPDATE, update_proportion),
+                            (INSERT, insert_proportion), (SCAN, scan_proportion),
+                            (READ_MODIFY_WRITE, read_modify_write_proportion)]
+        total = sum(p for _, p in self.proportions)
+        if total <= 0 or any(p < 0 for _, p in self.proportions):
+            raise ValueError(f"Invalid operation proportions for workload {name!r}")
+        # Proporções acumuladas e normalizadas, para o sorteio
+        self._thresholds = []
+        cumulative = 0.0
+        for op, p in self.proportions:
+            if p > 0:
+                cumulative += p / total
+                self._thresholds.append((cumulative, op))
+        self.request_distribution = request_distribution
+        self.max_scan_length = max_scan_length
+    
+    def with_distribution(self, request_distribution: str) -> 'Workload':
+        """Cópia da carga com outra distribuição de chaves"""
+        return Workload(self.name, *(p for _, p in self.proportions),
+                        request_distribution=request_distribution,
+                        max_scan_length=self.max_scan_length)
+    
+    def operations(self, record_count: int, counter: AcknowledgedCounter,
+                   count: int, seed: int) -> Iterator[Tuple[str, int, int]]:
+        """Sequência de count operações (op, número do registro, tamanho da varredura)
+        
+        Inserções usam o próximo número de counter, que deve ser confirmado
+        (acknowledge) depois de gravado; as demais operações escolhem entre
+        os registros já confirmados. As threads recebem sementes diferentes.
+        """
+        rng = random.Random(seed)
+        if self.request_distribution == UNIFORM:
+            choose = lambda items: rng.randrange(items)
+        elif self.request_distribution == ZIPFIAN:
+            choose = ScrambledZipfianGenerator(rng).next
+        else:
+            choose = SkewedLatestGenerator(record_count, rng).next
+        thresholds = self._thresholds
+        for _ in range(count):
+            u = rng.random()
+            op = thresholds[-1][1]
+            for threshold, candidate in thresholds:
+                if u < threshold:
+                    op = candidate
+                    break
+            if op == INSERT:
+                yield op, counter.next(), 0
+            else:
+                scan_length = rng.randint(1, self.max_scan_length) if op == SCAN else 0
+                yield op, choose(max(counter.limit, 1)), scan_length
+
+# Cargas padrão do YCSB
+WORKLOADS = {
+    # A: atualização intensa (sessões de usuário)
+    "a": Workload("a", read_proportion=0.5, update_proportion=0.5),
+    # B: leitura predominante (marcação de fotos)
+    "b": Workload("b", read_proportion=0.95, update_proportion=0.05),
+    # C: somente leitura (cache de perfis)
+    "c": Workload("c", read_proportion=1.0),
+    # D: leitura dos registros mais recentes (atualizações de status)
+    "d": Workload("d", read_proportion=0.95, insert_proportion=0.05, request_distribution=LATEST),
+    # E: varreduras curtas (conversas em threads)
+    "e": Workload("e", scan_proportion=0.95, insert_proportion=0.05),
+    # F: leitura-modificação-escrita (banco de dados de usuários)
+    "f": Workload("f", read_proportion=0.5, read_modify_write_proportion=0.5),
+}